@@ -0,0 +1 @@
+"""Performance and load-testing scripts for the orchestrator."""
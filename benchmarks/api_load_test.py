@@ -0,0 +1,136 @@
+"""Concurrent-request load test for the HTTP API.
+
+Drives ``src.api`` in-process (no sockets) with N concurrent research runs
+and reports throughput and latency. By default the graph is a stand-in
+whose nodes only simulate LLM latency, so the numbers reflect the API
+layer's ability to overlap runs. ``--full-graph`` runs the real research
+graph against the offline scripted LLM and fixture tool server instead.
+
+Usage::
+
+    python -m benchmarks.api_load_test --requests 50 --concurrency 10
+    python -m benchmarks.api_load_test --full-graph --requests 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List
+
+import httpx
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+
+from src.api import create_app
+from src.batch import percentile
+from src.fakes import configure_offline
+from src.graph import compile_graph
+from src.state import AgentState
+
+
+def _fake_llm_graph(latency_ms: float, seed: int = 0):
+    rng = random.Random(seed)
+
+    def _node(name: str):
+        async def _run(state: AgentState) -> AgentState:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * latency_ms / 1000)
+            return {
+                "messages": [AIMessage(content=f"{name} done")],
+                "loop_count": state.get("loop_count", 0) + 1,
+            }
+
+        return _run
+
+    graph = StateGraph(AgentState)
+    for name in ("supervisor", "researcher", "analyst", "final_report"):
+        graph.add_node(name, _node(name))
+    graph.set_entry_point("supervisor")
+    graph.add_edge("supervisor", "researcher")
+    graph.add_edge("researcher", "analyst")
+    graph.add_edge("analyst", "final_report")
+    graph.add_edge("final_report", END)
+    return graph.compile(checkpointer=MemorySaver())
+
+
+async def _one_request(client: httpx.AsyncClient, index: int) -> float:
+    started = time.perf_counter()
+    response = await client.post(
+        f"/threads/load-{index}/runs", json={"query": f"question {index}"}
+    )
+    run_id = response.json()["run_id"]
+    # The in-process transport buffers the SSE body, so this returns once the
+    # run has finished; it measures end-to-end latency, not first-event time.
+    await client.get(f"/runs/{run_id}/events")
+    return time.perf_counter() - started
+
+
+async def run_load_test(
+    requests: int,
+    concurrency: int,
+    latency_ms: float,
+    graph=None,
+) -> Dict[str, float]:
+    app = create_app(
+        graph=graph or _fake_llm_graph(latency_ms),
+        max_concurrent_runs=concurrency,
+    )
+    transport = httpx.ASGITransport(app=app)
+    gate = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://loadtest", timeout=None
+    ) as client:
+
+        async def _bounded(index: int) -> float:
+            async with gate:
+                return await _one_request(client, index)
+
+        started = time.perf_counter()
+        latencies: List[float] = await asyncio.gather(
+            *(_bounded(i) for i in range(requests))
+        )
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 2) if wall > 0 else 0.0,
+        "p50_latency_s": round(percentile(latencies, 50), 4),
+        "p95_latency_s": round(percentile(latencies, 95), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the HTTP API")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=200.0,
+        help="Mean simulated LLM latency per node.",
+    )
+    parser.add_argument(
+        "--full-graph",
+        action="store_true",
+        help="Run the real graph with the offline scripted LLM and tools.",
+    )
+    args = parser.parse_args()
+    graph = None
+    if args.full_graph:
+        configure_offline(fake_llm_latency_ms=args.latency_ms)
+        graph = compile_graph()
+    stats = asyncio.run(
+        run_load_test(args.requests, args.concurrency, args.latency_ms, graph)
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""End-to-end benchmark suite for the research graph.
+
+Each scenario run happens in a fresh child process (clean singletons, its
+own Chroma directory, accurate peak RSS) using the offline stand-ins, and
+records wall time, per-node time, LLM/tool call counts, tokens, embedded
+chunks and peak RSS. Results are written as JSON and can be compared
+against a saved baseline.
+
+Usage::
+
+    python -m benchmarks.run                              # all scenarios
+    python -m benchmarks.run --scenario single_loop --repeat 3
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+
+Exits with status 1 when a compared metric regresses past the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .scenarios import SCENARIOS
+
+COMPARED_METRICS = ("wall_s", "llm_calls", "tool_calls", "total_tokens", "peak_rss_mb")
+_RESULT_PREFIX = "BENCHMARK_RESULT "
+
+
+def _chunk_count(chroma_path: str) -> int:
+    import chromadb
+
+    client = chromadb.PersistentClient(path=chroma_path)
+    try:
+        return client.get_collection("research").count()
+    except Exception:  # noqa: BLE001
+        return 0
+
+
+async def _measure(name: str, chroma_path: str, llm_latency_ms: float) -> Dict[str, Any]:
+    from src.events import stream_events
+    from src.fakes import configure_offline
+    from src.graph import compile_graph
+    from src.state import initial_state
+
+    scenario = SCENARIOS[name]
+    configure_offline(
+        chroma_path=chroma_path,
+        fake_llm_latency_ms=llm_latency_ms,
+        log_level="WARNING",
+        **scenario.settings,
+    )
+    if scenario.prepare:
+        scenario.prepare()
+    chunks_before = _chunk_count(chroma_path)
+
+    graph = compile_graph()
+    config = {"configurable": {"thread_id": f"bench-{name}"}, "recursion_limit": 50}
+    node_started: Dict[str, List[float]] = defaultdict(list)
+    node_time: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+    tokens = {"input_tokens": 0, "output_tokens": 0}
+
+    started = time.perf_counter()
+    async for event in stream_events(graph, initial_state(scenario.query), config):
+        kind = event["type"]
+        now = time.perf_counter()
+        if kind == "node_start":
+            node_started[event["node"]].append(now)
+        elif kind == "node_end" and node_started[event["node"]]:
+            node_time[event["node"]] += now - node_started[event["node"]].pop()
+            counts["node_runs"] += 1
+        elif kind == "llm_start":
+            counts["llm_calls"] += 1
+        elif kind == "llm_end":
+            for key in tokens:
+                tokens[key] += int(event["usage"].get(key, 0))
+        elif kind == "tool_start":
+            counts["tool_calls"] += 1
+    wall = time.perf_counter() - started
+
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "wall_s": round(wall, 4),
+        "node_time_s": {node: round(value, 4) for node, value in node_time.items()},
+        "node_runs": counts["node_runs"],
+        "llm_calls": counts["llm_calls"],
+        "tool_calls": counts["tool_calls"],
+        "input_tokens": tokens["input_tokens"],
+        "output_tokens": tokens["output_tokens"],
+        "total_tokens": tokens["input_tokens"] + tokens["output_tokens"],
+        "embedded_chunks": _chunk_count(chroma_path) - chunks_before,
+        # ru_maxrss is reported in KiB on Linux.
+        "peak_rss_mb": round(usage_self.ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(usage_children.ru_maxrss / 1024, 1),
+    }
+
+
+def _run_child(name: str, llm_latency_ms: float) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as chroma_path:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.run",
+                "--child",
+                name,
+                "--chroma-path",
+                chroma_path,
+                "--llm-latency-ms",
+                str(llm_latency_ms),
+            ],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    for line in completed.stdout.splitlines():
+        if line.startswith(_RESULT_PREFIX):
+            return json.loads(line[len(_RESULT_PREFIX):])
+    raise RuntimeError(
+        f"Scenario {name} failed (exit {completed.returncode}):\n{completed.stderr[-2000:]}"
+    )
+
+
+def _median_run(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Picks the run with the median wall time and records the spread."""
+    ordered = sorted(runs, key=lambda run: run["wall_s"])
+    result = dict(ordered[len(ordered) // 2])
+    walls = [run["wall_s"] for run in runs]
+    result["repeats"] = len(runs)
+    result["wall_s_min"] = min(walls)
+    result["wall_s_stdev"] = round(statistics.pstdev(walls), 4)
+    return result
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+) -> List[str]:
+    """Returns a message per metric that regressed beyond ``threshold``."""
+    regressions: List[str] = []
+    for name, metrics in current["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if not reference:
+            continue
+        for metric in COMPARED_METRICS:
+            now, before = metrics.get(metric), reference.get(metric)
+            if not isinstance(now, (int, float)) or not before:
+                continue
+            change = (now - before) / before
+            if change > threshold:
+                regressions.append(
+                    f"{name}.{metric}: {before} -> {now} (+{change:.0%})"
+                )
+    return regressions
+
+
+def run_suite(names: List[str], repeat: int, llm_latency_ms: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in names:
+        runs = [_run_child(name, llm_latency_ms) for _ in range(max(1, repeat))]
+        results[name] = _median_run(runs)
+        print(f"{name}: {results[name]['wall_s']}s", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "llm_latency_ms": llm_latency_ms,
+            "repeat": repeat,
+        },
+        "scenarios": results,
+    }
+
+
+def _parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the research graph")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run (repeatable); defaults to all.",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", help="Also write results here.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--chroma-path", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.child:
+        metrics = asyncio.run(_measure(args.child, args.chroma_path, args.llm_latency_ms))
+        print(_RESULT_PREFIX + json.dumps(metrics))
+        return 0
+
+    results = run_suite(args.scenario or list(SCENARIOS), args.repeat, args.llm_latency_ms)
+    for target in filter(None, [args.output, args.save_baseline]):
+        Path(target).parent.mkdir(parents=True, exist_ok=True)
+        Path(target).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Representative research-turn scenarios for the benchmark suite.
+
+Every scenario runs the real graph against the offline stand-ins from
+``src.fakes``; only the settings overrides and the pre-run setup differ.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from src.tools.memory import VectorDB
+
+
+def _seed_vector_store(documents: int) -> Callable[[], None]:
+    def _prepare() -> None:
+        db = VectorDB()
+        topics = ["sqlite", "postgresql", "mcp", "langgraph", "chroma", "http"]
+        for index in range(documents):
+            topic = topics[index % len(topics)]
+            db.store_research(
+                f"Note {index} about {topic}: " + f"{topic} detail {index} " * 120,
+                source="benchmark",
+                source_url=f"https://bench.example.com/{topic}/{index}",
+            )
+
+    return _prepare
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    query: str = "Compare SQLite vs PostgreSQL for an embedded analytics tool"
+    settings: Dict[str, Any] = field(default_factory=dict)
+    prepare: Optional[Callable[[], None]] = None
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            name="single_loop",
+            description="One research round, analyst synthesizes immediately.",
+            settings={"fake_llm_research_rounds": 1},
+        ),
+        Scenario(
+            name="forced_synthesis",
+            description="Analyst never satisfied; loop limit forces synthesis.",
+            # Search, then scrape; every round runs, repeated or not.
+            settings={
+                "fake_llm_research_rounds": 99,
+                "fake_llm_tool_rounds": 2,
+                "stagnation_stop": False,
+            },
+        ),
+        Scenario(
+            name="stagnation_stop",
+            description="As forced_synthesis; rounds of repeated calls end research early.",
+            settings={
+                "fake_llm_research_rounds": 99,
+                "fake_llm_tool_rounds": 2,
+                "stagnation_stop": True,
+            },
+        ),
+        Scenario(
+            name="heavy_scraping",
+            description="Researcher scrapes many pages with slow tools.",
+            settings={
+                "fake_llm_research_rounds": 1,
+                "fake_llm_scrape_urls": 6,
+                "fake_tool_latency_ms": 50.0,
+            },
+        ),
+        Scenario(
+            name="large_vector_store",
+            description="Retrieval against a pre-populated vector store.",
+            settings={"fake_llm_research_rounds": 1},
+            prepare=_seed_vector_store(400),
+        ),
+    ]
+}
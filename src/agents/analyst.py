@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import List
+from typing import Dict, List, Optional
 
-from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from ..budget import exhausted_budget
 from ..config import get_settings, llm_retry
+from ..content_store import materialize
+from ..context import select_stable
+from ..llm import build_llm, system_message
+from ..metrics import get_metrics
 from ..state import AgentState, prune_messages
 from ..tools.mcp_tools import get_research_tools
 from ..tools.memory import get_vector_db
@@ -32,6 +40,8 @@ COMPARISON_DATA:
 Metric | SQLite | PostgreSQL
 Transport | stdio | SSE
 Latency | Ultra-low | Network-dependent
+Set "confidence" between 0 and 1 to how well the evidence supports your
+assessment.
 Your output must be a valid tool call/JSON object. The "gaps" field MUST be a
 JSON array of strings (even if empty). Do NOT use Markdown bullet points inside
 any JSON field values.
@@ -55,88 +65,208 @@ class AnalystAssessment(BaseModel):
         "",
         description="Structured synthesis if research is sufficient.",
     )
+    confidence: float = Field(
+        1.0,
+        ge=0.0,
+        le=1.0,
+        description="0-1 confidence that the evidence supports this assessment.",
+    )
+
+
+def _build_llm(model: Optional[str] = None) -> BaseChatModel:
+    return build_llm("analyst", model=model)
+
+
+def _assessor(tools: List[BaseTool], model: Optional[str] = None) -> Runnable:
+    return _build_llm(model).bind_tools(tools).with_structured_output(AnalystAssessment)
+
+
+def _escalation_reason(assessment: Optional[AnalystAssessment]) -> Optional[str]:
+    if assessment is None:
+        return "no structured assessment returned"
+    threshold = get_settings().analyst_min_confidence
+    if assessment.confidence < threshold:
+        return f"confidence {assessment.confidence:.2f} < {threshold:.2f}"
+    return None
+
+
+async def _ainvoke(assessor: Runnable, msgs: List[BaseMessage]) -> AnalystAssessment:
+    @llm_retry()
+    async def _call():
+        return await assessor.ainvoke(msgs)
 
+    return await _call()
 
-def _build_llm() -> ChatAnthropic:
-    cfg = get_settings()
-    return ChatAnthropic(
-        model=cfg.default_model,
-        temperature=cfg.default_temperature,
-        api_key=cfg.anthropic_api_key,
+
+async def _assess(
+    tools: List[BaseTool],
+    messages: List[BaseMessage],
+    escalate: bool = True,
+) -> tuple[AnalystAssessment, Runnable]:
+    """Runs the analyst model, escalating to a stronger one when configured.
+
+    The first attempt on the fast model is not retried: escalation is the
+    retry. Returns the assessment and the model that produced it.
+    """
+    escalation_model = get_settings().analyst_escalation_model if escalate else None
+    assessor = _assessor(tools)
+    if not escalation_model:
+        return await _ainvoke(assessor, messages), assessor
+    try:
+        assessment = await assessor.ainvoke(messages)
+        reason = _escalation_reason(assessment)
+    except Exception as exc:  # noqa: BLE001
+        assessment, reason = None, f"failed to parse: {exc}"
+    if reason is None:
+        return assessment, assessor
+    logger.info("Escalating analyst to %s: %s", escalation_model, reason)
+    get_metrics().increment("analyst.escalations")
+    assessor = _assessor(tools, escalation_model)
+    return await _ainvoke(assessor, messages), assessor
+
+
+# From this loop on the analyst must synthesize instead of asking for more.
+FORCE_SYNTHESIS_LOOP = 3
+FORCE_SYNTHESIS = (
+    "Provide a final synthesis using only the available information. "
+    "Do not ask for more research."
+)
+
+
+def _loop_budget(state: AgentState) -> tuple[str, bool]:
+    """Prompt note on the loop budget, and whether this is the final pass.
+
+    The final pass is the forced-synthesis loop, the last loop before
+    ``_route_after_analyst`` stops at ``max_loop_count``, or a run budget
+    inside its reserve.
+    """
+    loop_count = state.get("loop_count", 0)
+    limit = min(FORCE_SYNTHESIS_LOOP, get_settings().max_loop_count)
+    budget = exhausted_budget(state)
+    if budget:
+        return f"The run's {budget} budget is nearly spent. {FORCE_SYNTHESIS}", True
+    if loop_count >= limit:
+        return f"This is the final research loop. {FORCE_SYNTHESIS}", True
+    return (
+        f"Loop budget: workflow step {loop_count}; a final synthesis is "
+        f"required from step {limit}.",
+        False,
     )
 
 
+def _gaps_synthesis(gaps: List[str]) -> str:
+    """Stand-in synthesis when the model gives none on the final pass."""
+    listed = "; ".join(gap.strip() for gap in gaps if gap.strip())
+    if not listed:
+        return "Research ended before the analyst could synthesize the findings."
+    return f"Research ended with these gaps still open: {listed}."
+
+
+# Retrieved once per analyst turn: the prompt shows the closest few, and
+# final_report_node lists sources from all of them.
+VECTOR_HITS_K = 6
+PROMPT_HITS = 4
+
+
+def _retrieve(query: str) -> List[Dict[str, str]]:
+    if not query:
+        return []
+    return get_vector_db().retrieve_knowledge_with_sources(query, k=VECTOR_HITS_K)
+
+
 async def analyst_node(state: AgentState) -> AgentState:
-    async with get_research_tools() as tools:
-        tool_aware = _build_llm().bind_tools(tools).with_structured_output(
-            AnalystAssessment
-        )
+    last_user_message = next(
+        (
+            message.content
+            for message in reversed(state.get("messages", []))
+            if isinstance(message, HumanMessage)
+        ),
+        "",
+    )
+    # Embedding and querying block, so they run in a thread while the MCP
+    # session starts.
+    query = state.get("question") or last_user_message
+    retrieval = asyncio.create_task(asyncio.to_thread(_retrieve, query))
+    if exhausted_budget(state):
+        # Inside the budget reserve: no tool session, just the final call.
+        update = await _analyze(state, [], await retrieval)
+        return {**update, "vector_hits_query": query}
+    try:
+        async with get_research_tools() as tools:
+            vector_hits = await retrieval
+            update = await _analyze(state, tools, vector_hits)
+            return {**update, "vector_hits_query": query}
+    finally:
+        retrieval.cancel()
 
-        system_parts = [ANALYST_SYSTEM]
-        summary = state.get("summary", "").strip()
-        if summary:
-            system_parts.append(f"Running summary:\n{summary}")
-        if state.get("research_results"):
-            results_text = "\n---\n".join(
-                str(result) for result in state["research_results"]
+
+async def _analyze(
+    state: AgentState,
+    tools: List[BaseTool],
+    vector_hits: List[Dict[str, str]],
+) -> AgentState:
+    summary = state.get("summary", "").strip()
+    results = await asyncio.to_thread(materialize, state.get("research_results", []))
+    # Research and retrieval overlap (stored pages come back as hits), so
+    # hits repeating research are dropped and the budget trims from the end;
+    # earlier research blocks are never displaced.
+    hit_texts = [str(hit.get("text", "")) for hit in vector_hits[:PROMPT_HITS]]
+    kept_results, kept_hits = select_stable(results, hit_texts)
+    prompt_hits = [vector_hits[i] for i in kept_hits]
+    results = [results[i] for i in kept_results]
+    # Research only accumulates between loops, so it sits in the cached
+    # prefix ahead of the summary and retrieval results, which change.
+    research_blocks = [
+        ("Research results:\n" if index == 0 else "---\n") + result
+        for index, result in enumerate(results)
+    ]
+    volatile = [f"Running summary:\n{summary}" if summary else ""]
+    vector_lines = [
+        f"[{hit['source_url']}] {hit['text']}"
+        for hit in prompt_hits
+        if hit.get("text")
+    ]
+    if vector_lines:
+        vector_text = "\n---\n".join(vector_lines)
+        volatile.append(f"Vector DB facts:\n{vector_text}")
+    # Appended after the cached prefix, so the final pass costs one call.
+    budget_note, final_pass = _loop_budget(state)
+    volatile.append(budget_note)
+    over_budget = exhausted_budget(state) is not None
+    system = system_message(ANALYST_SYSTEM, research_blocks, volatile)
+    prior_messages = [
+        message
+        for message in prune_messages(state.get("messages", []))
+        if not isinstance(message, SystemMessage)
+    ]
+    messages: List[BaseMessage] = [system] + prior_messages
+
+    assessment, assessor = await _assess(tools, messages, escalate=not over_budget)
+
+    payload = assessment.model_dump()
+    logger.info("Analyst assessment: %s", payload)
+
+    if final_pass and assessment.needs_more_research:
+        synthesis = assessment.synthesis
+        if not synthesis and not over_budget:
+            # The model ignored the system note; repeat it as the latest
+            # turn, which an identical request would not change.
+            retry = await _ainvoke(
+                assessor, messages + [HumanMessage(content=FORCE_SYNTHESIS)]
             )
-            system_parts.append(f"Research results:\n{results_text}")
-        last_user_message = next(
-            (
-                message.content
-                for message in reversed(state.get("messages", []))
-                if isinstance(message, HumanMessage)
-            ),
-            "",
+            synthesis = retry.synthesis if retry is not None else ""
+            get_metrics().increment("analyst.forced_synthesis_retries")
+        if not synthesis:
+            synthesis = _gaps_synthesis(assessment.gaps)
+        assessment = AnalystAssessment(
+            needs_more_research=False,
+            gaps=assessment.gaps,
+            re_research_instructions="",
+            synthesis=str(synthesis),
+            confidence=assessment.confidence,
         )
-        if last_user_message:
-            vector_hits = get_vector_db().retrieve_knowledge_with_sources(
-                last_user_message, k=4
-            )
-            if vector_hits:
-                vector_lines = [
-                    f"[{hit['source_url']}] {hit['text']}"
-                    for hit in vector_hits
-                    if hit.get("text")
-                ]
-                vector_text = "\n---\n".join(vector_lines)
-                system_parts.append(f"Vector DB facts:\n{vector_text}")
-        system_message = SystemMessage(content="\n\n".join(system_parts))
-        prior_messages = [
-            message
-            for message in prune_messages(state.get("messages", []))
-            if not isinstance(message, SystemMessage)
-        ]
-        messages: List[BaseMessage] = [system_message] + prior_messages
-
-        @llm_retry()
-        async def _ainvoke(msgs):
-            return await tool_aware.ainvoke(msgs)
-
-        assessment = await _ainvoke(messages)
-
         payload = assessment.model_dump()
-        logger.info("Analyst assessment: %s", payload)
-
-        if state.get("loop_count", 0) >= 3 and assessment.needs_more_research:
-            synthesis_prompt = "\n\n".join(
-                system_parts
-                + [
-                    "Provide a final synthesis using only the available information. "
-                    "Do not ask for more research.",
-                ]
-            )
-            synthesis_message = SystemMessage(content=synthesis_prompt)
-            synthesis_messages: List[BaseMessage] = [synthesis_message] + prior_messages
-            synthesis_response = await _ainvoke(synthesis_messages)
-            assessment = AnalystAssessment(
-                needs_more_research=False,
-                gaps=assessment.gaps,
-                re_research_instructions="",
-                synthesis=str(synthesis_response.synthesis),
-            )
-            payload = assessment.model_dump()
-            logger.info("Analyst forced final synthesis after loop limit")
+        logger.info("Analyst forced final synthesis after loop limit")
 
     content = json.dumps(payload)
     response_messages = [AIMessage(content=content)]
@@ -152,8 +282,8 @@ async def analyst_node(state: AgentState) -> AgentState:
 
     return {
         "messages": response_messages,
-        "summary": state.get("summary", ""),
         "research_results": state.get("research_results", []),
         "needs_more_research": assessment.needs_more_research,
         "loop_count": state.get("loop_count", 0) + 1,
+        "vector_hits": vector_hits,
     }
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import List
+import time
+from typing import Dict, List, Optional
 
-from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
 from langchain_core.tools import BaseTool
 
+from ..budget import remaining_seconds
 from ..config import get_settings, llm_retry
+from ..content_store import ResearchResult, content_hash, materialize, to_research_results
+from ..llm import build_llm, system_message
+from ..metrics import get_metrics
 from ..state import AgentState, prune_messages
+from ..tools.cassette import cassette_key
 from ..tools.mcp_tools import get_research_tools
 from ..tools.memory import get_vector_db
 
@@ -22,39 +29,90 @@ content of the most promising official documentation or technical articles to
 get deep details.
 """
 
-def _build_llm() -> ChatAnthropic:
-    cfg = get_settings()
-    return ChatAnthropic(
-        model=cfg.default_model,
-        temperature=cfg.default_temperature,
-        api_key=cfg.anthropic_api_key,
-    )
+def _build_llm() -> BaseChatModel:
+    return build_llm("researcher")
 
 async def _run_tool_calls(
     response: BaseMessage,
     tools: List[BaseTool],
+    timeout: Optional[float] = None,
+    max_calls: Optional[int] = None,
+    concurrency: int = 0,
+    memo: Optional[Dict[str, ResearchResult]] = None,
 ) -> tuple[List[ToolMessage], List[dict]]:
-    tool_messages: List[ToolMessage] = []
-    tool_args: List[dict] = []
+    """Runs one round of tool calls concurrently, in the order they were asked for.
+
+    Every call gets a ``ToolMessage`` back, as providers require: calls
+    beyond ``max_calls``, unknown tools and calls cut off by the deadline
+    get an error result instead of output. Calls to memoized tools carry
+    their memo key in ``artifact``; with ``memo``, a call already made this
+    run is answered from it without running the tool.
+    """
+    calls = getattr(response, "tool_calls", []) or []
     tool_map = {tool.name: tool for tool in tools}
-    
-    for call in getattr(response, "tool_calls", []) or []:
-        tool = tool_map.get(call.get("name"))
+    # ``timeout`` bounds all calls together (what is left of the run deadline).
+    deadline = None if timeout is None else time.monotonic() + timeout
+    semaphore = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+    memo_suffixes = _memo_suffixes()
+
+    async def _call(index: int, call: dict) -> ToolMessage:
+        name = call.get("name")
+        call_id = call.get("id", "")
+        tool = tool_map.get(name)
+        if max_calls is not None and index >= max_calls:
+            return ToolMessage(
+                content="Tool call skipped: researcher tool-call budget reached.",
+                tool_call_id=call_id,
+                status="error",
+            )
         if not tool:
-            continue
-        
-        # Check if the tool itself is async or sync and handle accordingly
-        if hasattr(tool, "ainvoke"):
-            result = await tool.ainvoke(call.get("args", {}))
-        else:
-            result = tool.invoke(call.get("args", {}))
-            
-        tool_messages.append(
-            ToolMessage(content=str(result), tool_call_id=call.get("id", ""))
-        )
-        tool_args.append(call.get("args", {}) or {})
+            return ToolMessage(
+                content=f"Unknown tool: {name}", tool_call_id=call_id, status="error"
+            )
+        key = cassette_key(name, call.get("args", {})) if name.endswith(memo_suffixes) else None
+        if key and memo and key in memo:
+            get_metrics().increment("tool.memo_hits")
+            return ToolMessage(
+                content=(await asyncio.to_thread(materialize, [memo[key]]))[0],
+                tool_call_id=call_id,
+                artifact={"memo_key": key, "memo_hit": True},
+            )
+        try:
+            if semaphore is None:
+                result = await _invoke(tool, call)
+            else:
+                async with semaphore:
+                    result = await _invoke(tool, call)
+        except asyncio.TimeoutError:
+            # The run deadline is close; report the gap instead of waiting.
+            logger.warning("Tool %s cut off by the run deadline", name)
+            return ToolMessage(
+                content="Tool call cancelled: run deadline reached.",
+                tool_call_id=call_id,
+                status="error",
+            )
+        artifact = {"memo_key": key} if key else None
+        return ToolMessage(content=str(result), tool_call_id=call_id, artifact=artifact)
+
+    async def _invoke(tool: BaseTool, call: dict):
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        return await asyncio.wait_for(tool.ainvoke(call.get("args", {})), remaining)
+
+    tool_messages = list(
+        await asyncio.gather(*(_call(index, call) for index, call in enumerate(calls)))
+    )
+    tool_args = [call.get("args", {}) or {} for call in calls]
     return tool_messages, tool_args
 
+def _memo_suffixes() -> tuple[str, ...]:
+    names = get_settings().tool_memo_tools.split(",")
+    return tuple(name.strip() for name in names if name.strip())
+
+
+def _source_key(text: str, source_url: str) -> str:
+    return source_url if source_url != "unknown" else content_hash(text)
+
+
 def _normalize_content(content: object) -> str:
     if isinstance(content, list):
         text_parts: List[str] = []
@@ -72,7 +130,10 @@ def _extract_tool_outputs(
 ) -> List[tuple[str, str]]:
     outputs: List[tuple[str, str]] = []
     for message, args in zip(tool_messages, tool_args, strict=False):
-        if message.content:
+        # Memo hits repeat an earlier output of this run.
+        if (message.artifact or {}).get("memo_hit"):
+            continue
+        if message.content and message.status != "error":
             source_url = str(args.get("url", "unknown"))
             outputs.append((str(message.content), source_url))
     return outputs
@@ -88,63 +149,135 @@ async def _store_research_via_tool(
         None,
     )
     if not store_tool:
+        # The tool server does not expose a store tool; write directly.
+        await asyncio.to_thread(
+            get_vector_db().store_research,
+            text,
+            source="web_scraper",
+            source_url=source_url,
+        )
         return
-    payload = {"text": text, "source_url": source_url}
-    if hasattr(store_tool, "ainvoke"):
-        await store_tool.ainvoke(payload)
-    else:
-        store_tool.invoke(payload)
+    await store_tool.ainvoke({"text": text, "source_url": source_url})
+
 
 async def researcher_node(state: AgentState) -> AgentState:
+    """Runs a bounded tool loop: model, tools, model, ... until it answers.
+
+    Each round's tool calls run concurrently. The loop stops when the model
+    answers without tools, after ``researcher_max_tool_rounds`` rounds or
+    once ``researcher_max_tool_calls`` calls have run; a model still asking
+    for tools then gets one last call with tools disabled to summarize. With
+    ``stagnation_stop``, so does a round that found no source this run has
+    not already seen (every call repeated or memoized).
+    """
+    cfg = get_settings()
     llm = _build_llm()
 
     async with get_research_tools() as tools:
         tool_aware = llm.bind_tools(tools)
-        system_parts = [RESEARCHER_SYSTEM]
         summary = state.get("summary", "").strip()
-        if summary:
-            system_parts.append(f"Running summary:\n{summary}")
-        system_message = SystemMessage(content="\n\n".join(system_parts))
+        system = system_message(
+            RESEARCHER_SYSTEM,
+            volatile=[f"Running summary:\n{summary}" if summary else ""],
+        )
         prior_messages = [
             message
             for message in prune_messages(state.get("messages", []))
             if not isinstance(message, SystemMessage)
         ]
-        messages: List[BaseMessage] = [system_message] + prior_messages
+        messages: List[BaseMessage] = [system] + prior_messages
 
         @llm_retry()
-        async def _ainvoke(msgs):
-            return await tool_aware.ainvoke(msgs)
+        async def _ainvoke(model, msgs):
+            return await model.ainvoke(msgs)
 
-        response = await _ainvoke(messages)
-        tool_messages, tool_args = await _run_tool_calls(response, tools)
-
-        final_response = response
-        if tool_messages:
-            final_response = await _ainvoke(
-                messages + [response] + tool_messages
+        memo: Dict[str, ResearchResult] = dict(state.get("tool_memo") or {})
+        tool_messages: List[ToolMessage] = []
+        tool_args: List[dict] = []
+        calls_left = max(cfg.researcher_max_tool_calls, 0)
+        rounds = 0
+        known_sources = set(state.get("seen_sources") or {})
+        stagnant_round = False
+        response = await _ainvoke(tool_aware, messages)
+        while getattr(response, "tool_calls", None):
+            timeout = remaining_seconds(state)
+            out_of_budget = (
+                rounds >= cfg.researcher_max_tool_rounds or calls_left <= 0 or timeout == 0
+            )
+            if out_of_budget or stagnant_round:
+                # Out of rounds, calls or time, or stagnating: answer from
+                # what was gathered.
+                response = await _ainvoke(
+                    llm.bind_tools(tools, tool_choice={"type": "none"}), messages
+                )
+                break
+            round_messages, round_args = await _run_tool_calls(
+                response,
+                tools,
+                timeout=timeout,
+                max_calls=calls_left,
+                concurrency=cfg.researcher_tool_concurrency,
+                memo=memo,
             )
+            calls_left -= min(len(response.tool_calls), calls_left)
+            rounds += 1
+            tool_messages.extend(round_messages)
+            tool_args.extend(round_args)
+            round_sources = {
+                _source_key(output, source_url)
+                for output, source_url in _extract_tool_outputs(round_messages, round_args)
+            }
+            answered = any(message.status != "error" for message in round_messages)
+            if answered and not round_sources - known_sources and cfg.stagnation_stop:
+                # Everything came back already seen: digging on will not help.
+                get_metrics().increment("research.stagnant_rounds")
+                stagnant_round = True
+            known_sources |= round_sources
+            messages = messages + [response] + round_messages
+            if stagnant_round:
+                # Straight to the wrap-up call at the top of the loop.
+                continue
+            response = await _ainvoke(tool_aware, messages)
 
-        normalized_content = _normalize_content(final_response.content)
-        research_results = state.get("research_results", [])
+        normalized_content = _normalize_content(response.content)
+        research_results = list(state.get("research_results", []))
         tool_outputs = _extract_tool_outputs(tool_messages, tool_args)
+        pending = list(tool_outputs)
+        if normalized_content:
+            pending.append((normalized_content, "researcher"))
+        # The content store is blocking SQLite: one write, off the event loop.
+        refs = await asyncio.to_thread(to_research_results, pending)
+        research_results.extend(refs)
+        stored: Dict[str, ResearchResult] = {
+            output: ref for (output, _), ref in zip(tool_outputs, refs)
+        }
         for output, source_url in tool_outputs:
-            research_results.append(output)
             await _store_research_via_tool(tools, output, source_url)
-        get_vector_db().store_research(
-            output,
-            source="web_scraper",
-            source_url=source_url,
-        )
-        if normalized_content:
-            research_results.append(normalized_content)
 
-    logger.info("Researcher produced %d tool messages", len(tool_messages))
+    for message in tool_messages:
+        key = (message.artifact or {}).get("memo_key")
+        if key and str(message.content) in stored:
+            memo[key] = stored[str(message.content)]
+    # A loop that turns up no source this run has not seen is stagnating.
+    seen_sources = dict(state.get("seen_sources") or {})
+    new_sources = {
+        _source_key(output, source_url) for output, source_url in tool_outputs
+    } - set(seen_sources)
+    if seen_sources and not new_sources:
+        get_metrics().increment("research.stagnant_loops")
+    seen_sources.update((source, state.get("loop_count", 0)) for source in new_sources)
+    logger.info(
+        "Researcher ran %d tool calls over %d rounds, %d new sources",
+        len(tool_messages),
+        rounds,
+        len(new_sources),
+    )
 
     return {
         "messages": [AIMessage(content=normalized_content)],
-        "summary": state.get("summary", ""),
         "research_results": research_results,
+        "tool_memo": memo,
+        "seen_sources": seen_sources,
         "needs_more_research": state.get("needs_more_research", False),
         "loop_count": state.get("loop_count", 0) + 1,
-    }
\ No newline at end of file
+    }
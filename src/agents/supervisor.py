@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import List, Literal
+from typing import List, Literal, Optional
 
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 
 from ..config import get_settings, llm_retry
+from ..llm import build_llm, system_message
+from ..metrics import get_metrics
 from ..state import AgentState, prune_messages
 
 logger = logging.getLogger(__name__)
@@ -32,28 +34,73 @@ class SupervisorDecision(BaseModel):
     reasoning: str = Field(..., description="Short routing rationale.")
 
 
-def _build_llm() -> ChatAnthropic:
-    cfg = get_settings()
-    return ChatAnthropic(
-        model=cfg.default_model,
-        temperature=cfg.default_temperature,
-        api_key=cfg.anthropic_api_key,
-    )
-
-
-def supervisor_node(state: AgentState) -> AgentState:
+def _build_llm() -> BaseChatModel:
+    return build_llm("supervisor")
+
+
+def _analyst_payload(message: BaseMessage) -> Optional[dict]:
+    try:
+        payload = json.loads(message.content)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    if isinstance(payload, dict) and "needs_more_research" in payload:
+        return payload
+    return None
+
+
+def _pre_route(state: AgentState) -> Optional[SupervisorDecision]:
+    """Routes the unambiguous states without asking the model.
+
+    Returns ``None`` when the model should decide (e.g. after summarization,
+    when only a summary and earlier results are left to reason about).
+    """
+    messages = state.get("messages", [])
+    if not messages:
+        return None
+    last_message = messages[-1]
+    if isinstance(last_message, HumanMessage) and not state.get("research_results"):
+        # Nodes replace the message list, so the researcher only sees this
+        # decision; the reasoning has to carry the question forward.
+        return SupervisorDecision(
+            next_agent="researcher",
+            reasoning=f"Research needed for {last_message.content}.",
+        )
+    if isinstance(last_message, AIMessage) and str(last_message.content).startswith(
+        "Re-research instructions:"
+    ):
+        return SupervisorDecision(
+            next_agent="researcher",
+            reasoning="Analyst requested more research.",
+        )
+    payload = _analyst_payload(last_message)
+    if payload is None:
+        return None
+    if payload.get("needs_more_research") is False and payload.get("synthesis"):
+        return SupervisorDecision(
+            next_agent="final_report",
+            reasoning="Analyst completed synthesis; proceed to final report.",
+        )
+    if payload.get("needs_more_research") is True:
+        return SupervisorDecision(
+            next_agent="researcher",
+            reasoning="Analyst found gaps; more research needed.",
+        )
+    return None
+
+
+def _decide_with_llm(state: AgentState) -> SupervisorDecision:
     llm = _build_llm().with_structured_output(SupervisorDecision)
-    system_parts = [SUPERVISOR_SYSTEM]
     summary = state.get("summary", "").strip()
-    if summary:
-        system_parts.append(f"Running summary:\n{summary}")
-    system_message = SystemMessage(content="\n\n".join(system_parts))
+    system = system_message(
+        SUPERVISOR_SYSTEM,
+        volatile=[f"Running summary:\n{summary}" if summary else ""],
+    )
     prior_messages = [
         message
         for message in prune_messages(state.get("messages", []))
         if not isinstance(message, SystemMessage)
     ]
-    messages: List[BaseMessage] = [system_message] + prior_messages
+    messages: List[BaseMessage] = [system] + prior_messages
 
     @llm_retry()
     def _invoke(msgs):
@@ -62,27 +109,39 @@ def supervisor_node(state: AgentState) -> AgentState:
     decision = _invoke(messages)
 
     if state.get("messages"):
-        last_message = state["messages"][-1]
-        try:
-            payload = json.loads(last_message.content)
-            if (
-                isinstance(payload, dict)
-                and payload.get("needs_more_research") is False
-                and payload.get("synthesis")
-            ):
-                decision = SupervisorDecision(
-                    next_agent="final_report",
-                    reasoning="Analyst completed synthesis; proceed to final report.",
-                )
-        except (TypeError, json.JSONDecodeError):
-            pass
+        payload = _analyst_payload(state["messages"][-1]) or {}
+        if payload.get("needs_more_research") is False and payload.get("synthesis"):
+            decision = SupervisorDecision(
+                next_agent="final_report",
+                reasoning="Analyst completed synthesis; proceed to final report.",
+            )
+    return decision
+
+
+def supervisor_node(state: AgentState) -> AgentState:
+    decision = _pre_route(state) if get_settings().supervisor_fast_path else None
+    if decision is not None:
+        get_metrics().increment("supervisor.llm_skipped")
+    else:
+        get_metrics().increment("supervisor.llm_decisions")
+        decision = _decide_with_llm(state)
 
     payload = decision.model_dump()
     logger.info("Supervisor decision: %s", payload)
 
+    # Remember the turn's question; later nodes replace the message list.
+    question = next(
+        (
+            str(message.content)
+            for message in reversed(state.get("messages", []))
+            if isinstance(message, HumanMessage)
+        ),
+        state.get("question", ""),
+    )
+
     return {
         "messages": [AIMessage(content=json.dumps(payload))],
-        "summary": state.get("summary", ""),
+        "question": question,
         "research_results": state.get("research_results", []),
         "needs_more_research": state.get("needs_more_research", False),
         "loop_count": state.get("loop_count", 0) + 1,
@@ -0,0 +1,294 @@
+"""HTTP API for the research graph.
+
+One compiled graph (and its checkpointer) is shared by every request. Runs
+are scoped to a thread ID, execute as background tasks and publish their
+events so clients can follow them over Server-Sent Events.
+
+Endpoints::
+
+    POST   /threads/{thread_id}/runs   {"query": "..."} -> start a run
+    GET    /runs/{run_id}              run status and final report
+    GET    /runs/{run_id}/events       SSE stream of graph events
+    DELETE /runs/{run_id}              cancel a run
+    GET    /health
+    GET    /metrics                    Prometheus-format latency metrics
+
+Usage::
+
+    python -m src.api
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from .config import get_settings
+from .events import GraphEvent, event_to_json, stream_events
+from .graph import compile_graph
+from .metrics import get_metrics
+from .profiling import profile_run
+from .recording import record_run
+from .state import AgentState, next_turn_state
+from .tools.mcp_tools import shared_research_tools
+from .usage import summarize_usage, usage_since
+
+logger = logging.getLogger(__name__)
+
+_TERMINAL = {"completed", "failed", "cancelled"}
+
+
+class Run:
+    """A single research turn and the events it has published so far."""
+
+    def __init__(self, thread_id: str, query: str) -> None:
+        self.run_id = uuid.uuid4().hex
+        self.thread_id = thread_id
+        self.query = query
+        self.status = "queued"
+        self.report = ""
+        self.error = ""
+        self.usage: Dict[str, Any] = summarize_usage({})
+        self.events: List[GraphEvent] = []
+        self.task: Optional[asyncio.Task] = None
+        self.finished_at: Optional[float] = None
+        self._updated = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in _TERMINAL
+
+    def publish(self, event: GraphEvent) -> None:
+        self.events.append(event)
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def follow(self) -> AsyncIterator[GraphEvent]:
+        """Yields every event from the start, then live ones until the run ends."""
+        index = 0
+        while True:
+            waiter = self._updated
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                return
+            await waiter.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "thread_id": self.thread_id,
+            "query": self.query,
+            "status": self.status,
+            "report": self.report,
+            "error": self.error,
+            "usage": self.usage,
+        }
+
+
+class RunManager:
+    """Owns the shared graph and schedules runs with a concurrency cap.
+
+    Finished runs are kept for ``API_RUN_TTL_S`` and at most
+    ``API_MAX_FINISHED_RUNS`` of them, oldest evicted first; their state
+    lives on in the checkpointer.
+    """
+
+    def __init__(self, graph=None, max_concurrent_runs: Optional[int] = None) -> None:
+        cfg = get_settings()
+        self.graph = graph or compile_graph()
+        self.runs: Dict[str, Run] = {}
+        self._active_threads: Dict[str, str] = {}
+        self._slots = asyncio.Semaphore(
+            max_concurrent_runs or cfg.api_max_concurrent_runs
+        )
+
+    def _config(self, thread_id: str) -> Dict[str, Any]:
+        return {
+            "configurable": {"thread_id": thread_id},
+            "recursion_limit": get_settings().recursion_limit,
+        }
+
+    async def _turn_state(self, run: Run) -> AgentState:
+        snapshot = await self.graph.aget_state(self._config(run.thread_id))
+        return next_turn_state(snapshot.values if snapshot else None, run.query)
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Drops finished runs past their TTL or beyond the retention cap.
+
+        A thread's metrics go with its last retained run, so the registry
+        does not grow with every thread the server has seen.
+        """
+        cfg = get_settings()
+        now = time.time() if now is None else now
+        finished = sorted(
+            (run for run in self.runs.values() if run.finished_at is not None),
+            key=lambda run: run.finished_at,
+        )
+        excess = len(finished) - cfg.api_max_finished_runs
+        evicted = set()
+        for index, run in enumerate(finished):
+            if index < excess or now - run.finished_at > cfg.api_run_ttl_s:
+                del self.runs[run.run_id]
+                evicted.add(run.thread_id)
+        for thread_id in evicted - {run.thread_id for run in self.runs.values()}:
+            get_metrics().reset_thread(thread_id)
+
+    def start(self, thread_id: str, query: str) -> Run:
+        if thread_id in self._active_threads:
+            raise RuntimeError(f"Thread {thread_id} already has an active run")
+        self.prune()
+        run = Run(thread_id, query)
+        self.runs[run.run_id] = run
+        self._active_threads[thread_id] = run.run_id
+        run.task = asyncio.create_task(self._execute(run))
+        return run
+
+    def cancel(self, run_id: str) -> Optional[Run]:
+        run = self.runs.get(run_id)
+        if run and run.task and not run.done:
+            run.task.cancel()
+        return run
+
+    async def _stream(self, run: Run, state: AgentState, config: Dict[str, Any]) -> None:
+        async for event in stream_events(self.graph, state, config):
+            run.publish(event)
+            if event["type"] == "node_end" and event["node"] == "final_report":
+                messages = event["output"].get("messages", [])
+                if messages:
+                    run.report = str(messages[-1].content)
+
+    async def _execute(self, run: Run) -> None:
+        try:
+            async with self._slots:
+                run.status = "running"
+                state = await self._turn_state(run)
+                usage_before = dict(state.get("usage") or {})
+                config = self._config(run.thread_id)
+                with profile_run(run.thread_id):
+                    with record_run(config, state) as (run_config, _):
+                        await self._stream(run, state, run_config)
+                snapshot = await self.graph.aget_state(config)
+                run.usage = summarize_usage(
+                    usage_since((snapshot.values or {}).get("usage"), usage_before)
+                )
+                run.status = "completed"
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Run %s failed: %s", run.run_id, exc)
+            run.status = "failed"
+            run.error = str(exc)
+        finally:
+            if not run.done:
+                run.status = "cancelled"
+            self._active_threads.pop(run.thread_id, None)
+            run.finished_at = time.time()
+            run.publish({"type": "run_end", "status": run.status, "error": run.error})
+
+
+def _sse(event: GraphEvent) -> str:
+    return f"event: {event['type']}\ndata: {event_to_json(event)}\n\n"
+
+
+async def _start_run(request: Request) -> JSONResponse:
+    manager: RunManager = request.app.state.runs
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        body = {}
+    query = str(body.get("query", "")).strip() if isinstance(body, dict) else ""
+    if not query:
+        return JSONResponse({"error": "query is required"}, status_code=400)
+    try:
+        run = manager.start(request.path_params["thread_id"], query)
+    except RuntimeError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=409)
+    return JSONResponse(run.to_dict(), status_code=202)
+
+
+async def _get_run(request: Request) -> JSONResponse:
+    run = request.app.state.runs.runs.get(request.path_params["run_id"])
+    if run is None:
+        return JSONResponse({"error": "run not found"}, status_code=404)
+    return JSONResponse(run.to_dict())
+
+
+async def _run_events(request: Request):
+    run = request.app.state.runs.runs.get(request.path_params["run_id"])
+    if run is None:
+        return JSONResponse({"error": "run not found"}, status_code=404)
+
+    async def _stream() -> AsyncIterator[str]:
+        async for event in run.follow():
+            yield _sse(event)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def _cancel_run(request: Request) -> JSONResponse:
+    run = request.app.state.runs.cancel(request.path_params["run_id"])
+    if run is None:
+        return JSONResponse({"error": "run not found"}, status_code=404)
+    return JSONResponse(run.to_dict(), status_code=202)
+
+
+async def _metrics(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(get_metrics().render_prometheus())
+
+
+async def _health(request: Request) -> JSONResponse:
+    manager: RunManager = request.app.state.runs
+    active = sum(1 for run in manager.runs.values() if not run.done)
+    return JSONResponse({"status": "ok", "active_runs": active})
+
+
+@asynccontextmanager
+async def _lifespan(app: Starlette) -> AsyncIterator[None]:
+    if not get_settings().api_shared_mcp_session:
+        yield
+        return
+    async with shared_research_tools():
+        yield
+
+
+def create_app(graph=None, max_concurrent_runs: Optional[int] = None) -> Starlette:
+    app = Starlette(
+        lifespan=_lifespan,
+        routes=[
+            Route("/threads/{thread_id}/runs", _start_run, methods=["POST"]),
+            Route("/runs/{run_id}", _get_run, methods=["GET"]),
+            Route("/runs/{run_id}", _cancel_run, methods=["DELETE"]),
+            Route("/runs/{run_id}/events", _run_events, methods=["GET"]),
+            Route("/health", _health, methods=["GET"]),
+            Route("/metrics", _metrics, methods=["GET"]),
+        ],
+    )
+    app.state.runs = RunManager(graph, max_concurrent_runs)
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    cfg = get_settings()
+    logging.basicConfig(
+        level=cfg.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+    )
+    uvicorn.run(create_app(), host=cfg.api_host, port=cfg.api_port)
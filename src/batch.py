@@ -0,0 +1,217 @@
+"""Headless batch runner.
+
+Runs many research questions through one compiled graph, each on its own
+thread ID, with bounded concurrency. Results are appended to a JSONL file as
+they finish so an interrupted batch can be resumed.
+
+Usage::
+
+    python -m src.batch questions.txt --output results.jsonl --concurrency 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .config import get_settings
+from .graph import compile_graph
+from .recording import record_run
+from .state import initial_state
+from .usage import summarize_usage
+
+logger = logging.getLogger(__name__)
+
+
+def _query_id(query: str, occurrence: int) -> str:
+    key = f"{query}#{occurrence}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def load_queries(path: str) -> List[Dict[str, str]]:
+    """Reads queries from a text file (one per line) or a JSONL file.
+
+    JSONL lines must carry a ``query`` field and may carry an ``id``;
+    otherwise an ID is derived from the query text and how many times it
+    has appeared so far. A question repeated on two lines is run (and
+    resumed) twice, and inserting lines keeps the other queries' IDs.
+    """
+    queries: List[Dict[str, str]] = []
+    occurrences: Counter[str] = Counter()
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        record = json.loads(line) if line.startswith("{") else {"query": line}
+        query = str(record["query"])
+        occurrences[query] += 1
+        query_id = str(record.get("id") or _query_id(query, occurrences[query]))
+        queries.append({"id": query_id, "query": query})
+    return queries
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """IDs already answered successfully in a previous (partial) run."""
+    path = Path(output_path)
+    if not path.exists():
+        return set()
+    done: Set[str] = set()
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get("status") == "ok":
+            done.add(str(record.get("id")))
+    return done
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; returns 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _final_report(state: Dict[str, Any]) -> str:
+    messages = state.get("messages", [])
+    if not messages:
+        return ""
+    return str(messages[-1].content)
+
+
+async def _run_one(
+    graph,
+    item: Dict[str, str],
+    semaphore: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    cfg = get_settings()
+    config = {
+        "configurable": {"thread_id": f"batch-{item['id']}"},
+        "recursion_limit": cfg.recursion_limit,
+    }
+    async with semaphore:
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"id": item["id"], "query": item["query"]}
+        try:
+            state = initial_state(item["query"])
+            with record_run(config, state) as (run_config, _):
+                state = await graph.ainvoke(state, config=run_config)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Batch query %s failed: %s", item["id"], exc)
+            record.update({"status": "error", "error": str(exc), "report": ""})
+        else:
+            record.update({
+                "status": "ok",
+                "report": _final_report(state),
+                "loop_count": state.get("loop_count", 0),
+                "research_results": len(state.get("research_results", [])),
+                "usage": summarize_usage(state.get("usage")),
+            })
+        record["latency_s"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+async def run_batch(
+    queries: List[Dict[str, str]],
+    output_path: str,
+    concurrency: Optional[int] = None,
+    resume: bool = True,
+    graph=None,
+) -> Dict[str, Any]:
+    """Runs ``queries`` and appends one JSONL record per query to ``output_path``.
+
+    Returns aggregate stats for the queries executed in this invocation.
+    """
+    concurrency = concurrency or get_settings().batch_concurrency
+    skip = completed_ids(output_path) if resume else set()
+    pending = [item for item in queries if item["id"] not in skip]
+    if skip:
+        logger.info("Resuming batch: %d already complete", len(queries) - len(pending))
+
+    graph = graph or compile_graph()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+    latencies: List[float] = []
+    failed = 0
+    cost = 0.0
+    started = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as sink:
+        tasks = [_run_one(graph, item, semaphore) for item in pending]
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            sink.write(json.dumps(record) + "\n")
+            sink.flush()
+            if record["status"] == "ok":
+                latencies.append(record["latency_s"])
+                cost += record["usage"]["cost_usd"]
+            else:
+                failed += 1
+    wall = time.perf_counter() - started
+
+    return {
+        "total": len(queries),
+        "skipped": len(queries) - len(pending),
+        "completed": len(latencies),
+        "failed": failed,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "throughput_qpm": round(len(latencies) / wall * 60, 2) if wall > 0 else 0.0,
+        "p50_latency_s": percentile(latencies, 50),
+        "p95_latency_s": percentile(latencies, 95),
+        "cost_usd": round(cost, 6),
+    }
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run research queries in batch")
+    parser.add_argument("queries", help="Text (one query per line) or JSONL file")
+    parser.add_argument(
+        "--output",
+        default="./data/batch_results.jsonl",
+        help="JSONL file receiving one record per query.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum queries in flight (defaults to BATCH_CONCURRENCY).",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Re-run queries already completed in the output file.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    logging.basicConfig(
+        level=get_settings().log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+    )
+    stats = asyncio.run(
+        run_batch(
+            load_queries(args.queries),
+            args.output,
+            concurrency=args.concurrency,
+            resume=not args.no_resume,
+        )
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
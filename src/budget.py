@@ -0,0 +1,90 @@
+"""Per-run budgets: wall-clock deadline, tokens, cost and tool calls.
+
+Spend is derived from the state itself: elapsed time since
+``run_started_at`` and the usage records (``src.usage``) stamped after it.
+The graph's routers consult ``exhausted_budget`` and send the run to
+``final_report`` for a best-effort synthesis once any budget has less than
+``reserve_fraction`` of its limit left. A limit of ``0`` disables a budget.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from .config import Settings, get_settings
+from .usage import summarize_usage
+
+
+@dataclass(frozen=True)
+class RunBudget:
+    deadline_s: float = 0.0
+    max_tokens: int = 0
+    max_cost_usd: float = 0.0
+    max_tool_calls: int = 0
+    reserve_fraction: float = 0.2
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Settings] = None) -> "RunBudget":
+        cfg = settings or get_settings()
+        return cls(
+            deadline_s=cfg.run_deadline_s,
+            max_tokens=cfg.run_max_tokens,
+            max_cost_usd=cfg.run_max_cost_usd,
+            max_tool_calls=cfg.run_max_tool_calls,
+            reserve_fraction=cfg.budget_reserve_fraction,
+        )
+
+    def limits(self) -> Dict[str, float]:
+        return {
+            "deadline": self.deadline_s,
+            "tokens": self.max_tokens,
+            "cost": self.max_cost_usd,
+            "tool_calls": self.max_tool_calls,
+        }
+
+
+def run_spend(state: Mapping[str, Any], now: Optional[float] = None) -> Dict[str, float]:
+    """What the current run has used so far, per budget."""
+    started = state.get("run_started_at") or 0.0
+    records = {
+        key: record
+        for key, record in (state.get("usage") or {}).items()
+        if record.get("at", 0.0) >= started
+    }
+    totals = summarize_usage(records)
+    elapsed = (now or time.time()) - started if started else 0.0
+    return {
+        "deadline": elapsed,
+        "tokens": totals["input_tokens"] + totals["output_tokens"],
+        "cost": totals["cost_usd"],
+        "tool_calls": totals["tool_calls"],
+    }
+
+
+def exhausted_budget(
+    state: Mapping[str, Any],
+    budget: Optional[RunBudget] = None,
+) -> Optional[str]:
+    """Name of the first budget inside its reserve, or ``None``."""
+    budget = budget or RunBudget.from_settings()
+    limits = {name: limit for name, limit in budget.limits().items() if limit > 0}
+    if not limits:
+        return None
+    spend = run_spend(state)
+    for name, limit in limits.items():
+        if spend[name] >= limit * (1 - budget.reserve_fraction):
+            return name
+    return None
+
+
+def remaining_seconds(
+    state: Mapping[str, Any],
+    budget: Optional[RunBudget] = None,
+) -> Optional[float]:
+    """Seconds left before the deadline, or ``None`` without one."""
+    budget = budget or RunBudget.from_settings()
+    if budget.deadline_s <= 0 or not state.get("run_started_at"):
+        return None
+    return max(budget.deadline_s - run_spend(state)["deadline"], 0.0)
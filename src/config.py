@@ -32,6 +32,23 @@ class Settings(BaseSettings):
     google_api_key: str = ""
     default_model: str = "claude-3-haiku-20240307"
     default_temperature: float = 0.0
+    # Per-role models ("" uses default_model); see build_llm(role) in src/llm.py
+    supervisor_model: str = ""
+    researcher_model: str = ""
+    analyst_model: str = ""
+    summarizer_model: str = ""
+    draft_outline_model: str = ""
+    # Re-run the analyst on this model when its assessment is low-confidence
+    # or fails to parse ("" disables escalation).
+    analyst_escalation_model: str = ""
+    analyst_min_confidence: float = 0.6
+    # Mark cache breakpoints on stable system prompt prefixes; see src/llm.py
+    prompt_cache: bool = True
+    # Response cache for temperature-0 calls; see src/llm_cache.py
+    llm_cache_enabled: bool = False
+    llm_cache_path: str = "./data/llm_cache.sqlite"
+    llm_cache_ttl_s: float = 7 * 24 * 3600.0  # 0 keeps entries forever
+    llm_cache_max_entries: int = 10_000  # 0 disables eviction
 
     # LangSmith
     langsmith_api_key: str = ""
@@ -41,18 +58,95 @@ class Settings(BaseSettings):
     # Storage
     sqlite_db_path: str = "./data/app.db"
     chroma_path: str = "./data/chroma"
+    # Research text kept out of graph state; see src/content_store.py
+    content_store_enabled: bool = True
+    content_store_path: str = "./data/content.sqlite"
+    content_store_ttl_s: float = 30 * 24 * 3600.0  # since last use; 0 keeps forever
+    content_store_max_entries: int = 50_000  # 0 disables eviction
     chroma_embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # Semantic cache of completed reports (off | report | seed)
+    report_cache_mode: str = "off"
+    report_cache_min_similarity: float = 0.92
+    report_cache_max_age_s: float = 24 * 3600.0  # 0 accepts any age
+
+    # Offline stand-ins (see src/fakes): "fake" / "hash" run without network
+    llm_provider: str = "anthropic"
+    tool_provider: str = "mcp"
+    embedding_provider: str = "sentence-transformers"
+    fake_llm_latency_ms: float = 0.0
+    fake_llm_latency_jitter_ms: float = 0.0
+    fake_llm_latency_distribution: str = "fixed"
+    fake_llm_output_tokens: int = 120
+    fake_llm_research_rounds: int = 1
+    fake_llm_scrape_urls: int = 1
+    fake_llm_tool_rounds: int = 1
+    fake_llm_seed: int = 0
+    fake_tool_latency_ms: float = 0.0
+    fake_fixtures_path: Optional[str] = None
+
+    # Event log and replay (see src/recording.py, src/fakes/replay.py)
+    event_log_dir: str = ""
+    replay_log_path: str = ""
+    replay_preserve_latency: bool = True
 
     # MCP
     mcp_fetch_command: Optional[str] = None
     mcp_fetch_args: str = ""
+    # Tool cassette (off | auto | record | replay); see src/tools/cassette.py
+    tool_cassette_mode: str = "off"
+    tool_cassette_path: str = "./data/cassettes/tools.json"
+    tool_cassette_latency: str = "recorded"  # recorded | none
+    tool_cassette_tools: str = "duckduckgo_search,web_scraper"
+
+    # Parallel research branches for multi-entity questions (1 disables)
+    research_fanout: int = 1
+    # Researcher tool loop: rounds and calls per invocation, concurrent calls
+    # per round (0 runs a round's calls all at once)
+    researcher_max_tool_rounds: int = 3
+    researcher_max_tool_calls: int = 8
+    researcher_tool_concurrency: int = 4
+    # Repeat calls to these tools within a run are answered from a memo
+    tool_memo_tools: str = "duckduckgo_search,web_scraper"
+    # End the researcher's tool rounds once a round finds no new source
+    stagnation_stop: bool = True
+    # Route obvious supervisor states by rule instead of an LLM call
+    supervisor_fast_path: bool = True
 
     # Runtime
     log_level: str = "INFO"
     thread_id: str = "default"
     max_loop_count: int = 15
     max_context_messages: int = 6
+    # Incremental running summary (see summarizer_node); background runs it
+    # alongside the supervisor's next step instead of as its own step
+    summary_max_tokens: int = 400
+    # Prompt context packing (see src/context.py); 0 disables the token budget
+    context_max_tokens: int = 6000
+    context_dedup_threshold: float = 0.8
+    summarizer_background: bool = False
     recursion_limit: int = 25
+    batch_concurrency: int = 4
+    metrics_port: int = 0
+    profile_mode: str = "off"  # off | run | node; see src/profiling.py
+    profile_dir: str = "./data/profiles"
+    profile_interval_ms: float = 5.0
+
+    # Per-run budgets (0 disables); see src/budget.py
+    run_deadline_s: float = 0.0
+    run_max_tokens: int = 0
+    run_max_cost_usd: float = 0.0
+    run_max_tool_calls: int = 0
+    budget_reserve_fraction: float = 0.2
+
+    # HTTP API
+    api_host: str = "127.0.0.1"
+    api_port: int = 8000
+    api_max_concurrent_runs: int = 8
+    # Finished runs stay queryable for this long, and at most this many.
+    api_run_ttl_s: float = 3600.0
+    api_max_finished_runs: int = 1000
+    # One MCP tool server for the whole process instead of one per node call.
+    api_shared_mcp_session: bool = True
 
     # Retry
     max_retries: int = 3
@@ -0,0 +1,186 @@
+"""Content-addressed store for research text referenced from graph state.
+
+With ``CONTENT_STORE_ENABLED`` (the default), the researcher puts each tool
+output and summary into a SQLite table keyed by its SHA-256 and appends a
+compact reference to ``research_results`` instead of the text::
+
+    {"ref": "<sha256>", "source_url": "https://...", "excerpt": "<first 400 chars>"}
+
+Checkpoints then grow by a few hundred bytes per result however long the
+scraped pages are, and identical pages are stored once. Prompts call
+``materialize`` to load the full text; the final report's snippets only need
+``excerpt``. Plain strings are still accepted everywhere, so results from
+older checkpoints and the report cache keep working.
+
+Entries unused for ``CONTENT_STORE_TTL_S`` are deleted, and beyond
+``CONTENT_STORE_MAX_ENTRIES`` the least recently used go first; a checkpoint
+whose text was evicted falls back to the excerpts. The store is blocking
+SQLite, so async nodes call it through ``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+EXCERPT_CHARS = 400
+
+ResearchResult = Union[str, Dict[str, str]]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ContentStore:
+    """Research text in one SQLite table, keyed by content hash."""
+
+    def __init__(self, path: str, ttl_s: float = 0.0, max_entries: int = 0) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS content ("
+            " hash TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " source_url TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(content)")}
+        if "accessed_at" not in columns:
+            # Stores written before eviction existed: last use = creation.
+            self._conn.execute(
+                "ALTER TABLE content ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0"
+            )
+            self._conn.execute("UPDATE content SET accessed_at = created_at")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS content_accessed ON content (accessed_at)"
+        )
+        self._conn.commit()
+
+    def put(self, text: str, source_url: str = "unknown") -> Dict[str, str]:
+        """Stores ``text`` (once per distinct content) and returns its reference."""
+        return self.put_many([(text, source_url)])[0]
+
+    def put_many(self, items: Sequence[Tuple[str, str]]) -> List[Dict[str, str]]:
+        """Stores ``(text, source_url)`` pairs in one transaction."""
+        now = time.time()
+        refs = [
+            {"ref": content_hash(text), "source_url": source_url, "excerpt": text[:EXCERPT_CHARS]}
+            for text, source_url in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO content (hash, text, source_url, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (hash) DO UPDATE SET accessed_at = excluded.accessed_at",
+                [
+                    (ref["ref"], text, source_url, now, now)
+                    for ref, (text, source_url) in zip(refs, items)
+                ],
+            )
+            self._prune(now)
+            self._conn.commit()
+        return refs
+
+    def _prune(self, now: float) -> None:
+        if self.ttl_s:
+            self._conn.execute(
+                "DELETE FROM content WHERE accessed_at < ?", (now - self.ttl_s,)
+            )
+        if self.max_entries:
+            self._conn.execute(
+                "DELETE FROM content WHERE hash IN ("
+                " SELECT hash FROM content ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, str]:
+        digests = list(dict.fromkeys(digests))
+        if not digests:
+            return {}
+        placeholders = ",".join("?" for _ in digests)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT hash, text FROM content WHERE hash IN ({placeholders})",
+                digests,
+            ).fetchall()
+            self._conn.execute(
+                f"UPDATE content SET accessed_at = ? WHERE hash IN ({placeholders})",
+                [time.time(), *digests],
+            )
+            self._conn.commit()
+        return dict(rows)
+
+    def get(self, digest: str) -> Optional[str]:
+        return self.get_many([digest]).get(digest)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM content").fetchone()[0]
+
+
+_STORES: Dict[str, ContentStore] = {}
+
+
+def get_content_store() -> Optional[ContentStore]:
+    """The shared store, or ``None`` when results are kept inline."""
+    cfg = get_settings()
+    if not cfg.content_store_enabled:
+        return None
+    if cfg.content_store_path not in _STORES:
+        _STORES[cfg.content_store_path] = ContentStore(
+            cfg.content_store_path,
+            ttl_s=cfg.content_store_ttl_s,
+            max_entries=cfg.content_store_max_entries,
+        )
+    return _STORES[cfg.content_store_path]
+
+
+def to_research_results(items: Sequence[Tuple[str, str]]) -> List[ResearchResult]:
+    """What the researcher appends to ``research_results``, in one write.
+
+    Each ``(text, source_url)`` becomes a reference, or stays as the text
+    itself with the store disabled.
+    """
+    store = get_content_store()
+    if store is None or not items:
+        return [text for text, _ in items]
+    return list(store.put_many(items))
+
+
+def excerpt(result: ResearchResult) -> str:
+    return result.get("excerpt", "") if isinstance(result, dict) else str(result)
+
+
+def materialize(results: Sequence[ResearchResult]) -> List[str]:
+    """Full text of each result, loading references in one query.
+
+    A reference missing from the store (another machine's checkpoint, a
+    deleted database) falls back to its excerpt.
+    """
+    digests = [result["ref"] for result in results if isinstance(result, dict)]
+    store = get_content_store() if digests else None
+    texts = {} if store is None else store.get_many(digests)
+    missing = len(set(digests)) - len(texts)
+    if missing:
+        logger.warning("%d research references not found in the content store", missing)
+    return [
+        texts.get(result["ref"], result.get("excerpt", ""))
+        if isinstance(result, dict)
+        else str(result)
+        for result in results
+    ]
@@ -0,0 +1,156 @@
+"""Packs research passages into a prompt: deduplicated, ranked and budgeted.
+
+Research results and vector hits often repeat each other: the same scraped
+page comes back from retrieval, and researcher summaries restate tool
+output. ``select_passages`` drops any passage whose word shingles are mostly
+contained in a passage already kept (longer passages are considered first,
+so the fuller copy wins), ranks the rest by overlap with the query, and
+keeps the best ones that fit ``max_tokens``.
+
+That reshuffles which passages survive as research accumulates, so prompts
+with a cached prefix use ``select_stable`` instead: earlier passages always
+win, retrieval hits never displace research, and the budget trims the tail.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+from .config import get_settings
+from .metrics import get_metrics
+
+_WORD = re.compile(r"[a-z0-9]+")
+SHINGLE_WORDS = 5
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> FrozenSet[str]:
+    words = _words(text)
+    if len(words) <= size:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def containment(inner: FrozenSet[str], outer: FrozenSet[str]) -> float:
+    """Share of ``inner``'s shingles that also occur in ``outer``."""
+    if not inner:
+        return 1.0
+    return len(inner & outer) / len(inner)
+
+
+def relevance(text: str, query: str) -> float:
+    """Query-term overlap, damped by term frequency and passage length."""
+    terms = set(_words(query))
+    if not terms:
+        return 0.0
+    counts = Counter(_words(text))
+    score = sum(math.log1p(counts[term]) for term in terms)
+    return score / math.log(10 + sum(counts.values()))
+
+
+def select_passages(
+    passages: Sequence[str],
+    query: str = "",
+    max_tokens: Optional[int] = None,
+    threshold: Optional[float] = None,
+) -> List[int]:
+    """Indices of the passages to keep, in their original order.
+
+    ``max_tokens`` defaults to ``Settings.context_max_tokens`` (0 keeps all
+    unique passages) and ``threshold`` to ``Settings.context_dedup_threshold``.
+    """
+    cfg = get_settings()
+    max_tokens = cfg.context_max_tokens if max_tokens is None else max_tokens
+    threshold = cfg.context_dedup_threshold if threshold is None else threshold
+
+    signatures = [shingles(passage) for passage in passages]
+    unique: List[int] = []
+    for index in sorted(range(len(passages)), key=lambda i: -len(signatures[i])):
+        if not passages[index].strip():
+            continue
+        if any(containment(signatures[index], signatures[kept]) >= threshold for kept in unique):
+            get_metrics().increment("context.duplicates_dropped")
+            continue
+        unique.append(index)
+
+    if max_tokens <= 0:
+        return sorted(unique)
+    ranked = sorted(unique, key=lambda i: (-relevance(passages[i], query), i))
+    selected: List[int] = []
+    used = 0
+    for index in ranked:
+        cost = estimate_tokens(passages[index])
+        if used + cost > max_tokens:
+            get_metrics().increment("context.over_budget_dropped")
+            continue
+        selected.append(index)
+        used += cost
+    return sorted(selected)
+
+
+def select_stable(
+    research: Sequence[str],
+    volatile: Sequence[str],
+    max_tokens: Optional[int] = None,
+    threshold: Optional[float] = None,
+) -> Tuple[List[int], List[int]]:
+    """Indices of the ``research`` and ``volatile`` passages to keep.
+
+    For prompts whose research section is a cached prefix. Research is
+    deduplicated in order, so a passage is only dropped in favour of an
+    earlier one; a volatile passage (e.g. a vector hit) is dropped if it
+    repeats anything kept before it, never the reverse. The budget then
+    keeps research followed by volatile passages up to the first one that
+    does not fit, so only the tail is trimmed and a later loop's prompt
+    extends the previous one's prefix.
+    """
+    cfg = get_settings()
+    max_tokens = cfg.context_max_tokens if max_tokens is None else max_tokens
+    threshold = cfg.context_dedup_threshold if threshold is None else threshold
+
+    kept: List[Tuple[int, FrozenSet[str]]] = []
+    for index, passage in enumerate([*research, *volatile]):
+        if not passage.strip():
+            continue
+        signature = shingles(passage)
+        if any(containment(signature, other) >= threshold for _, other in kept):
+            get_metrics().increment("context.duplicates_dropped")
+            continue
+        kept.append((index, signature))
+
+    order = [index for index, _ in kept]
+    if max_tokens > 0:
+        passages = [*research, *volatile]
+        used = 0
+        for position, index in enumerate(order):
+            used += estimate_tokens(passages[index])
+            if used > max_tokens:
+                get_metrics().increment(
+                    "context.over_budget_dropped", len(order) - position
+                )
+                order = order[:position]
+                break
+    split = len(research)
+    return (
+        [index for index in order if index < split],
+        [index - split for index in order if index >= split],
+    )
+
+
+def pack_context(
+    passages: Sequence[str],
+    query: str = "",
+    max_tokens: Optional[int] = None,
+) -> List[str]:
+    """The passages ``select_passages`` keeps."""
+    return [passages[index] for index in select_passages(passages, query, max_tokens)]
@@ -0,0 +1,139 @@
+"""Fine-grained graph events for live output.
+
+Wraps LangGraph's ``astream_events`` and normalizes the raw callback events
+into a small vocabulary that front-ends can render or serialize:
+
+``node_start`` / ``node_end``  a graph node began / finished (with output)
+``token``                      an LLM text delta produced inside a node
+``tool_args``                  a delta of a tool call's JSON arguments; the
+                               analyst's structured output streams this way
+``llm_start`` / ``llm_end``    a chat model call began / finished (with usage)
+``tool_start`` / ``tool_end``  a tool call began / finished
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langchain_core.messages import BaseMessage
+
+GraphEvent = Dict[str, Any]
+
+_TOOL_OUTPUT_PREVIEW = 500
+
+
+def _text_delta(chunk: Any) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        if isinstance(block, dict) and block.get("type") == "text":
+            parts.append(str(block.get("text", "")))
+    return "".join(parts)
+
+
+def _tool_args_delta(chunk: Any) -> str:
+    """Partial JSON arguments of the tool calls in ``chunk``.
+
+    ``with_structured_output`` answers through a tool call, so its tokens
+    arrive here rather than as text. Providers that parse the deltas into
+    ``tool_call_chunks`` are read from there; otherwise the raw
+    ``input_json_delta`` content blocks are.
+    """
+    tool_chunks = getattr(chunk, "tool_call_chunks", None) or []
+    if tool_chunks:
+        return "".join(str(part.get("args") or "") for part in tool_chunks)
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return ""
+    return "".join(
+        str(block.get("partial_json", ""))
+        for block in content or []
+        if isinstance(block, dict) and block.get("type") == "input_json_delta"
+    )
+
+
+def _tool_output(output: Any) -> str:
+    content = getattr(output, "content", output)
+    return str(content)
+
+
+def normalize_event(raw: Dict[str, Any]) -> Optional[GraphEvent]:
+    """Maps one ``astream_events(version="v2")`` event to a GraphEvent."""
+    kind = raw.get("event", "")
+    name = raw.get("name", "")
+    metadata = raw.get("metadata", {}) or {}
+    data = raw.get("data", {}) or {}
+    node = metadata.get("langgraph_node", "")
+
+    if kind in {"on_chain_start", "on_chain_end"} and node and name == node:
+        if kind == "on_chain_start":
+            return {"type": "node_start", "node": node}
+        output = data.get("output")
+        if isinstance(output, tuple) and output:
+            output = output[0]
+        if not isinstance(output, dict):
+            return None
+        return {"type": "node_end", "node": node, "output": output}
+    if kind == "on_chat_model_stream":
+        chunk = data.get("chunk")
+        text = _text_delta(chunk)
+        if text:
+            return {"type": "token", "node": node, "text": text}
+        args = _tool_args_delta(chunk)
+        if args:
+            return {"type": "tool_args", "node": node, "text": args}
+        return None
+    if kind == "on_chat_model_start":
+        return {"type": "llm_start", "node": node, "model": name}
+    if kind == "on_chat_model_end":
+        output = data.get("output")
+        usage = getattr(output, "usage_metadata", None) or {}
+        return {"type": "llm_end", "node": node, "model": name, "usage": dict(usage)}
+    if kind == "on_tool_start":
+        return {
+            "type": "tool_start",
+            "node": node,
+            "tool": name,
+            "input": data.get("input", {}),
+        }
+    if kind == "on_tool_end":
+        return {
+            "type": "tool_end",
+            "node": node,
+            "tool": name,
+            "output": _tool_output(data.get("output", "")),
+        }
+    return None
+
+
+async def stream_events(
+    graph,
+    state: Dict[str, Any],
+    config: Dict[str, Any],
+) -> AsyncIterator[GraphEvent]:
+    async for raw in graph.astream_events(state, config=config, version="v2"):
+        event = normalize_event(raw)
+        if event is not None:
+            yield event
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseMessage):
+        return {"type": value.type, "content": value.content}
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def event_to_json(event: GraphEvent) -> str:
+    payload = _jsonable(event)
+    if event.get("type") == "tool_end":
+        payload["output"] = payload["output"][:_TOOL_OUTPUT_PREVIEW]
+    return json.dumps(payload)
@@ -0,0 +1,19 @@
+"""Deterministic offline stand-ins for the LLM, web tools and embeddings.
+
+Selected through ``Settings`` (``llm_provider="fake"``, ``tool_provider="fake"``,
+``embedding_provider="hash"``) so the full graph can run without network
+access for benchmarks and load tests. ``llm_provider="replay"`` and
+``tool_provider="replay"`` serve responses recorded by ``src.recording``.
+"""
+
+from .embeddings import HashEmbeddingFunction
+from .llm import ScriptedChatModel
+from .offline import configure_offline
+from .replay import ReplayChatModel
+
+__all__ = [
+    "HashEmbeddingFunction",
+    "ReplayChatModel",
+    "ScriptedChatModel",
+    "configure_offline",
+]
@@ -0,0 +1,47 @@
+"""Hash-based embedding function for offline runs.
+
+Produces deterministic bag-of-words vectors using the hashing trick, so
+Chroma can store and query without downloading a sentence-transformers
+model. Similar texts share tokens and therefore land close together.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from typing import Any, Dict, List
+
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import register_embedding_function
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@register_embedding_function
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [self._embed(text) for text in input]
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = int(hashlib.md5(token.encode()).hexdigest(), 16)
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dimensions] += sign
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    @staticmethod
+    def name() -> str:
+        return "orchestrator-hash"
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "HashEmbeddingFunction":
+        return HashEmbeddingFunction(dimensions=int(config.get("dimensions", 256)))
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"dimensions": self.dimensions}
@@ -0,0 +1,441 @@
+"""Scripted chat model that plays every agent role without a provider.
+
+The model recognizes which node is calling it from the system prompt and
+the bound tools/structured-output schema, and answers with a plausible,
+deterministic response:
+
+* Supervisor (``SupervisorDecision``): route to the researcher until the
+  analyst has produced a synthesis, then to the final report.
+* Researcher (tools bound): call search and ``scrape_urls`` scraper tools
+  for the user's question, then summarize once tool results are present.
+  With ``tool_rounds`` of 2 it searches first and scrapes in a second
+  round, like a model that reads the search results before choosing pages.
+* Analyst (``AnalystAssessment``): ask for more research until
+  ``research_rounds`` researcher summaries are visible, then synthesize.
+* Summarizer / draft outline: plain text.
+
+Latency is sampled per call from a configurable distribution and token
+usage is reported through ``usage_metadata`` like a real provider.
+
+Prompt caching is simulated the way Anthropic does it: blocks marked with
+``cache_control`` write the prefix up to that point (tools, then system,
+then messages) to a shared cache, and later calls read the longest cached
+prefix ending at a block boundary shortly before one of their breakpoints.
+Breakpoint placement is validated like the API: at most four per request
+and never on an empty text block.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+FINDINGS_MARKER = "[fake-findings"
+
+# Mirrors the API: breakpoints per request, blocks looked back from each
+# breakpoint for an earlier cached prefix, and the ephemeral cache lifetime.
+MAX_CACHE_BREAKPOINTS = 4
+CACHE_LOOKBACK_BLOCKS = 20
+PROMPT_CACHE_TTL_S = 300.0
+
+# Prefix hash -> expiry (monotonic seconds), shared by every model instance.
+_PROMPT_CACHE: Dict[str, float] = {}
+
+_FILLER = (
+    "the system trades durability for latency while the alternative favors "
+    "concurrency isolation and operational tooling under sustained load"
+).split()
+
+
+def message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        if isinstance(block, dict):
+            parts.append(str(block.get("text", "")))
+        else:
+            parts.append(str(block))
+    return "\n".join(parts)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _blocks(message: BaseMessage) -> List[Dict[str, Any]]:
+    if isinstance(message.content, str):
+        return [{"type": "text", "text": message.content}]
+    return [
+        block if isinstance(block, dict) else {"type": "text", "text": str(block)}
+        for block in message.content or []
+    ]
+
+
+def prompt_cache_usage(
+    messages: List[BaseMessage],
+    tools: Optional[List[Dict[str, Any]]] = None,
+    min_tokens: int = 0,
+    model: str = "",
+) -> tuple[int, int]:
+    """``(cache_read, cache_write)`` tokens for one request.
+
+    Tool schemas are hashed into the prefix but, like the rest of this
+    model's accounting, not counted as input tokens. Raises ``ValueError``
+    for breakpoint placements the API would reject.
+    """
+    # Caches are per model, like the API's.
+    prefix = hashlib.sha256(model.encode() + json.dumps(tools or [], sort_keys=True).encode())
+    boundaries: List[tuple[str, int]] = []
+    breakpoints: List[int] = []
+    tokens = 0
+    for message in messages:
+        for block in _blocks(message):
+            text = str(block.get("text", ""))
+            if block.get("cache_control"):
+                if block.get("type") == "text" and not text:
+                    raise ValueError("cache_control cannot be set for empty text blocks")
+                breakpoints.append(len(boundaries))
+            prefix.update(f"{message.type}\x00{text}\x00".encode())
+            tokens += estimate_tokens(text)
+            boundaries.append((prefix.hexdigest(), tokens))
+    if len(breakpoints) > MAX_CACHE_BREAKPOINTS:
+        raise ValueError(
+            f"A maximum of {MAX_CACHE_BREAKPOINTS} blocks with cache_control may be "
+            f"provided. Found {len(breakpoints)}."
+        )
+
+    now = time.monotonic()
+    read = 0
+    for index in breakpoints:
+        for candidate in range(index, max(-1, index - CACHE_LOOKBACK_BLOCKS), -1):
+            key, prefix_tokens = boundaries[candidate]
+            if _PROMPT_CACHE.get(key, 0.0) > now:
+                read = max(read, prefix_tokens)
+                break
+    written = read
+    for index in breakpoints:
+        key, prefix_tokens = boundaries[index]
+        if prefix_tokens < min_tokens:
+            continue
+        _PROMPT_CACHE[key] = now + PROMPT_CACHE_TTL_S
+        written = max(written, prefix_tokens)
+    return read, written - read
+
+
+class ScriptedChatModel(BaseChatModel):
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    latency_distribution: str = "fixed"
+    output_tokens: int = 120
+    research_rounds: int = 1
+    scrape_urls: int = 1
+    tool_rounds: int = 1
+    seed: int = 0
+    model: str = "scripted-fake"
+    # Shortest prefix that gets cached (Anthropic: 1024 for Sonnet/Opus).
+    prompt_cache_min_tokens: int = 1024
+    _rng: random.Random = PrivateAttr(default_factory=random.Random)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng.seed(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "seed": self.seed}
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Any = None, **kwargs: Any):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    # --- latency -------------------------------------------------------
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering."""
+        base = self.latency_ms
+        jitter = self.latency_jitter_ms
+        if self.latency_distribution == "uniform":
+            value = self._rng.uniform(base - jitter, base + jitter)
+        elif self.latency_distribution == "lognormal" and base > 0:
+            sigma = jitter / base if jitter else 0.25
+            value = base * self._rng.lognormvariate(0.0, sigma)
+        else:
+            value = base
+        return max(0.0, value) / 1000
+
+    # --- scripting -----------------------------------------------------
+
+    def _filler(self, seed_text: str, tokens: int) -> str:
+        offset = int(hashlib.sha1(seed_text.encode()).hexdigest(), 16)
+        words = [_FILLER[(offset + i) % len(_FILLER)] for i in range(max(0, tokens))]
+        return " ".join(words)
+
+    def _respond(self, messages: List[BaseMessage], **kwargs: Any) -> AIMessage:
+        system = "\n".join(
+            message_text(m) for m in messages if isinstance(m, SystemMessage)
+        )
+        tool_names = [
+            tool.get("function", {}).get("name", "") for tool in kwargs.get("tools") or []
+        ]
+        query = _last_human(messages)
+
+        if "SupervisorDecision" in tool_names:
+            return self._structured("SupervisorDecision", self._route(messages, query))
+        if "AnalystAssessment" in tool_names:
+            return self._structured("AnalystAssessment", self._assess(system, query))
+        if tool_names and "Researcher agent" in system:
+            wrap_up = (kwargs.get("tool_choice") or {}) == {"type": "none"}
+            return self._research(messages, tool_names, query, wrap_up)
+        return AIMessage(content=self._filler(system + query, self.output_tokens))
+
+    def _structured(self, name: str, args: Dict[str, Any]) -> AIMessage:
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": args, "id": _call_id(), "type": "tool_call"}],
+        )
+
+    def _route(self, messages: List[BaseMessage], query: str) -> Dict[str, Any]:
+        for message in reversed(messages):
+            try:
+                payload = json.loads(message_text(message))
+            except json.JSONDecodeError:
+                continue
+            if isinstance(payload, dict) and payload.get("needs_more_research") is False:
+                return {"next_agent": "final_report", "reasoning": "Synthesis ready."}
+            break
+        return {"next_agent": "researcher", "reasoning": f"Research needed for {query}."}
+
+    def _assess(self, system: str, query: str) -> Dict[str, Any]:
+        rounds_seen = system.count(FINDINGS_MARKER)
+        forced = "Do not ask for more research" in system
+        if rounds_seen < self.research_rounds and not forced:
+            return {
+                "needs_more_research": True,
+                "gaps": [f"Missing benchmark data for: {query}"],
+                "re_research_instructions": f"Find benchmark data for {query}",
+                "synthesis": "",
+                "confidence": 0.8,
+            }
+        synthesis = f"Synthesis for {query}: " + self._filler(query, self.output_tokens)
+        entities = re.split(r"\s+(?:vs\.?|versus|and)\s+", query, maxsplit=1)
+        if len(entities) == 2:
+            left = entities[0].split()[-1] if entities[0].split() else "A"
+            right = entities[1].split()[0] if entities[1].split() else "B"
+            synthesis += (
+                "\n\nCOMPARISON_DATA:\n"
+                f"Metric | {left} | {right}\n"
+                "Latency | Low | Moderate\n"
+                "Concurrency | Limited | High"
+            )
+        return {
+            "needs_more_research": False,
+            "gaps": [],
+            "re_research_instructions": "",
+            "synthesis": synthesis,
+            "confidence": 0.9,
+        }
+
+    def _research(
+        self,
+        messages: List[BaseMessage],
+        tool_names: List[str],
+        query: str,
+        wrap_up: bool = False,
+    ) -> AIMessage:
+        rounds = sum(1 for m in messages if isinstance(m, AIMessage) and m.tool_calls)
+        search = next((n for n in tool_names if n.endswith("duckduckgo_search")), None)
+        scraper = next((n for n in tool_names if n.endswith("web_scraper")), None)
+        staged = self.tool_rounds > 1 and search is not None and scraper is not None
+        last_is_tool = bool(messages) and isinstance(messages[-1], ToolMessage)
+        if wrap_up or (last_is_tool and rounds >= (2 if staged else 1)):
+            text = (
+                f"{FINDINGS_MARKER} #{rounds}] Findings for {query}: "
+                # Seeded by the transcript, so later passes report new findings.
+                + self._filler("".join(map(message_text, messages)), self.output_tokens)
+            )
+            return AIMessage(content=text)
+        calls = []
+        if search and not (staged and rounds):
+            calls.append({"name": search, "args": {"query": query}})
+        if scraper and not (staged and not rounds):
+            slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")[:40] or "topic"
+            for index in range(self.scrape_urls):
+                suffix = f"-{index + 1}" if index else ""
+                url = f"https://docs.example.com/{slug}{suffix}"
+                calls.append({"name": scraper, "args": {"url": url}})
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {**call, "id": _call_id(), "type": "tool_call"} for call in calls
+            ],
+        )
+
+    def _with_usage(
+        self,
+        messages: List[BaseMessage],
+        message: AIMessage,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> AIMessage:
+        input_tokens = sum(
+            estimate_tokens(str(block.get("text", "")))
+            for m in messages
+            for block in _blocks(m)
+        )
+        cache_read, cache_write = prompt_cache_usage(
+            messages, tools, self.prompt_cache_min_tokens, self.model
+        )
+        output_tokens = estimate_tokens(
+            message_text(message) + json.dumps([c["args"] for c in message.tool_calls])
+        )
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {
+                "cache_read": cache_read,
+                "cache_creation": cache_write,
+            },
+        }
+        message.response_metadata = {"model_name": self.model}
+        return message
+
+    # --- BaseChatModel hooks ---------------------------------------------
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.sample_latency())
+        message = self._with_usage(
+            messages, self._respond(messages, **kwargs), kwargs.get("tools")
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.sample_latency())
+        message = self._with_usage(
+            messages, self._respond(messages, **kwargs), kwargs.get("tools")
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": index,
+                        }
+                        for index, call in enumerate(message.tool_calls)
+                    ],
+                    usage_metadata=message.usage_metadata,
+                    response_metadata=message.response_metadata,
+                )
+            )
+            return
+        words = message_text(message).split(" ")
+        for index, word in enumerate(words):
+            last = index == len(words) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word if index == 0 else " " + word,
+                    usage_metadata=message.usage_metadata if last else None,
+                    response_metadata=message.response_metadata if last else {},
+                )
+            )
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.sample_latency())
+        message = self._with_usage(
+            messages, self._respond(messages, **kwargs), kwargs.get("tools")
+        )
+        for chunk in self._chunks(message):
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.sample_latency())
+        message = self._with_usage(
+            messages, self._respond(messages, **kwargs), kwargs.get("tools")
+        )
+        for chunk in self._chunks(message):
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+_QUERY_ECHO_RE = re.compile(
+    r"(?:Findings|Research needed|benchmark data) for (.+?)(?:: |\.\"|$)"
+)
+
+
+def _last_human(messages: List[BaseMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return message_text(message)
+    # Nodes replace the message list, so later agents may only see the
+    # question echoed in an earlier supervisor decision, finding or
+    # re-research instruction.
+    for message in reversed(messages):
+        match = _QUERY_ECHO_RE.search(message_text(message))
+        if match:
+            return match.group(1)
+    return ""
+
+
+def _call_id() -> str:
+    return f"call_{uuid.uuid4().hex[:12]}"
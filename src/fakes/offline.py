@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any
+
+from ..config import Settings, get_settings
+
+OFFLINE_CHROMA_PATH = "./data/chroma-offline"
+
+
+def configure_offline(settings: Settings | None = None, **overrides: Any) -> Settings:
+    """Switches the active settings to the offline stand-ins.
+
+    A separate Chroma path is used by default because a collection created
+    with the hash embedding cannot be reopened with sentence-transformers.
+    """
+    cfg = settings or get_settings()
+    cfg.llm_provider = "fake"
+    cfg.tool_provider = "fake"
+    cfg.embedding_provider = "hash"
+    if cfg.chroma_path == Settings.model_fields["chroma_path"].default:
+        cfg.chroma_path = OFFLINE_CHROMA_PATH
+    for name, value in overrides.items():
+        setattr(cfg, name, value)
+    return cfg
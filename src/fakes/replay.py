@@ -0,0 +1,177 @@
+"""Replays LLM responses and tool results from a recorded event log.
+
+``load_replay(path)`` indexes a log written by ``src.recording``: LLM
+responses are queued per graph node in recorded order, tool results per
+``(tool, normalized args)`` with a per-tool fallback queue. The queues are
+shared by every model and tool built during a replay, since agents build a
+fresh model on each call.
+
+Selected with ``LLM_PROVIDER=replay`` / ``TOOL_PROVIDER=replay`` and
+``REPLAY_LOG_PATH``; ``REPLAY_PRESERVE_LATENCY`` waits the recorded latency
+before answering.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from ..config import get_settings
+from ..tools.cassette import normalize_args
+
+_ANY_ARGS = {"type": "object", "properties": {}, "additionalProperties": True}
+
+
+class ReplayLog:
+    """Recorded responses, consumed in order as the replayed graph asks."""
+
+    def __init__(self, events: List[Dict[str, Any]]) -> None:
+        self._lock = threading.Lock()
+        self.llm: Dict[str, Deque[Tuple[Dict[str, Any], float]]] = defaultdict(deque)
+        self.tools: Dict[Tuple[str, str], Deque[Tuple[Any, float]]] = defaultdict(deque)
+        self.tools_by_name: Dict[str, Deque[Tuple[str, Any, float]]] = defaultdict(deque)
+        self.tool_names: List[str] = []
+
+        calls: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            kind = event.get("type")
+            if kind == "llm_response" and event.get("message"):
+                self.llm[event["node"]].append((event["message"], event.get("duration_s", 0.0)))
+            elif kind == "tool_call":
+                calls[event["run_id"]] = event
+                if event["tool"] not in self.tool_names:
+                    self.tool_names.append(event["tool"])
+            elif kind == "tool_result" and event.get("run_id") in calls:
+                call = calls.pop(event["run_id"])
+                key = normalize_args(call.get("args"))
+                entry = (event.get("output"), event.get("duration_s", 0.0))
+                self.tools[(call["tool"], key)].append(entry)
+                self.tools_by_name[call["tool"]].append((key, *entry))
+
+    def next_llm(self, node: str) -> Tuple[BaseMessage, float]:
+        with self._lock:
+            queue = self.llm.get(node)
+            if not queue:
+                raise LookupError(f"Replay log has no more LLM responses for node {node!r}")
+            payload, duration = queue.popleft()
+        return messages_from_dict([payload])[0], duration
+
+    def next_tool(self, name: str, args: Any) -> Tuple[Any, float]:
+        key = normalize_args(args)
+        with self._lock:
+            exact = self.tools.get((name, key))
+            if exact:
+                output, duration = exact.popleft()
+                self._discard(name, key)
+                return output, duration
+            # Arguments changed (e.g. a prompt tweak); fall back to call order.
+            fallback = self.tools_by_name.get(name)
+            if not fallback:
+                raise LookupError(f"Replay log has no more results for tool {name!r}")
+            recorded_key, output, duration = fallback.popleft()
+            self.tools[(name, recorded_key)].popleft()
+            return output, duration
+
+    def _discard(self, name: str, key: str) -> None:
+        queue = self.tools_by_name[name]
+        for index, entry in enumerate(queue):
+            if entry[0] == key:
+                del queue[index]
+                return
+
+
+_LOGS: Dict[str, ReplayLog] = {}
+
+
+def load_replay(path: Optional[str] = None, reload: bool = False) -> ReplayLog:
+    from ..recording import read_log
+
+    path = path or get_settings().replay_log_path
+    if not path:
+        raise ValueError("REPLAY_LOG_PATH is required for replay mode")
+    if reload or path not in _LOGS:
+        _LOGS[path] = ReplayLog(read_log(path))
+    return _LOGS[path]
+
+
+class ReplayChatModel(BaseChatModel):
+    log_path: str = ""
+    preserve_latency: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"log_path": self.log_path}
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Any = None, **kwargs: Any):
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    def _next(self, run_manager) -> Tuple[BaseMessage, float]:
+        node = ((run_manager.metadata if run_manager else None) or {}).get(
+            "langgraph_node", "unknown"
+        )
+        message, duration = load_replay(self.log_path).next_llm(node)
+        return message, duration if self.preserve_latency else 0.0
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, delay = self._next(run_manager)
+        time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, delay = self._next(run_manager)
+        await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _replay_tool(name: str, log_path: str, preserve_latency: bool) -> BaseTool:
+    async def _call(**kwargs: Any) -> Any:
+        output, duration = load_replay(log_path).next_tool(name, kwargs)
+        if preserve_latency:
+            await asyncio.sleep(duration)
+        return output
+
+    return StructuredTool.from_function(
+        coroutine=_call,
+        name=name,
+        description=f"Replays recorded results of {name}.",
+        args_schema=_ANY_ARGS,
+    )
+
+
+def replay_tools(log_path: Optional[str] = None) -> List[BaseTool]:
+    cfg = get_settings()
+    path = log_path or cfg.replay_log_path
+    return [
+        _replay_tool(name, path, cfg.replay_preserve_latency)
+        for name in load_replay(path).tool_names
+    ]
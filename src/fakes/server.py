@@ -0,0 +1,109 @@
+"""Fixture-backed stand-in for ``src.server``.
+
+Exposes the same MCP tool names as the real server, but search and scraping
+are answered from ``fixtures/web.json`` (or ``FAKE_FIXTURES_PATH``) with an
+optional simulated latency, so researcher runs are offline and repeatable.
+Memory tools use the regular vector store.
+
+Selected with ``TOOL_PROVIDER=fake``; runnable directly with
+``python -m src.fakes.server``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+from fastmcp import FastMCP
+
+from ..config import get_settings
+from ..tools.memory import get_vector_db
+
+logger = logging.getLogger(__name__)
+mcp = FastMCP("AgenticOrchestratorFake")
+
+_DEFAULT_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "web.json"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SCRAPE_LIMIT = 5000
+
+
+@lru_cache(maxsize=None)
+def _load_pages(path: str) -> List[Dict[str, str]]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))["pages"]
+
+
+def _pages() -> List[Dict[str, str]]:
+    return _load_pages(get_settings().fake_fixtures_path or str(_DEFAULT_FIXTURES))
+
+
+def _simulate_latency() -> None:
+    delay = get_settings().fake_tool_latency_ms
+    if delay > 0:
+        time.sleep(delay / 1000)
+
+
+def _score(query: str, page: Dict[str, str]) -> int:
+    terms = set(_WORD_RE.findall(query.lower()))
+    words = _WORD_RE.findall(f"{page['title']} {page['text']}".lower())
+    return sum(1 for word in words if word in terms)
+
+
+def search_pages(query: str, max_results: int = 5) -> str:
+    ranked = sorted(_pages(), key=lambda page: -_score(query, page))
+    lines = [
+        f"{page['title']} ({page['url']}): {page['text'][:160]}"
+        for page in ranked[:max_results]
+    ]
+    return "\n".join(lines)
+
+
+def scrape_page(url: str) -> str:
+    page = next((page for page in _pages() if page["url"] == url), None)
+    if page is not None:
+        return page["text"][:_SCRAPE_LIMIT]
+    # Unknown URLs get deterministic filler assembled from the fixtures so
+    # scraped size stays realistic without a network fetch.
+    offset = int(hashlib.sha1(url.encode()).hexdigest(), 16)
+    pages = _pages()
+    parts = [pages[(offset + i) % len(pages)]["text"] for i in range(len(pages))]
+    return f"Content of {url}. " + " ".join(parts)[:_SCRAPE_LIMIT]
+
+
+@mcp.tool()
+def duckduckgo_search(query: str, max_results: int = 5) -> str:
+    """Search the web using DuckDuckGo."""
+    _simulate_latency()
+    return search_pages(query, max_results)
+
+
+@mcp.tool()
+def web_scraper(url: str) -> str:
+    """Fetch a URL and return the first 5000 characters of page text."""
+    _simulate_latency()
+    return scrape_page(url)
+
+
+@mcp.tool()
+def store_research(text: str, source_url: str = "unknown") -> str:
+    """Embed and store research text in the vector database."""
+    return get_vector_db().store_research(
+        text=text,
+        source="web_scraper",
+        source_url=source_url,
+    )
+
+
+@mcp.tool()
+def retrieve_knowledge(query: str, k: int = 3) -> List[str]:
+    """Retrieve semantically similar research entries from the vector database."""
+    return get_vector_db().retrieve_knowledge(query=query, k=k)
+
+
+if __name__ == "__main__":
+    mcp.run()
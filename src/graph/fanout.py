@@ -0,0 +1,128 @@
+"""Parallel research over independent sub-questions.
+
+With ``Settings.research_fanout`` above 1, a supervisor decision to research
+a multi-entity question ("SQLite vs PostgreSQL for analytics") is split by
+``decompose_query`` into one sub-question per entity. Each runs as its own
+``research_branch`` node via ``Send``, in the same super-step, and
+``merge_research`` folds the branches' results back into
+``research_results`` before the analyst sees them.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any, Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.types import Overwrite, Send
+
+from ..agents.researcher import researcher_node
+from ..config import get_settings
+from ..state import AgentState
+from .nodes import _last_user_query
+
+logger = logging.getLogger(__name__)
+
+_COMPARE_PREFIX = re.compile(
+    r"^\s*(?:please\s+)?(?:compare|comparison of|contrast|evaluate)\s+", re.IGNORECASE
+)
+_VERSUS = re.compile(r"\s+(?:vs\.?|versus)\s+", re.IGNORECASE)
+_LIST_SEPARATOR = re.compile(r"\s*,\s*(?:and\s+)?|\s+(?:and|with|to)\s+", re.IGNORECASE)
+_QUALIFIER = re.compile(r"\s+((?:for|in|on|when|under|regarding)\s+.+)$", re.IGNORECASE)
+
+
+def decompose_query(query: str, width: int) -> List[str]:
+    """Splits a comparison into at most ``width`` independent sub-questions.
+
+    A trailing qualifier ("for analytics workloads") applies to every
+    entity. Questions that do not compare several entities come back as-is.
+    """
+    text = query.strip().rstrip("?.!").strip()
+    if width < 2 or not text:
+        return [query]
+    compared = _COMPARE_PREFIX.match(text)
+    body = text[compared.end():] if compared else text
+    qualifier = ""
+    match = _QUALIFIER.search(body)
+    if match:
+        qualifier = match.group(1)
+        body = body[: match.start()]
+    if _VERSUS.search(body):
+        entities = _VERSUS.split(body)
+    elif compared:
+        entities = _LIST_SEPARATOR.split(body)
+    else:
+        return [query]
+    entities = [entity.strip() for entity in entities if entity.strip()]
+    if len(entities) < 2:
+        return [query]
+    # More entities than branches: research neighbours together.
+    groups = [entities[index::width] for index in range(min(width, len(entities)))]
+    return [f"{' and '.join(group)} {qualifier}".strip() for group in groups]
+
+
+def fan_out(state: AgentState) -> List[Send] | str:
+    """Router target for research: parallel branches, or the single researcher."""
+    query = state.get("question") or _last_user_query(state)
+    sub_questions = decompose_query(query, get_settings().research_fanout)
+    if len(sub_questions) < 2:
+        return "researcher"
+    logger.info("Fanning research out over %d sub-questions", len(sub_questions))
+    return [
+        Send(
+            "research_branch",
+            {
+                **state,
+                "messages": [HumanMessage(content=sub_question)],
+                "research_results": [],
+                "branch_key": f"{index:02d}:{sub_question}",
+            },
+        )
+        for index, sub_question in enumerate(sub_questions)
+    ]
+
+
+async def research_branch_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs the researcher on one sub-question, reporting only its own findings.
+
+    Branches run concurrently, so they must not write the single-value
+    state keys; everything goes under ``research_branches``.
+    """
+    result = await researcher_node(state)
+    messages = result.get("messages") or []
+    return {
+        "research_branches": {
+            state["branch_key"]: {
+                "question": state["messages"][0].content,
+                "results": result.get("research_results", []),
+                "summary": str(messages[-1].content) if messages else "",
+                "tool_memo": result.get("tool_memo", {}),
+                "seen_sources": result.get("seen_sources", {}),
+            }
+        }
+    }
+
+
+def merge_research_node(state: AgentState) -> AgentState:
+    branches = state.get("research_branches") or {}
+    research_results = list(state.get("research_results", []))
+    tool_memo = dict(state.get("tool_memo") or {})
+    seen_sources = dict(state.get("seen_sources") or {})
+    sections: List[str] = []
+    # Keys start with the branch index, so sub-questions keep their order.
+    for _, branch in sorted(branches.items()):
+        research_results.extend(branch["results"])
+        tool_memo.update(branch.get("tool_memo", {}))
+        seen_sources.update(branch.get("seen_sources", {}))
+        if branch["summary"]:
+            sections.append(f"{branch['question']}:\n{branch['summary']}")
+    logger.info("Merged %d research branches", len(branches))
+    return {
+        "messages": [AIMessage(content="\n\n".join(sections))],
+        "research_results": research_results,
+        "tool_memo": tool_memo,
+        "seen_sources": seen_sources,
+        "research_branches": Overwrite({}),
+        "loop_count": state.get("loop_count", 0) + 1,
+    }
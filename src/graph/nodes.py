@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import json
 import re
 from typing import List, Optional
 
-from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import (
     AIMessage,
     BaseMessage,
@@ -15,7 +16,13 @@ from langchain_core.messages import (
 )
 from langchain_core.tools import BaseTool
 
+from ..agents.researcher import _normalize_content
+from ..budget import exhausted_budget
 from ..config import get_settings, llm_retry
+from ..content_store import excerpt, materialize, to_research_results
+from ..context import pack_context
+from ..llm import build_llm
+from ..metrics import get_metrics
 from ..state import AgentState, prune_messages
 from ..tools.memory import get_vector_db
 
@@ -66,8 +73,10 @@ def _extract_comparison_rows(text: str) -> List[List[str]]:
 
 
 SUMMARIZER_SYSTEM = """You are the Summarizer node.
-Condense the conversation into a concise running summary.
-Keep key decisions, tool outputs, and open questions.
+Fold the new messages into the existing running summary and return the
+updated summary only.
+Keep key decisions, tool outputs, and open questions; drop details that the
+new messages supersede.
 """
 
 DRAFT_OUTLINE_SYSTEM = """You are the Draft Outline node.
@@ -81,13 +90,8 @@ If possible, save the report using the filesystem tool.
 """
 
 
-def _build_llm() -> ChatAnthropic:
-    cfg = get_settings()
-    return ChatAnthropic(
-        model=cfg.default_model,
-        temperature=cfg.default_temperature,
-        api_key=cfg.anthropic_api_key,
-    )
+def _build_llm(role: str) -> BaseChatModel:
+    return build_llm(role)
 
 
 async def _run_tool_calls(
@@ -110,23 +114,159 @@ async def _run_tool_calls(
     return tool_messages
 
 
-def summarizer_node(state: AgentState) -> AgentState:
-    llm = _build_llm()
-    system_message = SystemMessage(content=SUMMARIZER_SYSTEM)
-    prior_messages = [
-        message
-        for message in prune_messages(state.get("messages", []))
-        if not isinstance(message, SystemMessage)
+def cache_lookup_node(state: AgentState) -> AgentState:
+    """Looks the question up in the semantic report cache.
+
+    In ``report`` mode a hit is surfaced as a completed analyst synthesis so
+    the graph goes straight to ``final_report``; in ``seed`` mode the cached
+    research results are handed to the normal loop. Follow-ups in a thread
+    that already has context (a running summary or earlier messages) are
+    not looked up: "what about latency?" means nothing without that context.
+    Their reports are not cached either.
+    """
+    cfg = get_settings()
+    query = _last_user_query(state)
+    messages = state.get("messages", [])
+    last_human = max(
+        (index for index, message in enumerate(messages) if isinstance(message, HumanMessage)),
+        default=0,
+    )
+    # The previous turn's report counts as context as much as its question.
+    earlier_context = [
+        message for message in messages[:last_human] if not isinstance(message, SystemMessage)
     ]
-    messages: List[BaseMessage] = [system_message] + prior_messages
+    if state.get("summary", "").strip() or earlier_context:
+        get_metrics().increment("report_cache.skips")
+        return {"report_cache": {"status": "skip", "query": query}}
+    try:
+        match = get_vector_db().find_report(
+            query,
+            min_similarity=cfg.report_cache_min_similarity,
+            max_age_s=cfg.report_cache_max_age_s,
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Report cache lookup failed: %s", exc)
+        match = None
+    if match is None:
+        get_metrics().increment("report_cache.misses")
+        return {"report_cache": {"status": "miss", "query": query}}
+
+    get_metrics().increment("report_cache.hits")
+    logger.info(
+        "Report cache hit (similarity %.3f) for %r, cached from %r",
+        match["similarity"],
+        query,
+        match["query"],
+    )
+    update: AgentState = {
+        "report_cache": {
+            "status": "hit",
+            "query": query,
+            "matched_query": match["query"],
+            "similarity": match["similarity"],
+            "cached_at": match["created_at"],
+        },
+        "research_results": to_research_results(
+            [(text, "unknown") for text in match["research_results"]]
+        ),
+    }
+    if cfg.report_cache_mode == "report":
+        payload = {
+            "needs_more_research": False,
+            "gaps": [],
+            "re_research_instructions": "",
+            "synthesis": match["synthesis"],
+        }
+        update["messages"] = list(state.get("messages", [])) + [
+            AIMessage(content=json.dumps(payload))
+        ]
+        update["needs_more_research"] = False
+    return update
+
+
+def _cache_report(state: AgentState, synthesis: Optional[str]) -> None:
+    cache = state.get("report_cache") or {}
+    # Only fresh, complete answers are worth serving to the next asker.
+    if cache.get("status") != "miss" or not synthesis or state.get("budget_stop"):
+        return
+    try:
+        get_vector_db().store_report(
+            cache.get("query", ""),
+            synthesis,
+            materialize(state.get("research_results", [])),
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to cache report: %s", exc)
 
-    @llm_retry()
-    def _invoke(msgs):
-        return llm.invoke(msgs)
 
-    response = _invoke(messages)
+def budget_stop_node(state: AgentState) -> AgentState:
+    """Records that a router cut the run short; final_report runs next."""
+    return {"budget_stop": exhausted_budget(state) or "run"}
 
-    logger.info("Summarizer updated running summary")
+
+def _unsummarized_messages(state: AgentState) -> List[BaseMessage]:
+    """Messages not yet folded into the running summary.
+
+    An inline summarization keeps only the question, which the summary
+    already covers.
+    """
+    messages = [m for m in state.get("messages", []) if not isinstance(m, SystemMessage)]
+    if (
+        state.get("summary")
+        and messages
+        and isinstance(messages[0], HumanMessage)
+        and messages[0].content == state.get("question")
+    ):
+        messages = messages[1:]
+    return messages
+
+
+def _clip_summary(text: str, max_tokens: int) -> str:
+    # ~4 characters per token; cut at a line or word boundary.
+    limit = max_tokens * 4
+    if max_tokens <= 0 or len(text) <= limit:
+        return text
+    clipped = text[:limit]
+    cut = max(clipped.rfind("\n"), clipped.rfind(" "))
+    return clipped[:cut] if cut > limit // 2 else clipped
+
+
+def summarizer_node(state: AgentState) -> AgentState:
+    """Folds the messages since the last summarization into ``summary``.
+
+    Inline, the summarizer is its own step and trims the message list to
+    the last question. With ``Settings.summarizer_background`` it runs
+    alongside the supervisor's next target and writes only ``summary``.
+    """
+    cfg = get_settings()
+    summary = state.get("summary", "").strip()
+    new_messages = _unsummarized_messages(state)
+    if new_messages:
+        transcript = "\n\n".join(
+            f"{message.type}: {_normalize_content(message.content)}" for message in new_messages
+        )
+        messages: List[BaseMessage] = [
+            SystemMessage(
+                content=SUMMARIZER_SYSTEM
+                + f"Keep the summary under {cfg.summary_max_tokens} tokens.\n"
+            ),
+            HumanMessage(
+                content=f"Existing summary:\n{summary or '(none)'}\n\n"
+                f"New messages:\n{transcript}"
+            ),
+        ]
+        llm = _build_llm("summarizer")
+
+        @llm_retry()
+        def _invoke(msgs):
+            return llm.invoke(msgs)
+
+        response = _invoke(messages)
+        summary = _clip_summary(_normalize_content(response.content).strip(), cfg.summary_max_tokens)
+        logger.info("Summarizer folded %d messages into the summary", len(new_messages))
+
+    if cfg.summarizer_background:
+        return {"summary": summary}
 
     # Preserve the last human message so context is not lost after summarization
     last_human_message = next(
@@ -137,7 +277,7 @@ def summarizer_node(state: AgentState) -> AgentState:
 
     return {
         "messages": new_messages,
-        "summary": response.content,
+        "summary": summary,
         "research_results": state.get("research_results", []),
         "needs_more_research": state.get("needs_more_research", False),
         "loop_count": state.get("loop_count", 0) + 1,
@@ -145,15 +285,17 @@ def summarizer_node(state: AgentState) -> AgentState:
 
 
 def draft_outline_node(state: AgentState) -> AgentState:
-    llm = _build_llm()
+    llm = _build_llm("draft_outline")
     system_parts = [DRAFT_OUTLINE_SYSTEM]
     summary = state.get("summary", "").strip()
     if summary:
         system_parts.append(f"Running summary:\n{summary}")
-    if state.get("research_results"):
-        results_text = "\n---\n".join(
-            str(result) for result in state["research_results"]
-        )
+    results = pack_context(
+        materialize(state.get("research_results", [])),
+        state.get("question") or _last_user_query(state),
+    )
+    if results:
+        results_text = "\n---\n".join(results)
         system_parts.append(f"Research results:\n{results_text}")
     system_message = SystemMessage(content="\n\n".join(system_parts))
     prior_messages = [
@@ -173,7 +315,6 @@ def draft_outline_node(state: AgentState) -> AgentState:
 
     return {
         "messages": [AIMessage(content=response.content)],
-        "summary": state.get("summary", ""),
         "research_results": state.get("research_results", []),
         "needs_more_research": state.get("needs_more_research", False),
         "loop_count": state.get("loop_count", 0) + 1,
@@ -182,7 +323,11 @@ def draft_outline_node(state: AgentState) -> AgentState:
 
 async def final_report_node(state: AgentState) -> AgentState:
     summary = state.get("summary", "").strip()
-    results = [str(result) for result in state.get("research_results", []) if result]
+    # Snippets need only each result's excerpt; every unique one is listed.
+    results = pack_context(
+        [excerpt(result) for result in state.get("research_results", []) if result],
+        max_tokens=0,
+    )
     # Build a more readable \"Research Results\" section by showing short,
     # plain-text snippets instead of full raw JSON/tool payloads.
     snippets: List[str] = []
@@ -219,15 +364,36 @@ async def final_report_node(state: AgentState) -> AgentState:
         report_parts.append("### 🔍 Analyst's Final Assessment")
         report_parts.append(synthesis)
 
+    budget = state.get("budget_stop")
+    if budget:
+        outcome = (
+            "this report is a best-effort synthesis"
+            if synthesis
+            else "this report only lists the research gathered so far"
+        )
+        report_parts.append(
+            f"> Research stopped early because the run's {budget} budget was "
+            f"nearly exhausted; {outcome}."
+        )
+
     report_parts.append("## Research Results")
     if snippets:
         report_parts.extend(snippets)
     else:
         report_parts.append("No research results available.")
 
+    # The analyst's retrieval is reused; only runs that skipped it query here.
+    # Hits from another question (a turn that skipped the analyst) are stale.
+    question = state.get("question") or _last_user_query(state)
+    source_hits = []
+    if state.get("vector_hits_query") == question:
+        source_hits = state.get("vector_hits") or []
     query = synthesis or summary or _last_user_query(state)
-    if query:
-        source_hits = get_vector_db().retrieve_knowledge_with_sources(query, k=6)
+    if not source_hits and query:
+        source_hits = await asyncio.to_thread(
+            get_vector_db().retrieve_knowledge_with_sources, query, k=6
+        )
+    if source_hits:
         urls: List[str] = []
         for hit in source_hits:
             url = (hit.get("source_url") or "").strip()
@@ -243,10 +409,10 @@ async def final_report_node(state: AgentState) -> AgentState:
 
     report = "\n\n".join(report_parts)
     logger.info("Final report generated")
+    await asyncio.to_thread(_cache_report, state, synthesis)
 
     return {
         "messages": [AIMessage(content=report)],
-        "summary": state.get("summary", ""),
         "research_results": state.get("research_results", []),
         "needs_more_research": False,
         "loop_count": state.get("loop_count", 0) + 1,
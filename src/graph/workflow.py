@@ -10,22 +10,50 @@ from langgraph.graph import END, StateGraph
 from ..agents.analyst import analyst_node
 from ..agents.researcher import researcher_node
 from ..agents.supervisor import supervisor_node
+from ..budget import exhausted_budget
 from ..config import get_settings
+from ..metrics import instrument_node
+from ..profiling import profile_node
 from ..state import AgentState
-from .nodes import draft_outline_node, final_report_node, summarizer_node
+from ..usage import track_usage
+from .fanout import fan_out, merge_research_node, research_branch_node
+from .nodes import (
+    budget_stop_node,
+    cache_lookup_node,
+    draft_outline_node,
+    final_report_node,
+    summarizer_node,
+)
 
 logger = logging.getLogger(__name__)
 
 def _needs_summarization(state: AgentState) -> bool:
     return len(state.get("messages", [])) > get_settings().max_context_messages
 
+def _budget_exhausted(state: AgentState, after: str) -> bool:
+    budget = exhausted_budget(state)
+    if budget:
+        logger.warning(
+            "Run %s budget nearly exhausted after %s, forcing final report",
+            budget,
+            after,
+        )
+    return budget is not None
+
+# Routers cannot write state, so a budget cut goes through ``budget_stop``,
+# which records it for final_report.
+
 def _route_after_supervisor(state: AgentState) -> str:
     if state.get("loop_count", 0) > get_settings().max_loop_count:
         logger.warning("Max loops reached after supervisor, forcing final report")
         return "final_report"
+    if _budget_exhausted(state, "supervisor"):
+        return "budget_stop"
     if _needs_summarization(state):
         return "summarizer"
+    return _next_agent(state)
 
+def _next_agent(state: AgentState) -> str:
     next_agent: Literal[
         "researcher", "analyst", "draft_outline", "final_report"
     ] = "researcher"
@@ -50,31 +78,82 @@ def _route_after_supervisor(state: AgentState) -> str:
 
     return next_agent
 
+def _route_after_supervisor_targets(state: AgentState):
+    """Supervisor router with research fan-out and background summarization."""
+    cfg = get_settings()
+    next_node = _route_after_supervisor(state)
+    background = next_node == "summarizer" and cfg.summarizer_background
+    if background:
+        next_node = _next_agent(state)
+    if next_node == "researcher" and cfg.research_fanout > 1:
+        next_node = fan_out(state)
+    if not background:
+        return next_node
+    # The summarizer only writes ``summary``, so it can share the step.
+    targets = next_node if isinstance(next_node, list) else [next_node]
+    return [*targets, "summarizer"]
+
 def _route_after_analyst(state: AgentState) -> str:
     if state.get("loop_count", 0) > get_settings().max_loop_count:
         logger.warning("Max loops reached after analyst, forcing final report")
         return "final_report"
+    if _budget_exhausted(state, "analyst"):
+        return "budget_stop"
     if state.get("needs_more_research"):
         return "researcher"
     return "final_report"
 
+def _route_after_summarizer(state: AgentState) -> str:
+    if _budget_exhausted(state, "summarizer"):
+        return "budget_stop"
+    return "supervisor"
+
+def _route_after_cache_lookup(state: AgentState) -> str:
+    hit = (state.get("report_cache") or {}).get("status") == "hit"
+    if hit and get_settings().report_cache_mode == "report":
+        return "final_report"
+    return "supervisor"
+
+def _node(name: str, node):
+    return instrument_node(name, profile_node(name, track_usage(node)))
+
 def build_graph() -> StateGraph:
     graph = StateGraph(AgentState)
-    graph.add_node("supervisor", supervisor_node)
-    graph.add_node("researcher", researcher_node)
-    graph.add_node("analyst", analyst_node)
-    graph.add_node("summarizer", summarizer_node)
-    graph.add_node("draft_outline", draft_outline_node)
-    graph.add_node("final_report", final_report_node)
-
-    graph.set_entry_point("supervisor")
-    graph.add_edge("researcher", "analyst")
+    graph.add_node("supervisor", _node("supervisor", supervisor_node))
+    graph.add_node("researcher", _node("researcher", researcher_node))
+    graph.add_node("analyst", _node("analyst", analyst_node))
+    graph.add_node("summarizer", _node("summarizer", summarizer_node))
+    graph.add_node("draft_outline", _node("draft_outline", draft_outline_node))
+    graph.add_node("final_report", _node("final_report", final_report_node))
+    graph.add_node("budget_stop", _node("budget_stop", budget_stop_node))
+
+    if get_settings().report_cache_mode != "off":
+        graph.add_node("cache_lookup", _node("cache_lookup", cache_lookup_node))
+        graph.set_entry_point("cache_lookup")
+        graph.add_conditional_edges("cache_lookup", _route_after_cache_lookup)
+    else:
+        graph.set_entry_point("supervisor")
     graph.add_edge("draft_outline", "final_report")
-    graph.add_edge("summarizer", "supervisor")
+    graph.add_edge("budget_stop", "final_report")
     graph.add_edge("final_report", END)
 
-    graph.add_conditional_edges("supervisor", _route_after_supervisor)
+    if get_settings().research_fanout > 1:
+        graph.add_node("research_branch", _node("research_branch", research_branch_node))
+        graph.add_node("merge_research", _node("merge_research", merge_research_node))
+        graph.add_edge("research_branch", "merge_research")
+        graph.add_edge("merge_research", "analyst")
+    if get_settings().research_fanout > 1 or get_settings().summarizer_background:
+        graph.add_conditional_edges("supervisor", _route_after_supervisor_targets)
+    else:
+        graph.add_conditional_edges("supervisor", _route_after_supervisor)
     graph.add_conditional_edges("analyst", _route_after_analyst)
+    # Research always goes to the analyst: inside the budget reserve it
+    # writes the final synthesis in one call, then _route_after_analyst stops.
+    graph.add_edge("researcher", "analyst")
+    if get_settings().summarizer_background:
+        graph.add_edge("summarizer", END)
+    else:
+        graph.add_conditional_edges("summarizer", _route_after_summarizer)
 
     return graph
 
@@ -3,23 +3,34 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import queue
+import threading
 import time
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import streamlit as st
-from langchain_core.messages import HumanMessage
 
 from src.config import get_settings
 from src.graph import compile_graph
+from src.state import next_turn_state
+from src.usage import summarize_usage, usage_since
 
 logger = logging.getLogger(__name__)
 
 _cfg = get_settings()
 _has_api_key = bool(_cfg.anthropic_api_key)
 
+_LOG_WINDOW = 15
+# While a turn runs, the script reruns at this interval to drain the worker's
+# queue, so widgets stay responsive between updates.
+_POLL_INTERVAL = 0.25
+
 _NODE_ICONS = {
+    "cache_lookup": "checking cache",
     "supervisor": "routing",
     "researcher": "searching",
+    "research_branch": "searching",
+    "merge_research": "merging",
     "analyst": "analyzing",
     "summarizer": "summarizing",
     "draft_outline": "outlining",
@@ -46,6 +57,16 @@ def _init_session() -> None:
         st.session_state.agent_log = []
     if "final_report" not in st.session_state:
         st.session_state.final_report = ""
+    if "turn_usage" not in st.session_state:
+        st.session_state.turn_usage = summarize_usage({})
+    if "thread_usage" not in st.session_state:
+        st.session_state.thread_usage = summarize_usage({})
+    if "run" not in st.session_state:
+        st.session_state.run = None
+    if "streamed" not in st.session_state:
+        st.session_state.streamed = []
+    if "run_error" not in st.session_state:
+        st.session_state.run_error = ""
 
 
 def _append_chat(role: str, content: str) -> None:
@@ -66,48 +87,105 @@ def _is_internal_message(content: str) -> bool:
     return False
 
 
-def _render_agent_log(placeholder, entries: List[Dict]) -> None:
-    if not entries:
-        placeholder.markdown("_No activity yet._")
-        return
-    with placeholder.container():
-        current_loop = None
-        for entry in entries[-15:]:
-            loop = entry.get("loop_count", 0)
-            if loop != current_loop:
-                current_loop = loop
-                st.markdown(f"**--- Loop {loop} ---**")
-            icon = _NODE_ICONS.get(entry["node"], "processing")
-            status_state = (
-                "complete" if entry.get("status") == "complete" else "running"
-            )
-            with st.status(
-                f"{entry['node']} ({icon})", state=status_state, expanded=False
-            ):
-                st.caption(entry["content"])
-                ts = entry.get("timestamp")
-                if ts:
-                    st.caption(
-                        f"at {time.strftime('%H:%M:%S', time.localtime(ts))}"
-                    )
-
-
-async def _run_graph_async(
-    graph,
-    state: Dict,
-    config: Dict,
-    log_placeholder,
-    status_placeholder,
-) -> Dict:
-    latest_state = dict(state)
-    _render_agent_log(log_placeholder, st.session_state.agent_log)
-    status = None
-    if hasattr(st, "status"):
-        status = status_placeholder.status("Running graph...", expanded=True)
-
-    try:
-        async for event in graph.astream(state, config=config):
-            for node_name, output in event.items():
+def _render_log_entry(entry: Dict) -> None:
+    icon = _NODE_ICONS.get(entry["node"], "processing")
+    status_state = "complete" if entry.get("status") == "complete" else "running"
+    with st.status(f"{entry['node']} ({icon})", state=status_state, expanded=False):
+        st.caption(entry["content"])
+        ts = entry.get("timestamp")
+        if ts:
+            st.caption(f"at {time.strftime('%H:%M:%S', time.localtime(ts))}")
+
+
+class _AgentLogView:
+    """Sidebar log that appends new entries instead of re-rendering history."""
+
+    def __init__(self, placeholder) -> None:
+        self._container = placeholder.container()
+        self._empty_note = None
+        self._rendered = 0
+        self._current_loop = None
+
+    def render(self, entries: List[Dict]) -> None:
+        if not entries:
+            if self._empty_note is None:
+                self._empty_note = self._container.empty()
+                self._empty_note.markdown("_No activity yet._")
+            return
+        if self._empty_note is not None:
+            self._empty_note.empty()
+            self._empty_note = None
+        if self._rendered == 0 and len(entries) > _LOG_WINDOW:
+            self._rendered = len(entries) - _LOG_WINDOW
+        with self._container:
+            for entry in entries[self._rendered:]:
+                loop = entry.get("loop_count", 0)
+                if loop != self._current_loop:
+                    self._current_loop = loop
+                    st.markdown(f"**--- Loop {loop} ---**")
+                _render_log_entry(entry)
+        self._rendered = len(entries)
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, str):
+        return content
+    parts: List[str] = []
+    for block in content or []:
+        if isinstance(block, dict) and block.get("type") == "text":
+            parts.append(str(block.get("text", "")))
+    return "".join(parts)
+
+
+class _GraphWorker:
+    """Runs one graph turn on a background thread and reports progress.
+
+    Events are pushed onto ``self.events`` as ``(kind, node, payload)``
+    tuples where ``kind`` is one of ``"node"``, ``"token"``, ``"error"`` or
+    ``"done"``. The Streamlit script polls the queue and renders as it goes.
+    """
+
+    def __init__(self, graph, state: Dict, config: Dict) -> None:
+        self.events: "queue.Queue[Tuple[str, str, Any]]" = queue.Queue()
+        self._graph = graph
+        self._state = state
+        self._config = config
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "_GraphWorker":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        latest_state = dict(self._state)
+        try:
+            asyncio.run(self._stream(latest_state))
+        except Exception as exc:  # noqa: BLE001
+            # Surface errors both in logs and in the returned state so the UI
+            # can display a clear message instead of silently falling back.
+            logger.exception("Graph execution failed in Streamlit: %s", exc)
+            latest_state["error"] = {
+                "type": "graph_failed",
+                "detail": str(exc),
+            }
+            self.events.put(("error", "", str(exc)))
+        self.events.put(("done", "", latest_state))
+
+    async def _stream(self, latest_state: Dict) -> None:
+        async for mode, chunk in self._graph.astream(
+            self._state,
+            config=self._config,
+            stream_mode=["updates", "messages"],
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                text = _chunk_text(message)
+                if text:
+                    node_name = metadata.get("langgraph_node", "")
+                    self.events.put(("token", node_name, text))
+                continue
+            for node_name, output in chunk.items():
                 # Mirror tuple handling from the CLI runner.
                 if isinstance(output, tuple):
                     try:
@@ -118,73 +196,90 @@ async def _run_graph_async(
                         continue
                 if not isinstance(output, dict):
                     continue
-
                 latest_state.update(output)
+                self.events.put(("node", node_name, output))
 
-                log_entry = f"{node_name} completed execution."
-                if "reasoning" in output:
-                    log_entry = f"{node_name}: {output['reasoning']}"
-                logger.info("Node: %s", node_name)
-
-                st.session_state.agent_log.append({
-                    "node": node_name,
-                    "content": log_entry,
-                    "status": "complete",
-                    "timestamp": time.time(),
-                    "loop_count": output.get("loop_count", 0),
-                })
-                _render_agent_log(log_placeholder, st.session_state.agent_log)
-                if status is not None:
-                    status.update(label=f"Running: {node_name}")
-
-                messages = output.get("messages", [])
-                if messages:
-                    last_msg = messages[-1]
-                else:
-                    last_msg = None
-
-                if node_name == "final_report" and last_msg is not None:
-                    st.session_state.final_report = str(last_msg.content)
-    except Exception as exc:  # noqa: BLE001
-        # Surface errors both in logs and in the returned state so the UI
-        # can display a clear message instead of silently falling back.
-        logger.exception("Graph execution failed in Streamlit: %s", exc)
-        latest_state["error"] = {
-            "type": "graph_failed",
-            "detail": str(exc),
-        }
-    finally:
-        if status is not None:
-            status.update(label="Completed", state="complete")
-
-    return latest_state
-
-
-def _run_graph(
-    graph,
-    state: Dict,
-    config: Dict,
-    log_placeholder,
-    status_placeholder,
-) -> Dict:
-    try:
-        return asyncio.run(
-            _run_graph_async(graph, state, config, log_placeholder, status_placeholder)
-        )
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
+
+def _drain_worker(worker: _GraphWorker) -> Optional[Dict]:
+    """Applies the worker's queued events to the session without blocking.
+
+    Returns the final graph state once the worker reports ``done``.
+    """
+    while True:
         try:
-            return loop.run_until_complete(
-                _run_graph_async(
-                    graph,
-                    state,
-                    config,
-                    log_placeholder,
-                    status_placeholder,
-                )
-            )
-        finally:
-            loop.close()
+            kind, node_name, payload = worker.events.get_nowait()
+        except queue.Empty:
+            return None
+        if kind == "token":
+            st.session_state.streamed.append((node_name, payload))
+        elif kind == "node":
+            st.session_state.streamed = []
+            log_entry = f"{node_name} completed execution."
+            if "reasoning" in payload:
+                log_entry = f"{node_name}: {payload['reasoning']}"
+            logger.info("Node: %s", node_name)
+            st.session_state.agent_log.append({
+                "node": node_name,
+                "content": log_entry,
+                "status": "complete",
+                "timestamp": time.time(),
+                "loop_count": payload.get("loop_count", 0),
+            })
+            messages = payload.get("messages", [])
+            if node_name == "final_report" and messages:
+                st.session_state.final_report = str(messages[-1].content)
+        elif kind == "error":
+            st.session_state.run_error = payload
+        elif kind == "done":
+            return payload
+
+
+def _finish_turn(run: Dict[str, Any], final_state: Dict) -> None:
+    graph = st.session_state.graph
+    snapshot = graph.get_state(run["config"])
+    thread_usage = (snapshot.values or {}).get("usage", {}) if snapshot else {}
+    final_state["usage"] = thread_usage
+    st.session_state.graph_state = final_state
+    st.session_state.turn_usage = summarize_usage(
+        usage_since(thread_usage, run["usage_before"])
+    )
+    st.session_state.thread_usage = summarize_usage(thread_usage)
+    st.session_state.streamed = []
+    st.session_state.run = None
+
+
+def _render_progress(status_placeholder, stream_placeholder) -> None:
+    log = st.session_state.agent_log
+    label = f"Running: {log[-1]['node']}" if log else "Running graph..."
+    status_placeholder.status(label, expanded=False)
+    streamed = st.session_state.streamed
+    if streamed:
+        node_name = streamed[-1][0]
+        stream_placeholder.markdown(f"**{node_name}** {''.join(t for _, t in streamed)}")
+
+
+def _render_usage(turn: Dict[str, Any], thread: Dict[str, Any]) -> None:
+    turn_col, thread_col = st.columns(2)
+    turn_col.metric("Turn cost", f"${turn['cost_usd']:.4f}")
+    thread_col.metric("Thread cost", f"${thread['cost_usd']:.4f}")
+    st.caption(
+        f"Turn: {turn['input_tokens']} in / {turn['output_tokens']} out tokens, "
+        f"{turn['calls']} calls. Thread: {thread['input_tokens']} in / "
+        f"{thread['output_tokens']} out tokens."
+    )
+    rows = [
+        {
+            "node": node,
+            "input": stats["input_tokens"],
+            "output": stats["output_tokens"],
+            "calls": stats["calls"],
+            "cost ($)": round(stats["cost_usd"], 4),
+        }
+        for node, stats in turn["by_node"].items()
+    ]
+    if rows:
+        st.caption("Last turn by node (most expensive first)")
+        st.dataframe(rows, hide_index=True)
 
 
 def main() -> None:
@@ -197,6 +292,13 @@ def main() -> None:
 
     cfg = get_settings()
 
+    run = st.session_state.run
+    if run is not None:
+        final_state = _drain_worker(run["worker"])
+        if final_state is not None:
+            _finish_turn(run, final_state)
+            run = None
+
     with st.sidebar:
         # --- Settings Panel ---
         with st.expander("Settings", expanded=False):
@@ -215,12 +317,15 @@ def main() -> None:
             st.session_state.max_loops_override = max_loops
             st.session_state.temperature_override = temperature
 
+        with st.expander("Token Usage", expanded=False):
+            _render_usage(st.session_state.turn_usage, st.session_state.thread_usage)
+
         st.header("Agent Thought Process")
         if st.button("Clear Logs"):
             st.session_state.agent_log = []
-        log_placeholder = st.empty()
         status_placeholder = st.empty()
-        _render_agent_log(log_placeholder, st.session_state.agent_log)
+        log_view = _AgentLogView(st.empty())
+        log_view.render(st.session_state.agent_log)
 
     # Main Chat Interface
     for entry in st.session_state.chat_history:
@@ -230,7 +335,8 @@ def main() -> None:
     # Only fall back to showing the last message as a \"report\" when there
     # is no real final_report and no explicit error from the graph.
     if (
-        not st.session_state.final_report
+        run is None
+        and not st.session_state.final_report
         and not st.session_state.graph_state.get("error")
     ):
         last_message = (
@@ -269,8 +375,14 @@ def main() -> None:
                 else:
                     st.info("No source references found in this report.")
 
+    if st.session_state.run_error:
+        st.error(f"Graph execution failed: {st.session_state.run_error}")
+
     # Input handling
-    user_input = st.chat_input("Ask the orchestrator about scaling, security, or architecture...")
+    user_input = st.chat_input(
+        "Ask the orchestrator about scaling, security, or architecture...",
+        disabled=run is not None,
+    )
     if user_input:
         _append_chat("user", user_input)
         graph = st.session_state.graph
@@ -279,35 +391,19 @@ def main() -> None:
             "recursion_limit": cfg.recursion_limit,
         }
 
-        current_state = dict(st.session_state.graph_state)
-        # Reset per-turn state
-        current_state["loop_count"] = 0
-        current_state["research_results"] = []
-        current_state["needs_more_research"] = True
-
-        # Clear messages to start fresh context for the new turn.
-        # Historical context is preserved in the 'summary' field.
-        current_state["messages"] = [HumanMessage(content=user_input)]
+        current_state = next_turn_state(st.session_state.graph_state, user_input)
 
         st.session_state.graph_state = current_state
+        st.session_state.run_error = ""
+        run = st.session_state.run = {
+            "worker": _GraphWorker(graph, current_state, config).start(),
+            "config": config,
+            "usage_before": dict(current_state.get("usage") or {}),
+        }
 
-        try:
-            with st.spinner("Running agents..."):
-                st.session_state.graph_state = _run_graph(
-                    graph,
-                    current_state,
-                    config,
-                    log_placeholder,
-                    status_placeholder,
-                )
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Graph execution failed in Streamlit: %s", exc)
-            st.session_state.graph_state = dict(st.session_state.graph_state)
-            st.session_state.graph_state["error"] = {
-                "type": "graph_failed",
-                "detail": str(exc),
-            }
-            st.error(f"Graph execution failed: {exc}")
+    if run is not None:
+        _render_progress(status_placeholder, st.empty())
+        time.sleep(_POLL_INTERVAL)
         st.rerun()
 
 
@@ -0,0 +1,110 @@
+"""Shared chat-model construction for every agent and node."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import SystemMessage
+
+from .config import get_settings
+from .llm_cache import get_llm_cache
+from .metrics import get_callback_handler
+from .usage import get_usage_handler
+
+
+# At most two of Anthropic's four cache breakpoints per request are used.
+_BREAKPOINT = {"type": "ephemeral"}
+
+
+def system_message(
+    stable: str,
+    growing: Sequence[str] = (),
+    volatile: Sequence[str] = (),
+) -> SystemMessage:
+    """Lays out a system prompt with its stable prefix first.
+
+    ``stable`` is the fixed role prompt (tools are sent ahead of it, so its
+    breakpoint covers the tool schemas too). ``growing`` sections only ever
+    gain items between loops, such as accumulated research; each is its own
+    block with a breakpoint after the last, so the previous loop's prefix is
+    still a cache hit. ``volatile`` sections (running summary, retrieval
+    results) come last and are never cached. With ``Settings.prompt_cache``
+    off, the sections are joined into a plain string.
+    """
+    growing = [section for section in growing if section]
+    volatile = [section for section in volatile if section]
+    if not get_settings().prompt_cache:
+        return SystemMessage(content="\n\n".join([stable, *growing, *volatile]))
+    blocks: List[Dict[str, Any]] = [
+        {"type": "text", "text": stable, "cache_control": _BREAKPOINT}
+    ]
+    blocks.extend({"type": "text", "text": section} for section in growing)
+    if growing:
+        blocks[-1]["cache_control"] = _BREAKPOINT
+    blocks.extend({"type": "text", "text": section} for section in volatile)
+    return SystemMessage(content=blocks)
+
+
+def _callbacks() -> list:
+    return [get_callback_handler(), get_usage_handler()]
+
+
+ROLES = ("supervisor", "researcher", "analyst", "summarizer", "draft_outline")
+
+
+def role_model(role: Optional[str]) -> str:
+    """The model configured for ``role`` (``<role>_model``), or ``""``."""
+    if role is None:
+        return ""
+    if role not in ROLES:
+        raise ValueError(f"Unknown model role: {role}")
+    return getattr(get_settings(), f"{role}_model")
+
+
+def build_llm(role: Optional[str] = None, model: Optional[str] = None) -> BaseChatModel:
+    """Builds the chat model selected by ``Settings.llm_provider``.
+
+    ``model`` wins over the role's configured model, which wins over
+    ``Settings.default_model``. Replay models never use the response cache:
+    they must consume the recorded responses in order.
+    """
+    cfg = get_settings()
+    override = model or role_model(role)
+    if cfg.llm_provider == "fake":
+        from .fakes.llm import ScriptedChatModel
+
+        # The fake only reports a model name when one was chosen explicitly,
+        # so usage is priced per tier.
+        extra = {"model": override} if override else {}
+        return ScriptedChatModel(
+            latency_ms=cfg.fake_llm_latency_ms,
+            latency_jitter_ms=cfg.fake_llm_latency_jitter_ms,
+            latency_distribution=cfg.fake_llm_latency_distribution,
+            output_tokens=cfg.fake_llm_output_tokens,
+            research_rounds=cfg.fake_llm_research_rounds,
+            scrape_urls=cfg.fake_llm_scrape_urls,
+            tool_rounds=cfg.fake_llm_tool_rounds,
+            seed=cfg.fake_llm_seed,
+            cache=get_llm_cache(),
+            callbacks=_callbacks(),
+            **extra,
+        )
+    if cfg.llm_provider == "replay":
+        from .fakes.replay import ReplayChatModel
+
+        return ReplayChatModel(
+            log_path=cfg.replay_log_path,
+            preserve_latency=cfg.replay_preserve_latency,
+            callbacks=_callbacks(),
+        )
+    if cfg.llm_provider != "anthropic":
+        raise ValueError(f"Unknown llm_provider: {cfg.llm_provider}")
+    return ChatAnthropic(
+        model=override or cfg.default_model,
+        temperature=cfg.default_temperature,
+        api_key=cfg.anthropic_api_key,
+        cache=get_llm_cache(),
+        callbacks=_callbacks(),
+    )
@@ -0,0 +1,158 @@
+"""Persistent response cache for deterministic chat-model calls.
+
+With ``LLM_CACHE_ENABLED=true`` and ``DEFAULT_TEMPERATURE=0``, ``build_llm()``
+attaches a ``SQLiteLLMCache`` to every model it builds. LangChain keys each
+lookup on the model's serialized parameters plus call kwargs (which include
+bound tools and structured-output schemas) and the messages with their IDs
+stripped; the cache hashes that pair into a single row key.
+
+Entries older than ``LLM_CACHE_TTL_S`` are treated as misses, and once the
+table grows past ``LLM_CACHE_MAX_ENTRIES`` the least recently used rows are
+evicted. Hits and misses are counted as ``llm_cache.hits`` /
+``llm_cache.misses``. Replayed responses are flagged with
+``response_metadata["llm_cache_hit"]`` so usage accounting does not bill them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from .config import get_settings
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT_KEY = "llm_cache_hit"
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def _encode(generations: Sequence[Generation]) -> Optional[str]:
+    payload = []
+    for generation in generations:
+        if not isinstance(generation, ChatGeneration):
+            return None
+        payload.append({
+            "message": message_to_dict(generation.message),
+            "generation_info": generation.generation_info,
+        })
+    return json.dumps(payload, default=str)
+
+
+def _decode(value: str) -> RETURN_VAL_TYPE:
+    generations = []
+    for item in json.loads(value):
+        message = messages_from_dict([item["message"]])[0]
+        # A fresh ID per call, so add_messages appends rather than replaces.
+        message.id = None
+        message.response_metadata = {**message.response_metadata, CACHE_HIT_KEY: True}
+        generations.append(
+            ChatGeneration(message=message, generation_info=item.get("generation_info"))
+        )
+    return generations
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain cache backed by one SQLite table, with TTL and LRU eviction."""
+
+    def __init__(self, path: str, ttl_s: float = 0.0, max_entries: int = 0) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_s and now - row[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+        if row is None:
+            get_metrics().increment("llm_cache.misses")
+            return None
+        get_metrics().increment("llm_cache.hits")
+        return _decode(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = _encode(return_val)
+        if value is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (cache_key(prompt, llm_string), value, now, now),
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+_CACHES: Dict[str, SQLiteLLMCache] = {}
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """The shared cache, or ``None`` when disabled or sampling is non-deterministic."""
+    cfg = get_settings()
+    if not cfg.llm_cache_enabled:
+        return None
+    if cfg.default_temperature != 0:
+        logger.debug("LLM cache skipped: temperature %s is not 0", cfg.default_temperature)
+        return None
+    if cfg.llm_cache_path not in _CACHES:
+        _CACHES[cfg.llm_cache_path] = SQLiteLLMCache(
+            cfg.llm_cache_path,
+            ttl_s=cfg.llm_cache_ttl_s,
+            max_entries=cfg.llm_cache_max_entries,
+        )
+    return _CACHES[cfg.llm_cache_path]
@@ -5,16 +5,22 @@ Python app acts as the Host, the SDK is the Client, and external tools are Serve
 
 from __future__ import annotations
 
+import argparse
 import asyncio
 import json
 import logging
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from langchain_core.messages import HumanMessage
 
 from .config import get_settings
+from .events import GraphEvent, event_to_json, stream_events
 from .graph import compile_graph
-from .state import AgentState
+from .metrics import get_metrics, start_metrics_server
+from .profiling import profile_run
+from .recording import record_run
+from .state import AgentState, next_turn_state
+from .usage import format_usage, summarize_usage, usage_since
 
 logger = logging.getLogger(__name__)
 
@@ -32,28 +38,101 @@ def _load_state(graph, config: Dict[str, Dict[str, str]]) -> Optional[AgentState
     return snapshot.values if snapshot and snapshot.values else None
 
 
-# CHANGED: Added 'async' and switched to 'async for' with 'astream'
+class _EventPrinter:
+    """Renders streamed graph events to stdout.
+
+    ``mode`` is ``"live"`` (tokens, tool calls and node markers), ``"quiet"``
+    (nothing until the final report) or ``"json"`` (one JSON event per line).
+    """
+
+    def __init__(self, mode: str = "live") -> None:
+        self.mode = mode
+        self._mid_line = False
+
+    def _newline(self) -> None:
+        if self._mid_line:
+            print()
+            self._mid_line = False
+
+    def __call__(self, event: GraphEvent) -> None:
+        if self.mode == "quiet":
+            return
+        if self.mode == "json":
+            print(event_to_json(event), flush=True)
+            return
+        kind = event["type"]
+        if kind == "node_start":
+            self._newline()
+            print(f"[{event['node']}]", flush=True)
+        elif kind in {"token", "tool_args"}:
+            print(event["text"], end="", flush=True)
+            self._mid_line = True
+        elif kind == "tool_start":
+            self._newline()
+            print(f"  -> {event['tool']} {json.dumps(event['input'], default=str)}")
+        elif kind == "tool_end":
+            print(f"  <- {event['tool']} ({len(event['output'])} chars)")
+        elif kind == "node_end":
+            self._newline()
+
+    def ask(self, prompt: str) -> str:
+        """Reads a reply from stdin, keeping stdout line-delimited JSON."""
+        if self.mode == "json":
+            print(event_to_json({"type": "input_required", "prompt": prompt}), flush=True)
+            return input()
+        self._newline()
+        return input(f"\n{prompt}")
+
+    def report(self, text: str) -> None:
+        if self.mode == "json":
+            print(event_to_json({"type": "final_report", "text": text}), flush=True)
+            return
+        self._newline()
+        print("\nFinal Report:\n")
+        print(text)
+
+    def metrics(self, thread_id: str) -> None:
+        if self.mode == "quiet":
+            return
+        if self.mode == "json":
+            snapshot = get_metrics().snapshot(thread_id)
+            print(json.dumps({"type": "metrics", "metrics": snapshot}), flush=True)
+            return
+        print()
+        print(get_metrics().format_summary(thread_id))
+
+    def usage(self, turn: Dict[str, Any], thread: Dict[str, Any]) -> None:
+        if self.mode == "quiet":
+            return
+        if self.mode == "json":
+            print(json.dumps({"type": "usage", "turn": turn, "thread": thread}), flush=True)
+            return
+        print(format_usage(turn, "turn"))
+        print(
+            f"Tokens (thread): in={thread['input_tokens']} out={thread['output_tokens']} "
+            f"calls={thread['calls']} cost=${thread['cost_usd']:.4f}"
+        )
+
+
 async def _stream_with_state(
-    graph, state: AgentState, config: Dict[str, Dict[str, str]]
+    graph,
+    state: AgentState,
+    config: Dict[str, Dict[str, str]],
+    printer: Optional[_EventPrinter] = None,
 ) -> AgentState:
     latest_state: AgentState = dict(state)
-    async for event in graph.astream(state, config=config):
-        for node_name, output in event.items():
-            if isinstance(output, tuple):
-                try:
-                    if not output:
-                        continue
-                    output = output[0]
-                except (IndexError, TypeError):
-                    continue
-            if not isinstance(output, dict):
-                continue
-            latest_state.update(output)
-            messages = output.get("messages", [])
-            if not messages:
-                continue
-            last_message = messages[-1]
-            logger.info("%s> %s", node_name, last_message.content)
+    async for event in stream_events(graph, state, config):
+        if printer is not None:
+            printer(event)
+        if event["type"] != "node_end":
+            continue
+        output = event["output"]
+        latest_state.update(output)
+        messages = output.get("messages", [])
+        if not messages:
+            continue
+        last_message = messages[-1]
+        logger.debug("%s> %s", event["node"], last_message.content)
     return latest_state
 
 def _extract_synthesis(state: AgentState) -> Optional[str]:
@@ -79,71 +158,110 @@ def _extract_synthesis(state: AgentState) -> Optional[str]:
     return None
 
 
-# CHANGED: Main loop now wrapped in an async function
-async def run_cli() -> None:
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Agentic Orchestrator CLI")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only print the final report.",
+    )
+    output.add_argument(
+        "--json-events",
+        action="store_true",
+        help="Print one JSON object per streamed event (for piping).",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["run", "node"],
+        help="Write CPU (folded stacks) and allocation profiles per turn or per node.",
+    )
+    parser.add_argument(
+        "--event-log",
+        metavar="DIR",
+        help="Write a structured JSONL event log per turn to DIR (replayable).",
+    )
+    return parser.parse_args(argv)
+
+
+async def run_cli(mode: str = "live") -> None:
     cfg = get_settings()
     _configure_logging()
+    printer = _EventPrinter(mode)
+    if cfg.metrics_port:
+        start_metrics_server(cfg.metrics_port)
     graph = compile_graph()
     config = {
         "configurable": {"thread_id": cfg.thread_id},
         "recursion_limit": cfg.recursion_limit,
     }
 
-    print("Agentic Orchestrator CLI. Type 'exit' to quit.")
+    prompt = "" if mode == "json" else "\nUser> "
+    if mode != "json":
+        print("Agentic Orchestrator CLI. Type 'exit' to quit.")
     while True:
         # Note: input() is blocking, which is fine for a simple CLI loop
-        user_input = input("\nUser> ").strip()
+        try:
+            user_input = input(prompt).strip()
+        except EOFError:
+            break
         if not user_input:
             continue
         if user_input.lower() in {"exit", "quit"}:
             break
 
-        current_state = _load_state(graph, config)
-        if not current_state:
-            current_state = {
-                "messages": [],
-                "summary": "",
-                "research_results": [],
-                "needs_more_research": True,
-                "loop_count": 0,
-            }
-        else:
-            # Reset per-turn research artifacts to avoid stale final reports.
-            current_state["research_results"] = []
-            current_state["summary"] = ""
-            current_state["needs_more_research"] = True
-            current_state["loop_count"] = 0
-
-        current_state["messages"] = list(current_state.get("messages", [])) + [
-            HumanMessage(content=user_input)
-        ]
-
-        # CHANGED: Await the async stream
-        current_state = await _stream_with_state(graph, current_state, config)
+        get_metrics().reset_thread(cfg.thread_id)
+        previous = _load_state(graph, config)
+        usage_before = dict((previous or {}).get("usage") or {})
+        current_state = next_turn_state(previous, user_input)
+
+        with profile_run(cfg.thread_id):
+            with record_run(config, current_state) as (run_config, _):
+                current_state = await _stream_with_state(
+                    graph, current_state, run_config, printer
+                )
 
         snapshot = graph.get_state(config)
+        synthesis = None
         if snapshot and snapshot.values:
             synthesis = _extract_synthesis(snapshot.values)
             if synthesis:
-                print("\nFinal Report:\n")
-                print(synthesis)
-                continue
+                printer.report(synthesis)
+        printer.metrics(cfg.thread_id)
+        thread_usage = (snapshot.values or {}).get("usage", {}) if snapshot else {}
+        printer.usage(
+            summarize_usage(usage_since(thread_usage, usage_before)),
+            summarize_usage(thread_usage),
+        )
+        if synthesis:
+            continue
 
         if snapshot and snapshot.next and "final_report" in snapshot.next:
-            approval = input(
-                "\nDraft outline ready. Approve or provide feedback: "
+            approval = printer.ask(
+                "Draft outline ready. Approve or provide feedback: "
             ).strip()
             if approval:
                 resume_state = snapshot.values or current_state
                 resume_state["messages"] = list(resume_state.get("messages", [])) + [
                     HumanMessage(content=approval)
                 ]
-                current_state = await _stream_with_state(graph, resume_state, config)
+                current_state = await _stream_with_state(
+                    graph, resume_state, config, printer
+                )
 
 
 if __name__ == "__main__":
-    # CHANGED: Entry point to start the asyncio event loop
+    args = _parse_args()
+    if args.profile:
+        get_settings().profile_mode = args.profile
+    if args.event_log:
+        get_settings().event_log_dir = args.event_log
+    cli_mode = "live"
+    if args.quiet:
+        cli_mode = "quiet"
+    elif args.json_events:
+        cli_mode = "json"
     try:
-        asyncio.run(run_cli())
+        asyncio.run(run_cli(cli_mode))
     except KeyboardInterrupt:
         print("\nExiting...")
\ No newline at end of file
@@ -0,0 +1,349 @@
+"""Latency and counter instrumentation.
+
+Timing spans wrap graph nodes, LLM calls, MCP tool calls and vector store
+operations. Each observation is recorded globally and for the graph thread
+it belongs to, so a single slow turn can be broken down by component.
+
+``get_metrics()`` returns the process-wide registry; it can be rendered as a
+CLI summary, as JSON, or in Prometheus text format through the optional
+local metrics endpoint (``Settings.metrics_port``).
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+GLOBAL_SCOPE = "*"
+
+_current_thread: ContextVar[Optional[str]] = ContextVar(
+    "orchestrator_thread_id", default=None
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing the q-th observation (capped at max)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for position, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                if position < len(self.buckets):
+                    return min(self.buckets[position], self.max)
+                return self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 6),
+            "max_s": round(self.max, 6),
+            "p50_s": round(self.quantile(0.5), 6),
+            "p95_s": round(self.quantile(0.95), 6),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._artifacts: Dict[Tuple[str, str], List[str]] = {}
+
+    def _scopes(self, thread_id: Optional[str]) -> List[str]:
+        thread_id = thread_id or _current_thread.get()
+        return [GLOBAL_SCOPE, thread_id] if thread_id else [GLOBAL_SCOPE]
+
+    def observe(self, name: str, seconds: float, thread_id: Optional[str] = None) -> None:
+        with self._lock:
+            for scope in self._scopes(thread_id):
+                histogram = self._histograms.setdefault((scope, name), Histogram())
+                histogram.observe(seconds)
+
+    def increment(
+        self,
+        name: str,
+        amount: float = 1,
+        thread_id: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            for scope in self._scopes(thread_id):
+                key = (scope, name)
+                self._counters[key] = self._counters.get(key, 0) + amount
+
+    def attach(self, name: str, path: str, thread_id: Optional[str] = None) -> None:
+        """Records the location of a file produced for a run (e.g. a profile)."""
+        with self._lock:
+            for scope in self._scopes(thread_id):
+                self._artifacts.setdefault((scope, name), []).append(path)
+
+    def snapshot(self, thread_id: Optional[str] = None) -> Dict[str, Any]:
+        scope = thread_id or GLOBAL_SCOPE
+        with self._lock:
+            return {
+                "histograms": {
+                    name: histogram.to_dict()
+                    for (owner, name), histogram in sorted(self._histograms.items())
+                    if owner == scope
+                },
+                "counters": {
+                    name: value
+                    for (owner, name), value in sorted(self._counters.items())
+                    if owner == scope
+                },
+                "artifacts": {
+                    name: list(paths)
+                    for (owner, name), paths in sorted(self._artifacts.items())
+                    if owner == scope
+                },
+            }
+
+    def reset_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for store in (self._histograms, self._counters, self._artifacts):
+                for key in [key for key in store if key[0] == thread_id]:
+                    del store[key]
+
+    def format_summary(self, thread_id: Optional[str] = None) -> str:
+        snapshot = self.snapshot(thread_id)
+        lines = [f"Metrics ({thread_id or 'global'}):"]
+        for name, stats in snapshot["histograms"].items():
+            lines.append(
+                f"  {name:<34} n={stats['count']:<4} p50={stats['p50_s']:.3f}s "
+                f"p95={stats['p95_s']:.3f}s total={stats['total_s']:.3f}s"
+            )
+        if snapshot["counters"]:
+            counters = " ".join(
+                f"{name}={value:g}" for name, value in snapshot["counters"].items()
+            )
+            lines.append(f"  counters: {counters}")
+        for name, paths in snapshot["artifacts"].items():
+            lines.extend(f"  {name}: {path}" for path in paths)
+        return "\n".join(lines)
+
+    def render_prometheus(self) -> str:
+        """Global-scope metrics in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for name, stats in snapshot["histograms"].items():
+            metric = "orchestrator_latency_seconds"
+            label = f'name="{name}"'
+            cumulative = 0
+            for bound, count in stats["buckets"].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{label}}} {stats['total_s']}")
+            lines.append(f"{metric}_count{{{label}}} {stats['count']}")
+        for name, value in snapshot["counters"].items():
+            lines.append(f'orchestrator_events_total{{name="{name}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+
+_REGISTRY: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    global _REGISTRY  # noqa: PLW0603
+    if _REGISTRY is None:
+        _REGISTRY = MetricsRegistry()
+    return _REGISTRY
+
+
+@contextmanager
+def span(name: str, thread_id: Optional[str] = None) -> Iterator[None]:
+    """Times the enclosed block and counts failures as ``<name>.errors``."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        get_metrics().increment(f"{name}.errors", thread_id=thread_id)
+        raise
+    finally:
+        get_metrics().observe(name, time.perf_counter() - started, thread_id)
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of ``span`` for sync and async callables."""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _thread_from_config(config: Optional[RunnableConfig]) -> Optional[str]:
+    configurable = (config or {}).get("configurable", {}) or {}
+    thread_id = configurable.get("thread_id")
+    return str(thread_id) if thread_id is not None else None
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """Wraps a graph node so it is timed and its thread ID is in context."""
+    metric = f"node.{name}"
+
+    if inspect.iscoroutinefunction(node):
+
+        @functools.wraps(node)
+        async def async_node(state: Dict[str, Any], config: RunnableConfig) -> Any:
+            token = _current_thread.set(_thread_from_config(config))
+            try:
+                with span(metric):
+                    return await node(state)
+            finally:
+                _current_thread.reset(token)
+
+        # LangGraph inspects the signature to decide whether to pass config;
+        # without this it would follow __wrapped__ to the original node.
+        del async_node.__wrapped__
+        return async_node
+
+    @functools.wraps(node)
+    def sync_node(state: Dict[str, Any], config: RunnableConfig) -> Any:
+        token = _current_thread.set(_thread_from_config(config))
+        try:
+            with span(metric):
+                return node(state)
+        finally:
+            _current_thread.reset(token)
+
+    del sync_node.__wrapped__
+    return sync_node
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times chat-model and tool runs reported through LangChain callbacks."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: Dict[UUID, Tuple[str, float, Optional[str]]] = {}
+
+    def _start(self, run_id: UUID, name: str, metadata: Optional[Dict[str, Any]]) -> None:
+        thread_id = (metadata or {}).get("thread_id") or _current_thread.get()
+        self._started[run_id] = (name, time.perf_counter(), thread_id)
+
+    def _finish(self, run_id: UUID, failed: bool = False) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        name, began, thread_id = started
+        registry = get_metrics()
+        registry.observe(name, time.perf_counter() - began, thread_id)
+        registry.increment(f"{name.split('.')[0]}.calls", thread_id=thread_id)
+        if failed:
+            registry.increment(f"{name}.errors", thread_id=thread_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node") or "unknown"
+        self._start(run_id, f"llm.{node}", metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, failed=True)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        name = (serialized or {}).get("name") or "unknown"
+        self._start(run_id, f"tool.{name}", metadata)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, failed=True)
+
+
+_HANDLER: Optional[MetricsCallbackHandler] = None
+
+
+def get_callback_handler() -> MetricsCallbackHandler:
+    global _HANDLER  # noqa: PLW0603
+    if _HANDLER is None:
+        _HANDLER = MetricsCallbackHandler()
+    return _HANDLER
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/metrics":
+            body = get_metrics().render_prometheus().encode()
+            content_type = "text/plain; version=0.0.4"
+        elif self.path.startswith("/metrics.json"):
+            body = json.dumps(get_metrics().snapshot()).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        logger.debug("metrics endpoint: " + format, *args)
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves ``/metrics`` (Prometheus) and ``/metrics.json`` in the background."""
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info("Metrics endpoint listening on http://%s:%d/metrics", host, port)
+    return server
@@ -0,0 +1,196 @@
+"""Opt-in sampling CPU and allocation profiling for graph runs.
+
+``Settings.profile_mode`` selects the granularity: ``"run"`` profiles each
+research turn as a whole, ``"node"`` profiles every graph node separately,
+``"off"`` (the default) does nothing. Each profiled span writes two files to
+``Settings.profile_dir``:
+
+* ``<label>.folded`` -- collapsed stacks (``frame;frame;frame count``) from a
+  background thread sampling ``sys._current_frames()``; load it in
+  speedscope or feed it to ``flamegraph.pl``.
+* ``<label>.alloc.txt`` -- the top allocation sites that grew during the
+  span, from a ``tracemalloc`` snapshot diff.
+
+The paths are attached to the run's metrics as artifacts. Only one span is
+profiled at a time; overlapping spans (concurrent runs) are skipped.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .config import get_settings
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+TOP_ALLOCATIONS = 25
+
+# Leaf frames of threads that are parked (blocked in C) rather than running
+# Python code: idle executor workers, the event loop's select, child waiters.
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("unix_events.py", "_do_waitpid"),
+}
+
+_active = threading.Lock()
+
+
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval into folded stacks."""
+
+    def __init__(self, interval_s: float = 0.005, include_idle: bool = False) -> None:
+        self.interval_s = interval_s
+        self.include_idle = include_idle
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        path = Path(code.co_filename)
+        return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+    def _is_idle(self, frame) -> bool:
+        return (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in _IDLE_LEAVES
+
+    def sample_once(self) -> None:
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            if not self.include_idle and self._is_idle(frame):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.sample_once()
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _allocation_report(
+    before: tracemalloc.Snapshot,
+    after: tracemalloc.Snapshot,
+    limit: int = TOP_ALLOCATIONS,
+) -> str:
+    stats = after.compare_to(before, "lineno")
+    grown = [stat for stat in stats if stat.size_diff > 0][:limit]
+    peak = tracemalloc.get_traced_memory()[1]
+    lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", ""]
+    lines.extend(str(stat) for stat in grown)
+    return "\n".join(lines) + "\n"
+
+
+def _safe_label(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", label).strip("-") or "run"
+
+
+@contextmanager
+def profile_span(label: str, thread_id: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """Profiles the enclosed block; yields the artifact paths once written."""
+    artifacts: Dict[str, str] = {}
+    if not _active.acquire(blocking=False):
+        logger.debug("Profiler busy; skipping %s", label)
+        yield artifacts
+        return
+
+    cfg = get_settings()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    profiler = SamplingProfiler(cfg.profile_interval_ms / 1000).start()
+    try:
+        yield artifacts
+    finally:
+        profiler.stop()
+        after = tracemalloc.take_snapshot()
+        report = _allocation_report(before, after)
+        if started_tracing:
+            tracemalloc.stop()
+        _active.release()
+
+        directory = Path(cfg.profile_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**6:06d}"
+        stem = f"{_safe_label(label)}-{stamp}"
+        folded = directory / f"{stem}.folded"
+        allocations = directory / f"{stem}.alloc.txt"
+        folded.write_text(profiler.folded(), encoding="utf-8")
+        allocations.write_text(report, encoding="utf-8")
+        artifacts.update({"cpu": str(folded), "alloc": str(allocations)})
+
+        registry = get_metrics()
+        registry.attach(f"profile.{label}.cpu", str(folded), thread_id)
+        registry.attach(f"profile.{label}.alloc", str(allocations), thread_id)
+        logger.info("Profile for %s written to %s", label, folded)
+
+
+@contextmanager
+def profile_run(thread_id: str) -> Iterator[Dict[str, str]]:
+    """Profiles a whole turn when ``profile_mode`` is ``"run"``."""
+    if get_settings().profile_mode != "run":
+        yield {}
+        return
+    with profile_span(f"run-{thread_id}", thread_id) as artifacts:
+        yield artifacts
+
+
+def profile_node(name: str, node: Callable) -> Callable:
+    """Wraps a graph node so it is profiled when ``profile_mode`` is ``"node"``."""
+
+    def _enabled() -> bool:
+        return get_settings().profile_mode == "node"
+
+    if inspect.iscoroutinefunction(node):
+
+        @functools.wraps(node)
+        async def async_node(state: Dict[str, Any]) -> Any:
+            if not _enabled():
+                return await node(state)
+            with profile_span(f"node-{name}"):
+                return await node(state)
+
+        return async_node
+
+    @functools.wraps(node)
+    def sync_node(state: Dict[str, Any]) -> Any:
+        if not _enabled():
+            return node(state)
+        with profile_span(f"node-{name}"):
+            return node(state)
+
+    return sync_node
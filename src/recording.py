@@ -0,0 +1,324 @@
+"""Structured JSONL event log for graph runs, and offline replay.
+
+When ``Settings.event_log_dir`` is set (or ``--event-log`` is passed to the
+CLI), every run writes one JSON object per line to
+``<event_log_dir>/<thread_id>-<timestamp>.jsonl``:
+
+* ``run_start`` / ``run_end`` -- thread, query and wall-clock time
+* ``node_start`` / ``node_end`` -- node name and digests of its input/output
+* ``llm_request`` / ``llm_response`` -- full messages, model and latency
+* ``tool_call`` / ``tool_result`` -- tool name, args, output and latency
+
+Every record carries ``t``, seconds since the run started. A log can be fed
+back through the real graph with ``python -m src.recording replay LOG``: the
+recorded LLM responses and tool results are served by
+``src.fakes.replay`` (``llm_provider="replay"``, ``tool_provider="replay"``)
+so code changes can be benchmarked against real traffic shapes offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, HumanMessage, message_to_dict
+
+from .config import get_settings
+from .events import _jsonable
+
+logger = logging.getLogger(__name__)
+
+
+def digest(value: Any) -> str:
+    """Short stable hash of a JSON-able view of ``value``."""
+    payload = json.dumps(_jsonable(value), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, BaseMessage):
+        return message_to_dict(value)
+    if isinstance(value, dict):
+        return {key: _serialize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_serialize(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _query(state: Any) -> str:
+    if not isinstance(state, dict):
+        return ""
+    for message in reversed(state.get("messages", [])):
+        if isinstance(message, HumanMessage):
+            return str(message.content)
+    return ""
+
+
+class EventRecorder(BaseCallbackHandler):
+    """Callback handler that appends structured run events to a JSONL file."""
+
+    run_inline = True
+
+    def __init__(self, path: str, thread_id: str = "") -> None:
+        self.path = path
+        self.thread_id = thread_id
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")  # noqa: SIM115
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._open: Dict[UUID, Tuple[str, float, str]] = {}
+
+    def _now(self) -> float:
+        return round(time.perf_counter() - self._origin, 6)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        record = {"t": self._now(), **record}
+        line = json.dumps(record, default=str)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[str, float, str]]:
+        opened = self._open.pop(run_id, None)
+        if opened is None:
+            return None
+        kind, started, name = opened
+        return kind, round(self._now() - started, 6), name
+
+    def start(self, state: Any) -> None:
+        self.write({
+            "type": "run_start",
+            "thread_id": self.thread_id,
+            "ts": time.time(),
+            "query": _query(state),
+            "input_digest": digest(state),
+        })
+
+    def close(self, status: str = "completed") -> None:
+        self.write({"type": "run_end", "status": status})
+        with self._lock:
+            self._file.close()
+
+    # --- graph nodes ------------------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if not node or kwargs.get("name") != node:
+            return
+        self._open[run_id] = ("node", self._now(), node)
+        self.write({"type": "node_start", "node": node, "input_digest": digest(inputs)})
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is None:
+            return
+        _, duration, node = finished
+        self.write({
+            "type": "node_end",
+            "node": node,
+            "duration_s": duration,
+            "output_digest": digest(outputs),
+        })
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is not None:
+            self.write({"type": "node_error", "node": finished[2], "error": str(error)})
+
+    # --- LLM calls ----------------------------------------------------------
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node") or "unknown"
+        self._open[run_id] = ("llm", self._now(), node)
+        self.write({
+            "type": "llm_request",
+            "node": node,
+            "run_id": str(run_id),
+            "model": metadata.get("ls_model_name", ""),
+            "messages": _serialize(messages[0] if messages else []),
+        })
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is None:
+            return
+        _, duration, node = finished
+        message = None
+        if response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+        self.write({
+            "type": "llm_response",
+            "node": node,
+            "run_id": str(run_id),
+            "duration_s": duration,
+            "message": _serialize(message),
+        })
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is not None:
+            self.write({"type": "llm_error", "node": finished[2], "error": str(error)})
+
+    # --- tool calls ---------------------------------------------------------
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, inputs=None, **kwargs):
+        name = (serialized or {}).get("name") or "unknown"
+        node = (metadata or {}).get("langgraph_node") or "unknown"
+        self._open[run_id] = ("tool", self._now(), name)
+        self.write({
+            "type": "tool_call",
+            "node": node,
+            "run_id": str(run_id),
+            "tool": name,
+            "args": _serialize(inputs) if inputs is not None else input_str,
+        })
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is None:
+            return
+        _, duration, name = finished
+        self.write({
+            "type": "tool_result",
+            "run_id": str(run_id),
+            "tool": name,
+            "duration_s": duration,
+            "output": _serialize(output),
+        })
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is not None:
+            self.write({"type": "tool_error", "tool": finished[2], "error": str(error)})
+
+
+def read_log(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _log_path(directory: str, thread_id: str) -> str:
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "-" for ch in thread_id)
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**6:06d}"
+    return str(Path(directory) / f"{safe}-{stamp}.jsonl")
+
+
+@contextmanager
+def record_run(
+    config: Dict[str, Any],
+    state: Any,
+) -> Iterator[Tuple[Dict[str, Any], Optional[EventRecorder]]]:
+    """Adds an ``EventRecorder`` to ``config`` when event logging is enabled.
+
+    Yields the (possibly extended) config and the recorder, or ``None`` when
+    ``Settings.event_log_dir`` is empty.
+    """
+    directory = get_settings().event_log_dir
+    if not directory:
+        yield config, None
+        return
+    thread_id = str(config.get("configurable", {}).get("thread_id", "run"))
+    recorder = EventRecorder(_log_path(directory, thread_id), thread_id)
+    recorded = {**config, "callbacks": list(config.get("callbacks") or []) + [recorder]}
+    recorder.start(state)
+    status = "failed"
+    try:
+        yield recorded, recorder
+        status = "completed"
+    except BaseException as exc:
+        status = "cancelled" if isinstance(exc, asyncio.CancelledError) else "failed"
+        raise
+    finally:
+        recorder.close(status)
+        logger.info("Event log written to %s", recorder.path)
+
+
+async def replay(path: str, preserve_latency: bool = True) -> Dict[str, Any]:
+    """Runs the real graph against the responses recorded in ``path``."""
+    from .events import stream_events
+    from .fakes.offline import configure_offline
+    from .fakes.replay import load_replay
+    from .graph import compile_graph
+    from .state import initial_state
+
+    events = read_log(path)
+    start = next((e for e in events if e["type"] == "run_start"), {})
+    end = next((e for e in reversed(events) if e["type"] == "run_end"), {})
+    recorded_nodes = [e["node"] for e in events if e["type"] == "node_start"]
+
+    with tempfile.TemporaryDirectory(prefix="replay-") as chroma_path:
+        configure_offline(
+            llm_provider="replay",
+            tool_provider="replay",
+            chroma_path=chroma_path,
+            replay_log_path=path,
+            replay_preserve_latency=preserve_latency,
+            event_log_dir="",
+        )
+        load_replay(path, reload=True)
+        graph = compile_graph()
+        config = {
+            "configurable": {"thread_id": f"replay-{start.get('thread_id', 'run')}"},
+            "recursion_limit": get_settings().recursion_limit,
+        }
+        replayed_nodes: List[str] = []
+        started = time.perf_counter()
+        async for event in stream_events(graph, initial_state(start.get("query", "")), config):
+            if event["type"] == "node_start":
+                replayed_nodes.append(event["node"])
+        wall = time.perf_counter() - started
+
+    return {
+        "log": path,
+        "query": start.get("query", ""),
+        "preserve_latency": preserve_latency,
+        "recorded_wall_s": end.get("t"),
+        "replayed_wall_s": round(wall, 4),
+        "llm_calls": sum(1 for e in events if e["type"] == "llm_response"),
+        "tool_calls": sum(1 for e in events if e["type"] == "tool_result"),
+        "recorded_nodes": recorded_nodes,
+        "replayed_nodes": replayed_nodes,
+        "diverged": recorded_nodes != replayed_nodes,
+    }
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a recorded event log")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay_parser = sub.add_parser("replay", help="Re-run a log through the real graph.")
+    replay_parser.add_argument("log", help="JSONL event log to replay.")
+    replay_parser.add_argument(
+        "--no-latency",
+        action="store_true",
+        help="Answer immediately instead of waiting the recorded latency.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    logging.basicConfig(
+        level=get_settings().log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+    )
+    result = asyncio.run(replay(args.log, preserve_latency=not args.no_latency))
+    print(json.dumps(result, indent=2))
+    return 1 if result["diverged"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,18 +1,85 @@
 from __future__ import annotations
 
-from typing import List, TypedDict
+import time
+from typing import Annotated, Any, Dict, List, Optional, TypedDict
 
-from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
 from .config import get_settings
+from .content_store import ResearchResult
+from .usage import merge_usage
+
+
+def merge_branches(
+    left: Optional[Dict[str, Dict[str, Any]]],
+    right: Optional[Dict[str, Dict[str, Any]]],
+) -> Dict[str, Dict[str, Any]]:
+    """State reducer: parallel research branches each add their own key."""
+    return {**(left or {}), **(right or {})}
 
 
 class AgentState(TypedDict):
     messages: List[BaseMessage]
+    # The current turn's question, recorded by the supervisor.
+    question: str
     summary: str
-    research_results: List[str]
+    # Content-store references (or plain text); see src/content_store.py
+    research_results: List[ResearchResult]
     needs_more_research: bool
     loop_count: int
+    run_started_at: float
+    # Set by the cache_lookup node: status (off | skip | miss | hit), query, match.
+    report_cache: Dict[str, Any]
+    # Vector DB hits retrieved by the analyst, reused for the report's sources
+    # while ``vector_hits_query`` is still the turn's question.
+    vector_hits: List[Dict[str, str]]
+    vector_hits_query: str
+    # Per-run duplicate-work tracking: memoized tool results by call key and
+    # the loop each source was first seen in.
+    tool_memo: Dict[str, ResearchResult]
+    seen_sources: Dict[str, int]
+    # The budget whose exhaustion made a router cut the run short, if any.
+    budget_stop: str
+    # Findings of parallel research branches awaiting merge_research.
+    research_branches: Annotated[Dict[str, Dict[str, Any]], merge_branches]
+    # LLM usage records keyed by run ID, accumulated across the thread.
+    usage: Annotated[Dict[str, Dict[str, Any]], merge_usage]
+
+
+def initial_state(query: str = "") -> AgentState:
+    """Fresh per-turn state, optionally seeded with the user's question."""
+    return {
+        "messages": [HumanMessage(content=query)] if query else [],
+        "question": query,
+        "summary": "",
+        "research_results": [],
+        "needs_more_research": True,
+        "loop_count": 0,
+        "run_started_at": time.time(),
+        "report_cache": {},
+        "vector_hits": [],
+        "vector_hits_query": "",
+        "tool_memo": {},
+        "seen_sources": {},
+        "budget_stop": "",
+        "research_branches": {},
+        "usage": {},
+    }
+
+
+def next_turn_state(previous: Optional[Dict[str, Any]], query: str) -> AgentState:
+    """State for a thread's next turn, asking ``query``.
+
+    The conversation and usage carry over; everything else is per turn and
+    starts fresh as in ``initial_state``, so a turn never sees the previous
+    question's research, summary, retrieval hits or budget flags.
+    """
+    if not previous:
+        return initial_state(query)
+    state = {**previous, **initial_state(query)}
+    state["messages"] = list(previous.get("messages", [])) + [HumanMessage(content=query)]
+    state["usage"] = dict(previous.get("usage") or {})
+    return state
 
 
 def prune_messages(
@@ -0,0 +1,144 @@
+"""Record/replay cassette for web-facing MCP tools.
+
+Search and scrape results change from minute to minute, which makes
+researcher latency comparisons noisy. With ``TOOL_CASSETTE_MODE`` enabled,
+``get_research_tools()`` wraps the tools listed in ``TOOL_CASSETTE_TOOLS``
+(matched by suffix, so ``local_mcp_web_scraper`` matches ``web_scraper``)
+so that each call is looked up in a JSON cassette keyed by tool name and
+normalized args:
+
+* ``auto``   -- replay hits, call the real tool and record on a miss
+* ``record`` -- always call the real tool and (re-)record the result
+* ``replay`` -- replay only; a miss is returned as a tool error
+
+Replayed results wait the originally observed latency unless
+``TOOL_CASSETTE_LATENCY=none``. Memory tools are never wrapped because they
+read and write the local vector store.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+
+from ..config import get_settings
+from ..metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("off", "auto", "record", "replay")
+
+
+def normalize_args(args: Any) -> str:
+    """Canonical JSON for tool args, so key order does not matter."""
+    if isinstance(args, str):
+        try:
+            args = json.loads(args)
+        except json.JSONDecodeError:
+            return args
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+def cassette_key(tool: str, args: Any) -> str:
+    return f"{tool}:{normalize_args(args)}"
+
+
+class Cassette:
+    """JSON file of recorded tool results, saved after every new recording."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if Path(path).exists():
+            payload = json.loads(Path(path).read_text(encoding="utf-8"))
+            self.entries = payload.get("entries", {})
+
+    def get(self, tool: str, args: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.entries.get(cassette_key(tool, args))
+
+    def put(self, tool: str, args: Any, output: Any, latency_s: float) -> None:
+        entry = {
+            "tool": tool,
+            "args": args,
+            "output": output,
+            "latency_s": round(latency_s, 6),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self.entries[cassette_key(tool, args)] = entry
+            self._save()
+
+    def _save(self) -> None:
+        target = Path(self.path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        scratch = target.with_suffix(target.suffix + ".tmp")
+        scratch.write_text(
+            json.dumps({"version": 1, "entries": self.entries}, indent=2, default=str),
+            encoding="utf-8",
+        )
+        os.replace(scratch, target)
+
+
+_CASSETTES: Dict[str, Cassette] = {}
+
+
+def get_cassette(path: Optional[str] = None) -> Cassette:
+    path = path or get_settings().tool_cassette_path
+    if path not in _CASSETTES:
+        _CASSETTES[path] = Cassette(path)
+    return _CASSETTES[path]
+
+
+def _wrap(tool: BaseTool, cassette: Cassette, mode: str, replay_latency: bool) -> BaseTool:
+    async def _call(**kwargs: Any) -> Any:
+        if mode != "record":
+            entry = cassette.get(tool.name, kwargs)
+            if entry is not None:
+                get_metrics().increment("cassette.hits")
+                if replay_latency:
+                    await asyncio.sleep(entry["latency_s"])
+                return entry["output"]
+            get_metrics().increment("cassette.misses")
+            if mode == "replay":
+                raise ToolException(f"No cassette entry for {tool.name} {normalize_args(kwargs)}")
+        started = time.perf_counter()
+        # Callbacks stay on the wrapper so the call is only reported once.
+        output = await tool.ainvoke(kwargs, config={"callbacks": []})
+        cassette.put(tool.name, kwargs, output, time.perf_counter() - started)
+        logger.debug("Recorded %s into cassette %s", tool.name, cassette.path)
+        return output
+
+    return StructuredTool.from_function(
+        coroutine=_call,
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        handle_tool_error=True,
+    )
+
+
+def apply_cassette(tools: List[BaseTool]) -> List[BaseTool]:
+    """Wraps the configured web tools with the cassette; no-op when off."""
+    cfg = get_settings()
+    mode = cfg.tool_cassette_mode
+    if mode == "off":
+        return tools
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"Unknown tool_cassette_mode: {mode}")
+    cassette = get_cassette()
+    suffixes = tuple(name.strip() for name in cfg.tool_cassette_tools.split(",") if name.strip())
+    replay_latency = cfg.tool_cassette_latency != "none"
+    return [
+        _wrap(tool, cassette, mode, replay_latency) if tool.name.endswith(suffixes) else tool
+        for tool in tools
+    ]
@@ -2,30 +2,87 @@ from __future__ import annotations
 
 import logging
 import sys
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncIterator, List
+from typing import AsyncIterator, Dict, List, Optional
 
 from langchain_core.tools import BaseTool
 from langchain_mcp_adapters.sessions import Connection, create_session
 from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp.client.stdio import get_default_environment
+
+from ..config import Settings, get_settings
+from ..metrics import get_callback_handler, get_metrics
+from ..usage import get_usage_handler
+from .cassette import apply_cassette
 
 logger = logging.getLogger(__name__)
 
+_SERVER_MODULES = {
+    "mcp": "src.server",
+    "fake": "src.fakes.server",
+}
+
+# Settings the tool server process needs to agree with the host on.
+_FORWARDED_SETTINGS = (
+    "chroma_path",
+    "chroma_embedding_model",
+    "embedding_provider",
+    "web_scraper_timeout",
+    "fake_tool_latency_ms",
+    "fake_fixtures_path",
+)
+
+
+def _server_env(cfg: Settings) -> Dict[str, str]:
+    env = get_default_environment()
+    for name in _FORWARDED_SETTINGS:
+        value = getattr(cfg, name)
+        if value is not None:
+            env[name.upper()] = str(value)
+    return env
+
+
 def _server_connection() -> Connection:
+    cfg = get_settings()
+    module = _SERVER_MODULES.get(cfg.tool_provider)
+    if module is None:
+        raise ValueError(f"Unknown tool_provider: {cfg.tool_provider}")
     project_root = Path(__file__).resolve().parents[2]
     return {
         "transport": "stdio",
         "command": sys.executable,
-        "args": ["-m", "src.server"],
+        "args": ["-m", module],
         "cwd": str(project_root),
+        "env": _server_env(cfg),
     }
 
 
+def _instrument(tools: List[BaseTool]) -> List[BaseTool]:
+    for tool in tools:
+        tool.callbacks = [get_callback_handler(), get_usage_handler()]
+    return tools
+
+
+# Set while shared_research_tools() holds a session open.
+_shared_tools: Optional[List[BaseTool]] = None
+
+
 @asynccontextmanager
 async def get_research_tools() -> AsyncIterator[List[BaseTool]]:
+    if _shared_tools is not None:
+        yield _shared_tools
+        return
+    if get_settings().tool_provider == "replay":
+        # Recorded results are served in-process; no server to spawn.
+        from ..fakes.replay import replay_tools
+
+        yield _instrument(replay_tools())
+        return
     try:
         connection = _server_connection()
+        started = time.perf_counter()
         async with create_session(connection) as session:
             await session.initialize()
             tools = await load_mcp_tools(
@@ -33,12 +90,31 @@ async def get_research_tools() -> AsyncIterator[List[BaseTool]]:
                 server_name="local_mcp",
                 tool_name_prefix=True,
             )
-            yield tools
+            # Covers spawning the server process as well as the handshake.
+            get_metrics().observe("mcp.session_setup", time.perf_counter() - started)
+            yield _instrument(apply_cassette(tools))
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed to load MCP tools: %s", exc)
         yield []
 
 
+@asynccontextmanager
+async def shared_research_tools() -> AsyncIterator[List[BaseTool]]:
+    """Holds one tool session open for a long-lived process.
+
+    While it is entered, ``get_research_tools()`` hands out the same tools
+    instead of spawning a server per node call. MCP requests carry their
+    own IDs, so concurrent runs can share the session.
+    """
+    global _shared_tools
+    async with get_research_tools() as tools:
+        _shared_tools = tools or None
+        try:
+            yield tools
+        finally:
+            _shared_tools = None
+
+
 @asynccontextmanager
 async def get_report_tools() -> AsyncIterator[List[BaseTool]]:
     yield []
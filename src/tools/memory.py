@@ -1,29 +1,47 @@
 from __future__ import annotations
 
+import json
 import logging
+import time
 import uuid
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 import chromadb
 from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
 from langchain_core.tools import tool
 
 from ..config import get_settings
+from ..metrics import timed
 
 logger = logging.getLogger(__name__)
 
 
+def _embedding_function():
+    cfg = get_settings()
+    if cfg.embedding_provider == "hash":
+        from ..fakes.embeddings import HashEmbeddingFunction
+
+        return HashEmbeddingFunction()
+    return SentenceTransformerEmbeddingFunction(model_name=cfg.chroma_embedding_model)
+
+
 class VectorDB:
     def __init__(self, path: Optional[str] = None) -> None:
         cfg = get_settings()
         db_path = path or cfg.chroma_path
         self._client = chromadb.PersistentClient(path=db_path)
-        model_name = cfg.chroma_embedding_model
-        embedding_function = SentenceTransformerEmbeddingFunction(model_name=model_name)
+        embedding_function = _embedding_function()
         self._collection = self._client.get_or_create_collection(
             name="research",
             embedding_function=embedding_function,
         )
+        # Completed reports keyed by question; cosine distance so that
+        # 1 - distance is a similarity score.
+        self._reports = self._client.get_or_create_collection(
+            name="reports",
+            embedding_function=embedding_function,
+            configuration={"hnsw": {"space": "cosine"}},
+        )
 
     def chunk_text(
         self,
@@ -49,6 +67,7 @@ class VectorDB:
             start = end - chunk_overlap
         return chunks
 
+    @timed("vectordb.store_research")
     def store_research(
         self,
         text: str,
@@ -72,6 +91,7 @@ class VectorDB:
         )
         return doc_id
 
+    @timed("vectordb.retrieve_knowledge")
     def retrieve_knowledge(self, query: str, k: int = 3) -> List[str]:
         if not query.strip():
             return []
@@ -82,6 +102,7 @@ class VectorDB:
         documents = results.get("documents", [[]])
         return [doc for doc in documents[0] if doc]
 
+    @timed("vectordb.retrieve_knowledge")
     def retrieve_knowledge_with_sources(
         self,
         query: str,
@@ -101,6 +122,55 @@ class VectorDB:
             combined.append({"text": str(doc), "source_url": source_url})
         return combined
 
+    @timed("vectordb.store_report")
+    def store_report(
+        self,
+        query: str,
+        synthesis: str,
+        research_results: List[str],
+    ) -> str:
+        if not query.strip() or not synthesis.strip():
+            return ""
+        report_id = str(uuid.uuid4())
+        self._reports.add(
+            ids=[report_id],
+            documents=[query],
+            metadatas=[{
+                "synthesis": synthesis,
+                "research_results": json.dumps(research_results),
+                "created_at": time.time(),
+            }],
+        )
+        return report_id
+
+    @timed("vectordb.find_report")
+    def find_report(
+        self,
+        query: str,
+        min_similarity: float,
+        max_age_s: float = 0.0,
+    ) -> Optional[Dict[str, Any]]:
+        """Most similar stored report at or above ``min_similarity``, if any."""
+        if not query.strip() or self._reports.count() == 0:
+            return None
+        where = {"created_at": {"$gte": time.time() - max_age_s}} if max_age_s else None
+        results = self._reports.query(query_texts=[query], n_results=1, where=where)
+        ids = results.get("ids", [[]])[0]
+        if not ids:
+            return None
+        similarity = 1.0 - float(results["distances"][0][0])
+        if similarity < min_similarity:
+            return None
+        meta = results["metadatas"][0][0]
+        return {
+            "id": ids[0],
+            "query": results["documents"][0][0],
+            "similarity": round(similarity, 4),
+            "synthesis": meta["synthesis"],
+            "research_results": json.loads(meta.get("research_results") or "[]"),
+            "created_at": meta["created_at"],
+        }
+
 
 _VECTOR_DB: Optional[VectorDB] = None
 
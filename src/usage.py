@@ -0,0 +1,266 @@
+"""Token and cost accounting for chat-model calls.
+
+Every LLM call's ``usage_metadata`` (and every tool call) is captured by a
+callback handler and attributed to the graph node that made it. Nodes
+wrapped with ``track_usage`` return those records under the ``usage`` state
+key, so they are persisted with the thread's checkpoints. Records are keyed
+by callback run ID, which keeps the reducer idempotent when a full state is
+fed back in as the input of the next turn.
+
+``summarize_usage`` rolls records up per node and per model; the per-turn
+view is the set of records added since the turn started (``usage_since``).
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .config import get_settings
+from .llm_cache import CACHE_HIT_KEY
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+UsageRecord = Dict[str, Any]
+
+# USD per million tokens: (input, output, cache write, cache read).
+MODEL_PRICES: Dict[str, Tuple[float, float, float, float]] = {
+    "claude-3-haiku": (0.25, 1.25, 0.30, 0.03),
+    "claude-3-5-haiku": (0.80, 4.00, 1.00, 0.08),
+    "claude-haiku-4": (1.00, 5.00, 1.25, 0.10),
+    "claude-3-5-sonnet": (3.00, 15.00, 3.75, 0.30),
+    "claude-3-7-sonnet": (3.00, 15.00, 3.75, 0.30),
+    "claude-sonnet-4": (3.00, 15.00, 3.75, 0.30),
+    "claude-3-opus": (15.00, 75.00, 18.75, 1.50),
+    "claude-opus-4": (15.00, 75.00, 18.75, 1.50),
+}
+
+_TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_tokens",
+    "cache_write_tokens",
+)
+
+_pending: ContextVar[Optional[Dict[str, UsageRecord]]] = ContextVar(
+    "orchestrator_pending_usage", default=None
+)
+
+
+def price_for(model: str) -> Tuple[float, float, float, float]:
+    """Longest-prefix price match.
+
+    Models without a listed price (including the offline stand-in) are priced
+    as ``Settings.default_model`` so cost estimates stay comparable.
+    """
+    for candidate in (model, get_settings().default_model):
+        matches = [prefix for prefix in MODEL_PRICES if (candidate or "").startswith(prefix)]
+        if matches:
+            return MODEL_PRICES[max(matches, key=len)]
+    return (0.0, 0.0, 0.0, 0.0)
+
+
+def estimate_cost(model: str, record: Mapping[str, Any]) -> float:
+    input_price, output_price, write_price, read_price = price_for(model)
+    cache_read = record.get("cache_read_tokens", 0)
+    cache_write = record.get("cache_write_tokens", 0)
+    # Anthropic's input_tokens already include cached prompt tokens.
+    uncached = max(record.get("input_tokens", 0) - cache_read - cache_write, 0)
+    cost = (
+        uncached * input_price
+        + record.get("output_tokens", 0) * output_price
+        + cache_write * write_price
+        + cache_read * read_price
+    )
+    return round(cost / 1_000_000, 8)
+
+
+def usage_record(node: str, model: str, usage_metadata: Mapping[str, Any]) -> UsageRecord:
+    details = usage_metadata.get("input_token_details") or {}
+    record: UsageRecord = {
+        "node": node,
+        "model": model,
+        "input_tokens": int(usage_metadata.get("input_tokens", 0)),
+        "output_tokens": int(usage_metadata.get("output_tokens", 0)),
+        "cache_read_tokens": int(details.get("cache_read", 0) or 0),
+        "cache_write_tokens": int(details.get("cache_creation", 0) or 0),
+        "at": time.time(),
+    }
+    record["cost_usd"] = estimate_cost(model, record)
+    return record
+
+
+def tool_record(node: str, tool: str) -> UsageRecord:
+    return {"node": node, "kind": "tool", "tool": tool, "at": time.time()}
+
+
+def merge_usage(
+    left: Optional[Dict[str, UsageRecord]],
+    right: Optional[Dict[str, UsageRecord]],
+) -> Dict[str, UsageRecord]:
+    """State reducer: union of usage records keyed by run ID."""
+    return {**(left or {}), **(right or {})}
+
+
+def usage_since(
+    records: Optional[Mapping[str, UsageRecord]],
+    before: Optional[Mapping[str, UsageRecord]],
+) -> Dict[str, UsageRecord]:
+    before = before or {}
+    return {key: value for key, value in (records or {}).items() if key not in before}
+
+
+def _empty_totals() -> Dict[str, Any]:
+    totals: Dict[str, Any] = {field: 0 for field in _TOKEN_FIELDS}
+    totals.update({"calls": 0, "tool_calls": 0, "cost_usd": 0.0})
+    return totals
+
+
+def _add(totals: Dict[str, Any], record: Mapping[str, Any]) -> None:
+    if record.get("kind") == "tool":
+        totals["tool_calls"] += 1
+        return
+    for field in _TOKEN_FIELDS:
+        totals[field] += record.get(field, 0)
+    totals["calls"] += 1
+    totals["cost_usd"] = round(totals["cost_usd"] + record.get("cost_usd", 0.0), 8)
+
+
+def summarize_usage(records: Optional[Mapping[str, UsageRecord]]) -> Dict[str, Any]:
+    """Totals plus per-node and per-model breakdowns."""
+    summary = _empty_totals()
+    by_node: Dict[str, Dict[str, Any]] = {}
+    by_model: Dict[str, Dict[str, Any]] = {}
+    for record in (records or {}).values():
+        _add(summary, record)
+        _add(by_node.setdefault(record.get("node", "unknown"), _empty_totals()), record)
+        if record.get("kind") != "tool":
+            _add(by_model.setdefault(record.get("model", "unknown"), _empty_totals()), record)
+    summary["by_node"] = dict(sorted(by_node.items(), key=lambda kv: -kv[1]["cost_usd"]))
+    summary["by_model"] = by_model
+    return summary
+
+
+def format_usage(summary: Mapping[str, Any], label: str) -> str:
+    lines = [
+        f"Tokens ({label}): in={summary['input_tokens']} out={summary['output_tokens']} "
+        f"calls={summary['calls']} cost=${summary['cost_usd']:.4f}"
+    ]
+    for node, stats in summary.get("by_node", {}).items():
+        lines.append(
+            f"  {node:<16} in={stats['input_tokens']:<7} out={stats['output_tokens']:<6} "
+            f"calls={stats['calls']:<3} cost=${stats['cost_usd']:.4f}"
+        )
+    return "\n".join(lines)
+
+
+def _collect(run_id: UUID, record: UsageRecord) -> None:
+    pending = _pending.get()
+    if pending is not None:
+        pending[str(run_id)] = record
+    else:
+        logger.debug("Usage outside a tracked node: %s", record)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Captures ``usage_metadata`` from chat-model responses and tool calls."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._started: Dict[UUID, Tuple[str, str, Optional[str]]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        self._started[run_id] = (
+            metadata.get("langgraph_node") or "unknown",
+            metadata.get("ls_model_name") or "",
+            metadata.get("thread_id"),
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        node, model, thread_id = started
+        message = None
+        if response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+        usage_metadata = getattr(message, "usage_metadata", None)
+        if not usage_metadata or message.response_metadata.get(CACHE_HIT_KEY):
+            # Responses served from the LLM cache were already paid for.
+            return
+        model = (message.response_metadata or {}).get("model_name") or model
+        record = usage_record(node, model, usage_metadata)
+
+        registry = get_metrics()
+        registry.increment("llm.input_tokens", record["input_tokens"], thread_id)
+        registry.increment("llm.output_tokens", record["output_tokens"], thread_id)
+        registry.increment("llm.cost_usd", record["cost_usd"], thread_id)
+        # Prompt-cache effectiveness: cached vs. uncached input tokens.
+        cached = record["cache_read_tokens"]
+        registry.increment("llm.cache_read_tokens", cached, thread_id)
+        registry.increment("llm.cache_write_tokens", record["cache_write_tokens"], thread_id)
+        registry.increment("llm.uncached_input_tokens", record["input_tokens"] - cached, thread_id)
+        _collect(run_id, record)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node") or "unknown"
+        _collect(run_id, tool_record(node, (serialized or {}).get("name") or "unknown"))
+
+
+_HANDLER: Optional[UsageCallbackHandler] = None
+
+
+def get_usage_handler() -> UsageCallbackHandler:
+    global _HANDLER  # noqa: PLW0603
+    if _HANDLER is None:
+        _HANDLER = UsageCallbackHandler()
+    return _HANDLER
+
+
+def _with_usage(result: Any, collected: Dict[str, UsageRecord]) -> Any:
+    if collected and isinstance(result, dict):
+        return {**result, "usage": merge_usage(result.get("usage"), collected)}
+    return result
+
+
+def track_usage(node: Callable) -> Callable:
+    """Wraps a graph node so its LLM usage is returned as a ``usage`` update."""
+
+    if inspect.iscoroutinefunction(node):
+
+        @functools.wraps(node)
+        async def async_node(state: Dict[str, Any]) -> Any:
+            collected: Dict[str, UsageRecord] = {}
+            token = _pending.set(collected)
+            try:
+                result = await node(state)
+            finally:
+                _pending.reset(token)
+            return _with_usage(result, collected)
+
+        return async_node
+
+    @functools.wraps(node)
+    def sync_node(state: Dict[str, Any]) -> Any:
+        collected: Dict[str, UsageRecord] = {}
+        token = _pending.set(collected)
+        try:
+            result = node(state)
+        finally:
+            _pending.reset(token)
+        return _with_usage(result, collected)
+
+    return sync_node
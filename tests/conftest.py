@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock, MagicMock
 from langchain_core.messages import AIMessage, HumanMessage
 
 from src.config import Settings
+from src.metrics import MetricsRegistry
 
 
 @pytest.fixture(autouse=True)
@@ -20,6 +21,7 @@ def mock_settings(monkeypatch):
     settings = Settings(
         anthropic_api_key="test-key",
         chroma_path="/tmp/test_chroma",
+        content_store_path="/tmp/test_content.sqlite",
         default_model="claude-3-haiku-20240307",
         default_temperature=0.0,
         log_level="DEBUG",
@@ -31,6 +33,14 @@ def mock_settings(monkeypatch):
     return settings
 
 
+@pytest.fixture()
+def registry(monkeypatch):
+    """A fresh metrics registry in place of the process-wide one."""
+    fresh = MetricsRegistry()
+    monkeypatch.setattr("src.metrics._REGISTRY", fresh)
+    return fresh
+
+
 @pytest.fixture()
 def sample_state():
     return {
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 from pydantic import ValidationError
 
-from src.agents.analyst import AnalystAssessment
+from src.agents.analyst import AnalystAssessment, _assess, analyst_node
 
 
 def test_analyst_assessment_valid():
@@ -39,3 +45,146 @@ def test_analyst_assessment_model_dump():
     assert d["needs_more_research"] is False
     assert d["synthesis"] == "All research complete."
     assert isinstance(d["gaps"], list)
+
+
+def _assessor_llm(result):
+    llm = MagicMock()
+    llm.bind_tools.return_value = llm
+    llm.with_structured_output.return_value = llm
+    if isinstance(result, Exception):
+        llm.ainvoke = AsyncMock(side_effect=result)
+    else:
+        llm.ainvoke = AsyncMock(return_value=result)
+    return llm
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "first",
+    [
+        AnalystAssessment(needs_more_research=False, synthesis="thin", confidence=0.3),
+        ValueError("tool call did not match schema"),
+        None,
+    ],
+)
+async def test_analyst_escalates_low_confidence_or_unparseable(mock_settings, first):
+    mock_settings.analyst_escalation_model = "claude-sonnet-4-5"
+    fast = _assessor_llm(first)
+    strong = _assessor_llm(
+        AnalystAssessment(needs_more_research=False, synthesis="solid", confidence=0.9)
+    )
+    models = {None: fast, "claude-sonnet-4-5": strong}
+
+    with patch("src.agents.analyst._build_llm", side_effect=lambda model=None: models[model]):
+        assessment, _ = await _assess([], [])
+
+    assert assessment.synthesis == "solid"
+    strong.ainvoke.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_analyst_keeps_confident_fast_assessment(mock_settings):
+    mock_settings.analyst_escalation_model = "claude-sonnet-4-5"
+    fast = _assessor_llm(
+        AnalystAssessment(needs_more_research=False, synthesis="fast", confidence=0.8)
+    )
+
+    with patch("src.agents.analyst._build_llm", return_value=fast) as build:
+        assessment, _ = await _assess([], [])
+
+    assert assessment.synthesis == "fast"
+    build.assert_called_once_with(None)
+
+
+@pytest.mark.asyncio
+async def test_analyst_retrieves_while_tools_load(mock_settings, sample_state, mock_vector_db):
+    def slow_retrieve(query, k):
+        time.sleep(0.2)
+        return [{"text": f"fact about {query}", "source_url": "https://example.com"}]
+
+    @asynccontextmanager
+    async def slow_tools():
+        await asyncio.sleep(0.2)
+        yield []
+
+    mock_vector_db.retrieve_knowledge_with_sources.side_effect = slow_retrieve
+    assess = AsyncMock(return_value=(AnalystAssessment(needs_more_research=False), None))
+    started = time.perf_counter()
+    with (
+        patch("src.agents.analyst.get_vector_db", return_value=mock_vector_db),
+        patch("src.agents.analyst.get_research_tools", slow_tools),
+        patch("src.agents.analyst._assess", assess),
+    ):
+        result = await analyst_node(sample_state)
+
+    assert time.perf_counter() - started < 0.35
+    assert result["vector_hits"][0]["text"] == "fact about Compare SQLite vs PostgreSQL"
+    system = assess.await_args.args[1][0]
+    assert "fact about Compare SQLite vs PostgreSQL" in str(system.content)
+
+
+@asynccontextmanager
+async def _no_tools():
+    yield []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("synthesis, calls", [("partial answer", 1), ("", 2)])
+async def test_analyst_forces_synthesis_in_one_call_on_final_loop(
+    mock_settings, sample_state, mock_vector_db, synthesis, calls
+):
+    llm = _assessor_llm(
+        AnalystAssessment(needs_more_research=True, gaps=["x"], synthesis=synthesis)
+    )
+    with (
+        patch("src.agents.analyst.get_vector_db", return_value=mock_vector_db),
+        patch("src.agents.analyst.get_research_tools", _no_tools),
+        patch("src.agents.analyst._build_llm", return_value=llm),
+    ):
+        result = await analyst_node({**sample_state, "loop_count": 3})
+
+    assert result["needs_more_research"] is False
+    assert llm.ainvoke.await_count == calls
+    sent = llm.ainvoke.await_args.args[0]
+    assert "Do not ask for more research" in str(sent[0].content)
+    if calls == 2:
+        # The retry is not the identical request: it ends on the instruction.
+        first = llm.ainvoke.await_args_list[0].args[0]
+        assert sent[:-1] == first
+        assert "Do not ask for more research" in str(sent[-1].content)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("retry", [None, AnalystAssessment(needs_more_research=True)])
+async def test_analyst_falls_back_to_gaps_when_retry_gives_no_synthesis(
+    mock_settings, sample_state, mock_vector_db, retry
+):
+    llm = _assessor_llm(AnalystAssessment(needs_more_research=True, gaps=["no benchmarks"]))
+    llm.ainvoke.side_effect = [llm.ainvoke.return_value, retry]
+    with (
+        patch("src.agents.analyst.get_vector_db", return_value=mock_vector_db),
+        patch("src.agents.analyst.get_research_tools", _no_tools),
+        patch("src.agents.analyst._build_llm", return_value=llm),
+    ):
+        result = await analyst_node({**sample_state, "loop_count": 3})
+
+    payload = json.loads(result["messages"][0].content)
+    assert payload["needs_more_research"] is False
+    assert "no benchmarks" in payload["synthesis"]
+
+
+@pytest.mark.asyncio
+async def test_analyst_prompt_carries_loop_budget(mock_settings, sample_state, mock_vector_db):
+    llm = _assessor_llm(AnalystAssessment(needs_more_research=True, gaps=["x"]))
+    with (
+        patch("src.agents.analyst.get_vector_db", return_value=mock_vector_db),
+        patch("src.agents.analyst.get_research_tools", _no_tools),
+        patch("src.agents.analyst._build_llm", return_value=llm),
+    ):
+        result = await analyst_node({**sample_state, "loop_count": 1})
+
+    assert result["needs_more_research"] is True
+    system = str(llm.ainvoke.await_args.args[0][0].content)
+    assert "Loop budget: workflow step 1" in system
+    assert "Do not ask for more research" not in system
+
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+
+from src.api import RunManager, create_app
+from src.state import AgentState
+
+
+def _graph(delay: float = 0.0):
+    async def researcher(state: AgentState) -> AgentState:
+        await asyncio.sleep(delay)
+        return {"research_results": ["findings"], "loop_count": 1}
+
+    async def final_report(state: AgentState) -> AgentState:
+        query = state["messages"][0].content
+        return {"messages": [AIMessage(content=f"report: {query}")], "loop_count": 2}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("researcher", researcher)
+    graph.add_node("final_report", final_report)
+    graph.set_entry_point("researcher")
+    graph.add_edge("researcher", "final_report")
+    graph.add_edge("final_report", END)
+    return graph.compile(checkpointer=MemorySaver())
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        data = next(line[6:] for line in block.splitlines() if line.startswith("data: "))
+        events.append(json.loads(data))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_run_streams_events_and_report(mock_settings):
+    app = create_app(graph=_graph())
+    async with _client(app) as client:
+        response = await client.post("/threads/t1/runs", json={"query": "SQLite?"})
+        assert response.status_code == 202
+        run_id = response.json()["run_id"]
+
+        events = _parse_sse((await client.get(f"/runs/{run_id}/events")).text)
+        status = (await client.get(f"/runs/{run_id}")).json()
+
+    kinds = [event["type"] for event in events]
+    assert kinds[0] == "node_start"
+    assert kinds[-1] == "run_end"
+    assert {"researcher", "final_report"} <= {e.get("node") for e in events}
+    assert status["status"] == "completed"
+    assert status["report"] == "report: SQLite?"
+
+
+@pytest.mark.asyncio
+async def test_rejects_missing_query_and_busy_thread(mock_settings):
+    app = create_app(graph=_graph(delay=0.2))
+    async with _client(app) as client:
+        assert (await client.post("/threads/t1/runs", json={})).status_code == 400
+        first = await client.post("/threads/t1/runs", json={"query": "a"})
+        second = await client.post("/threads/t1/runs", json={"query": "b"})
+        other = await client.post("/threads/t2/runs", json={"query": "c"})
+    assert first.status_code == 202
+    assert second.status_code == 409
+    assert other.status_code == 202
+
+
+@pytest.mark.asyncio
+async def test_cancel_run(mock_settings):
+    app = create_app(graph=_graph(delay=5))
+    async with _client(app) as client:
+        run_id = (await client.post("/threads/t1/runs", json={"query": "a"})).json()["run_id"]
+        await asyncio.sleep(0.05)
+        assert (await client.delete(f"/runs/{run_id}")).status_code == 202
+        events = _parse_sse((await client.get(f"/runs/{run_id}/events")).text)
+        status = (await client.get(f"/runs/{run_id}")).json()
+        health = (await client.get("/health")).json()
+
+    assert events[-1] == {"type": "run_end", "status": "cancelled", "error": ""}
+    assert status["status"] == "cancelled"
+    assert health["active_runs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_run_returns_404(mock_settings):
+    app = create_app(graph=_graph())
+    async with _client(app) as client:
+        assert (await client.get("/runs/missing")).status_code == 404
+        assert (await client.get("/runs/missing/events")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_finished_runs_are_evicted(mock_settings):
+    mock_settings.api_max_finished_runs = 2
+    mock_settings.api_run_ttl_s = 60
+    manager = RunManager(graph=_graph())
+    runs = [manager.start(f"t{i}", "q") for i in range(3)]
+    await asyncio.gather(*(run.task for run in runs))
+
+    manager.prune()
+    assert set(manager.runs) == {runs[1].run_id, runs[2].run_id}
+
+    manager.prune(now=runs[2].finished_at + 61)
+    assert manager.runs == {}
+
+
+@pytest.mark.asyncio
+async def test_evicting_a_threads_last_run_drops_its_metrics(mock_settings, registry):
+    mock_settings.api_max_finished_runs = 1
+    manager = RunManager(graph=_graph())
+    for thread_id in ("a", "b"):
+        registry.increment("llm.calls", thread_id=thread_id)
+    first = manager.start("a", "q")
+    await first.task
+    second = manager.start("a", "q")
+    await second.task
+    third = manager.start("b", "q")
+    await third.task
+
+    # Starting "b" evicted the first run, but thread "a" still has a run.
+    assert registry.snapshot("a")["counters"] == {"llm.calls": 1}
+    manager.prune()
+    assert set(manager.runs) == {third.run_id}
+    assert registry.snapshot("a")["counters"] == {}
+    assert registry.snapshot("b")["counters"] == {"llm.calls": 1}
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.batch import completed_ids, load_queries, percentile, run_batch
+
+
+class _FakeGraph:
+    def __init__(self, fail_on=()):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._fail_on = set(fail_on)
+
+    async def ainvoke(self, state, config):
+        query = state["messages"][0].content
+        self.calls.append(config["configurable"]["thread_id"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if query in self._fail_on:
+            raise RuntimeError("boom")
+        return {**state, "messages": [AIMessage(content=f"report: {query}")], "loop_count": 4}
+
+
+def test_load_queries_text_and_jsonl(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text('# comment\nfirst question\n\n{"id": "q2", "query": "second"}\n')
+    queries = load_queries(str(path))
+    assert [q["query"] for q in queries] == ["first question", "second"]
+    assert queries[1]["id"] == "q2"
+    assert queries[0]["id"] == load_queries(str(path))[0]["id"]
+
+
+def test_repeated_queries_get_distinct_ids(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text('same question\nsame question\n{"query": "same question"}\n')
+    ids = [q["id"] for q in load_queries(str(path))]
+    assert len(set(ids)) == 3
+
+
+def test_query_ids_survive_inserted_lines(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text("first\nsecond\nsecond\n")
+    before = [q["id"] for q in load_queries(str(path))]
+    path.write_text("new question\nfirst\n# comment\nsecond\nsecond\n")
+    after = [q["id"] for q in load_queries(str(path))]
+    assert after[1:] == before
+
+
+def test_completed_ids_only_counts_successes(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(
+        json.dumps({"id": "a", "status": "ok"}) + "\n"
+        + json.dumps({"id": "b", "status": "error"}) + "\n"
+        + "not json\n"
+    )
+    assert completed_ids(str(path)) == {"a"}
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_batch_bounds_concurrency_and_writes_records(mock_settings, tmp_path):
+    queries = [{"id": str(i), "query": f"q{i}"} for i in range(6)]
+    output = tmp_path / "out.jsonl"
+    graph = _FakeGraph(fail_on={"q3"})
+
+    stats = await run_batch(queries, str(output), concurrency=2, graph=graph)
+
+    assert graph.max_in_flight == 2
+    assert stats["completed"] == 5
+    assert stats["failed"] == 1
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {r["id"] for r in records} == {str(i) for i in range(6)}
+    ok = next(r for r in records if r["id"] == "0")
+    assert ok["report"] == "report: q0"
+    assert ok["loop_count"] == 4
+
+
+@pytest.mark.asyncio
+async def test_run_batch_resumes_and_retries_failures(mock_settings, tmp_path):
+    queries = [{"id": str(i), "query": f"q{i}"} for i in range(3)]
+    output = tmp_path / "out.jsonl"
+    await run_batch(queries, str(output), concurrency=3, graph=_FakeGraph(fail_on={"q1"}))
+
+    graph = _FakeGraph()
+    stats = await run_batch(queries, str(output), concurrency=3, graph=graph)
+
+    assert graph.calls == ["batch-1"]
+    assert stats["skipped"] == 2
+    assert completed_ids(str(output)) == {"0", "1", "2"}
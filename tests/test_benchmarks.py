@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from benchmarks.run import _median_run, compare
+from benchmarks.scenarios import SCENARIOS
+
+
+def test_scenarios_cover_required_shapes():
+    assert {
+        "single_loop",
+        "forced_synthesis",
+        "stagnation_stop",
+        "heavy_scraping",
+        "large_vector_store",
+    } <= set(SCENARIOS)
+    assert SCENARIOS["large_vector_store"].prepare is not None
+
+
+def test_median_run_picks_middle_wall_time():
+    runs = [{"wall_s": 3.0, "llm_calls": 4}, {"wall_s": 1.0, "llm_calls": 4}, {"wall_s": 2.0, "llm_calls": 5}]
+    result = _median_run(runs)
+    assert result["wall_s"] == 2.0
+    assert result["llm_calls"] == 5
+    assert result["repeats"] == 3
+    assert result["wall_s_min"] == 1.0
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"scenarios": {"single_loop": {"wall_s": 10.0, "llm_calls": 4, "tool_calls": 4}}}
+    current = {"scenarios": {
+        "single_loop": {"wall_s": 11.5, "llm_calls": 6, "tool_calls": 4},
+        "new_scenario": {"wall_s": 99.0},
+    }}
+    regressions = compare(current, baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("single_loop.llm_calls")
+    assert compare(current, baseline, threshold=0.1)[0].startswith("single_loop.wall_s")
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from src.agents.analyst import AnalystAssessment, analyst_node
+from src.agents.researcher import _extract_tool_outputs, _run_tool_calls
+from src.budget import RunBudget, exhausted_budget, remaining_seconds, run_spend
+from src.graph.nodes import budget_stop_node, final_report_node
+from src.graph.workflow import (
+    _route_after_analyst,
+    _route_after_supervisor,
+)
+
+
+def _state(started: float, usage=None, **extra):
+    state = {
+        "messages": [],
+        "summary": "",
+        "research_results": [],
+        "needs_more_research": True,
+        "loop_count": 0,
+        "run_started_at": started,
+        "usage": usage or {},
+    }
+    state.update(extra)
+    return state
+
+
+def test_run_spend_ignores_records_from_earlier_runs():
+    now = time.time()
+    usage = {
+        "old": {"input_tokens": 900, "output_tokens": 100, "at": now - 60},
+        "llm": {"input_tokens": 90, "output_tokens": 10, "cost_usd": 0.2, "at": now},
+        "tool": {"kind": "tool", "tool": "web_scraper", "at": now},
+    }
+    spend = run_spend(_state(now - 5, usage), now=now)
+    assert spend["deadline"] == pytest.approx(5)
+    assert spend["tokens"] == 100
+    assert spend["cost"] == pytest.approx(0.2)
+    assert spend["tool_calls"] == 1
+
+
+def test_exhausted_budget_honours_reserve():
+    now = time.time()
+    usage = {"llm": {"node": "analyst", "input_tokens": 70, "output_tokens": 0, "at": now}}
+    state = _state(now, usage)
+    assert exhausted_budget(state, RunBudget(max_tokens=100, reserve_fraction=0.2)) is None
+    assert exhausted_budget(state, RunBudget(max_tokens=80, reserve_fraction=0.2)) == "tokens"
+    assert exhausted_budget(state, RunBudget()) is None
+
+
+def test_remaining_seconds(mock_settings):
+    mock_settings.run_deadline_s = 30
+    assert remaining_seconds(_state(time.time() - 10)) == pytest.approx(20, abs=1)
+    mock_settings.run_deadline_s = 0
+    assert remaining_seconds(_state(time.time() - 10)) is None
+
+
+def test_routers_force_final_report_near_deadline(mock_settings):
+    mock_settings.run_deadline_s = 10
+    late = _state(time.time() - 9)
+    assert _route_after_supervisor(late) == "budget_stop"
+    assert _route_after_analyst(late) == "budget_stop"
+
+    early = _state(time.time())
+    assert _route_after_analyst(early) == "researcher"
+
+
+def test_report_notes_only_an_actual_budget_stop(mock_settings, monkeypatch, mock_vector_db):
+    monkeypatch.setattr("src.graph.nodes.get_vector_db", lambda: mock_vector_db)
+    mock_settings.run_deadline_s = 10
+    # Finished normally, just late in its budget: no warning.
+    late = _state(time.time() - 9, vector_hits=[{"text": "t", "source_url": "u"}])
+    report = asyncio.run(final_report_node(late))["messages"][0].content
+    assert "stopped early" not in report
+
+    late.update(budget_stop_node(late))
+    report = asyncio.run(final_report_node(late))["messages"][0].content
+    assert "deadline budget" in report
+    assert "only lists the research gathered" in report
+
+
+@pytest.mark.asyncio
+async def test_analyst_synthesizes_in_one_call_inside_the_budget_reserve(
+    mock_settings, mock_vector_db
+):
+    mock_settings.run_deadline_s = 10
+    mock_settings.analyst_escalation_model = "stronger-model"
+    llm = MagicMock()
+    llm.bind_tools.return_value = llm
+    llm.with_structured_output.return_value = llm
+    llm.ainvoke = AsyncMock(
+        return_value=AnalystAssessment(needs_more_research=True, confidence=0.1)
+    )
+    tools = MagicMock(side_effect=AssertionError("no tool session inside the reserve"))
+    state = _state(time.time() - 9, messages=[HumanMessage(content="SQLite?")])
+    with (
+        patch("src.agents.analyst.get_vector_db", return_value=mock_vector_db),
+        patch("src.agents.analyst.get_research_tools", tools),
+        patch("src.agents.analyst._build_llm", return_value=llm) as build,
+    ):
+        result = await analyst_node(state)
+
+    assert result["needs_more_research"] is False
+    assert llm.ainvoke.await_count == 1
+    build.assert_called_once_with(None)
+    system = str(llm.ainvoke.await_args.args[0][0].content)
+    assert "deadline budget is nearly spent" in system
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_cut_off_at_deadline(mock_settings):
+    @tool
+    async def web_scraper(url: str) -> str:
+        """Scrapes a page."""
+        await asyncio.sleep(1)
+        return "page"
+
+    response = AIMessage(
+        content="",
+        tool_calls=[{"name": "web_scraper", "args": {"url": "https://a"}, "id": "1"}],
+    )
+    messages, args = await _run_tool_calls(response, [web_scraper], timeout=0.05)
+    assert messages[0].status == "error"
+    assert _extract_tool_outputs(messages, args) == []
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from langchain_core.tools import tool
+
+from src.tools.cassette import Cassette, apply_cassette, normalize_args
+
+CALLS: list = []
+
+
+@tool
+async def local_mcp_web_scraper(url: str) -> str:
+    """Scrapes a page."""
+    CALLS.append(url)
+    return f"content of {url}"
+
+
+@tool
+async def local_mcp_memory_search(query: str) -> str:
+    """Searches local memory."""
+    return "memory"
+
+
+@pytest.fixture()
+def cassette_settings(mock_settings, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.tools.cassette._CASSETTES", {})
+    CALLS.clear()
+    mock_settings.tool_cassette_path = str(tmp_path / "tools.json")
+    mock_settings.tool_cassette_latency = "none"
+    return mock_settings
+
+
+def test_normalize_args_ignores_key_order():
+    assert normalize_args({"b": 1, "a": 2}) == normalize_args('{"a": 2, "b": 1}')
+
+
+def test_apply_cassette_is_noop_when_off(cassette_settings):
+    tools = [local_mcp_web_scraper]
+    assert apply_cassette(tools) is tools
+
+
+@pytest.mark.asyncio
+async def test_auto_mode_records_then_replays(cassette_settings):
+    cassette_settings.tool_cassette_mode = "auto"
+    scraper, memory = apply_cassette([local_mcp_web_scraper, local_mcp_memory_search])
+
+    assert memory is local_mcp_memory_search
+    assert scraper.name == "local_mcp_web_scraper"
+    first = await scraper.ainvoke({"url": "https://example.com"})
+    second = await scraper.ainvoke({"url": "https://example.com"})
+
+    assert first == second == "content of https://example.com"
+    assert CALLS == ["https://example.com"]
+    saved = json.loads(open(cassette_settings.tool_cassette_path).read())
+    (entry,) = saved["entries"].values()
+    assert entry["tool"] == "local_mcp_web_scraper"
+    assert entry["latency_s"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_replay_mode_reports_misses_as_tool_errors(cassette_settings):
+    cassette_settings.tool_cassette_mode = "replay"
+    Cassette(cassette_settings.tool_cassette_path).put(
+        "local_mcp_web_scraper", {"url": "https://a.test"}, "recorded", 0.5
+    )
+    (scraper,) = apply_cassette([local_mcp_web_scraper])
+
+    assert await scraper.ainvoke({"url": "https://a.test"}) == "recorded"
+    missed = await scraper.ainvoke({"url": "https://b.test"})
+    assert "No cassette entry" in missed
+    assert CALLS == []
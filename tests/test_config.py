@@ -25,3 +25,14 @@ def test_get_settings_singleton(mock_settings):
     s1 = get_settings()
     s2 = get_settings()
     assert s1 is s2
+
+
+def test_server_connection_follows_tool_provider(mock_settings):
+    from src.tools.mcp_tools import _server_connection
+
+    mock_settings.tool_provider = "fake"
+    mock_settings.embedding_provider = "hash"
+    connection = _server_connection()
+    assert connection["args"] == ["-m", "src.fakes.server"]
+    assert connection["env"]["EMBEDDING_PROVIDER"] == "hash"
+    assert connection["env"]["CHROMA_PATH"] == "/tmp/test_chroma"
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+
+from src.content_store import (
+    EXCERPT_CHARS,
+    ContentStore,
+    excerpt,
+    get_content_store,
+    materialize,
+    to_research_results,
+)
+
+
+def test_results_are_compact_references(mock_settings, tmp_path):
+    mock_settings.content_store_path = str(tmp_path / "content.sqlite")
+    page = "PostgreSQL uses MVCC. " * 500
+
+    first, second = to_research_results(
+        [(page, "https://postgresql.org"), (page, "https://postgresql.org")]
+    )
+
+    assert first == second
+    assert len(get_content_store()) == 1
+    assert len(json.dumps(first)) < EXCERPT_CHARS + 200
+    assert excerpt(first) == page[:EXCERPT_CHARS]
+
+
+def test_materialize_mixes_references_and_inline_text(mock_settings, tmp_path):
+    mock_settings.content_store_path = str(tmp_path / "content.sqlite")
+    [ref] = to_research_results([("full scraped page", "https://example.com")])
+    lost = {"ref": "0" * 64, "source_url": "unknown", "excerpt": "only the excerpt"}
+
+    assert materialize([ref, "legacy text", lost]) == [
+        "full scraped page",
+        "legacy text",
+        "only the excerpt",
+    ]
+
+
+def test_store_evicts_expired_and_least_recently_used(tmp_path):
+    store = ContentStore(str(tmp_path / "content.sqlite"), ttl_s=60, max_entries=2)
+    old, kept, new = (store.put(text) for text in ("old", "kept", "new"))
+    assert len(store) == 2
+    assert store.get(old["ref"]) is None
+
+    store.get_many([kept["ref"]])
+    store._conn.execute("UPDATE content SET accessed_at = accessed_at - 120 WHERE text = 'new'")
+    store.put("newest")
+    assert store.get(new["ref"]) is None
+    assert store.get(kept["ref"]) == "kept"
+
+
+def test_disabled_store_keeps_text_inline(mock_settings):
+    mock_settings.content_store_enabled = False
+    assert to_research_results([("inline", "https://example.com")]) == ["inline"]
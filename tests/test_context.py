@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from src.context import pack_context, select_passages, select_stable
+
+PAGE = (
+    "PostgreSQL uses multi-version concurrency control so readers never block "
+    "writers, and it supports parallel query execution for analytics workloads. "
+    "Write-ahead logging keeps committed transactions durable across crashes."
+)
+
+
+def test_drops_contained_copies_and_keeps_the_fuller_one(mock_settings):
+    snippet = PAGE.split(". ")[0]
+    passages = [snippet, "SQLite is an embedded database in a single file.", PAGE]
+    assert select_passages(passages, max_tokens=0) == [1, 2]
+
+
+def test_overlapping_chunks_are_not_duplicates(mock_settings):
+    text = " ".join(f"word{i}" for i in range(600))
+    # Like VectorDB.chunk_text: 1000 characters with a 200-character overlap.
+    chunks = [text[start:start + 1000] for start in range(0, len(text), 800)]
+    assert len(pack_context(chunks, max_tokens=0)) == len(chunks)
+
+
+def test_budget_keeps_the_most_relevant_in_original_order(mock_settings):
+    passages = [
+        "Gardening tips for growing tomatoes in small containers on a balcony.",
+        "SQLite concurrency: a single writer at a time, readers use WAL mode.",
+        "Baking sourdough bread needs a lively starter and a long cold proof.",
+        "PostgreSQL concurrency relies on MVCC with row-level locking.",
+    ]
+    kept = pack_context(passages, "SQLite vs PostgreSQL concurrency", max_tokens=40)
+    assert kept == [passages[1], passages[3]]
+
+
+def test_stable_selection_keeps_the_earlier_research(mock_settings):
+    snippet = PAGE.split(". ")[0]
+    research = [snippet, "SQLite is an embedded database in a single file.", PAGE]
+    hits = [PAGE, "MySQL replication is asynchronous by default."]
+    # The fuller page arrives later, so both stay; the hit repeating it goes.
+    assert select_stable(research, hits, max_tokens=0) == ([0, 1, 2], [1])
+
+
+def test_stable_selection_trims_the_tail(mock_settings):
+    research = [f"research block {i} " + "filler " * 20 for i in range(3)]
+    hits = ["hit about SQLite concurrency " + "detail " * 20]
+    kept = select_stable(research, hits, max_tokens=90)
+    assert kept == ([0, 1], [])
+    # A new loop only appends; what was kept before still leads the prompt.
+    more = select_stable(research + ["research block 3 " + "filler " * 20], hits, max_tokens=90)
+    assert more[0][:2] == kept[0]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langgraph.graph import END, StateGraph
+
+from src.events import event_to_json, normalize_event, stream_events
+from src.state import AgentState
+
+
+def test_normalize_node_start():
+    raw = {
+        "event": "on_chain_start",
+        "name": "researcher",
+        "metadata": {"langgraph_node": "researcher"},
+        "data": {},
+    }
+    assert normalize_event(raw) == {"type": "node_start", "node": "researcher"}
+
+
+def test_normalize_ignores_inner_chains():
+    raw = {
+        "event": "on_chain_start",
+        "name": "RunnableSequence",
+        "metadata": {"langgraph_node": "analyst"},
+        "data": {},
+    }
+    assert normalize_event(raw) is None
+
+
+def test_normalize_token_from_content_blocks():
+    raw = {
+        "event": "on_chat_model_stream",
+        "name": "ChatAnthropic",
+        "metadata": {"langgraph_node": "analyst"},
+        "data": {"chunk": AIMessageChunk(content=[{"type": "text", "text": "Hi"}])},
+    }
+    assert normalize_event(raw) == {"type": "token", "node": "analyst", "text": "Hi"}
+
+
+def test_normalize_structured_output_streams_tool_args():
+    chunk = AIMessageChunk(
+        content=[{"type": "input_json_delta", "partial_json": '{"gaps": [', "index": 0}],
+        tool_call_chunks=[
+            {"name": None, "args": '{"gaps": [', "id": None, "index": 0}
+        ],
+    )
+    raw = {
+        "event": "on_chat_model_stream",
+        "metadata": {"langgraph_node": "analyst"},
+        "data": {"chunk": chunk},
+    }
+    assert normalize_event(raw) == {
+        "type": "tool_args",
+        "node": "analyst",
+        "text": '{"gaps": [',
+    }
+
+
+def test_normalize_skips_empty_token():
+    raw = {
+        "event": "on_chat_model_stream",
+        "metadata": {"langgraph_node": "analyst"},
+        "data": {"chunk": AIMessageChunk(content="")},
+    }
+    assert normalize_event(raw) is None
+
+
+def test_event_to_json_serializes_messages():
+    event = {
+        "type": "node_end",
+        "node": "researcher",
+        "output": {"messages": [AIMessage(content="done")], "loop_count": 1},
+    }
+    payload = json.loads(event_to_json(event))
+    assert payload["output"]["messages"][0] == {"type": "ai", "content": "done"}
+
+
+@pytest.mark.asyncio
+async def test_stream_events_yields_tokens_and_nodes(mock_settings):
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="hello world")]))
+
+    async def talker(state: AgentState) -> AgentState:
+        response = await llm.ainvoke(state["messages"])
+        return {"messages": [response], "loop_count": state["loop_count"] + 1}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("talker", talker)
+    graph.set_entry_point("talker")
+    graph.add_edge("talker", END)
+
+    state = {
+        "messages": [],
+        "summary": "",
+        "research_results": [],
+        "needs_more_research": False,
+        "loop_count": 0,
+    }
+    events = [event async for event in stream_events(graph.compile(), state, {})]
+
+    kinds = [event["type"] for event in events]
+    assert kinds[0] == "node_start"
+    assert kinds[-1] == "node_end"
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    assert tokens == "hello world"
+    assert events[-1]["output"]["loop_count"] == 1
+
+
+def test_normalize_llm_end_carries_usage():
+    usage = {"input_tokens": 10, "output_tokens": 2, "total_tokens": 12}
+    raw = {
+        "event": "on_chat_model_end",
+        "name": "ChatAnthropic",
+        "metadata": {"langgraph_node": "supervisor"},
+        "data": {"output": AIMessage(content="x", usage_metadata=usage)},
+    }
+    event = normalize_event(raw)
+    assert event == {
+        "type": "llm_end",
+        "node": "supervisor",
+        "model": "ChatAnthropic",
+        "usage": usage,
+    }
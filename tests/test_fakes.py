@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import tool
+
+from src.agents.analyst import ANALYST_SYSTEM, AnalystAssessment
+from src.agents.researcher import RESEARCHER_SYSTEM
+from src.agents.supervisor import SUPERVISOR_SYSTEM, SupervisorDecision
+from src.fakes import HashEmbeddingFunction, ScriptedChatModel, configure_offline
+from src.fakes.llm import FINDINGS_MARKER
+from src.fakes.server import scrape_page, search_pages
+from src.llm import build_llm
+
+
+@tool
+def local_mcp_duckduckgo_search(query: str) -> str:
+    """Search."""
+    return ""
+
+
+@tool
+def local_mcp_web_scraper(url: str) -> str:
+    """Scrape."""
+    return ""
+
+
+def test_build_llm_selects_fake(mock_settings):
+    mock_settings.llm_provider = "fake"
+    mock_settings.fake_llm_latency_ms = 5
+    llm = build_llm()
+    assert isinstance(llm, ScriptedChatModel)
+    assert llm.latency_ms == 5
+
+
+def test_build_llm_resolves_role_models(mock_settings):
+    mock_settings.supervisor_model = "claude-3-5-haiku-latest"
+    assert build_llm("supervisor").model == "claude-3-5-haiku-latest"
+    assert build_llm("analyst").model == mock_settings.default_model
+    assert build_llm("analyst", model="claude-sonnet-4-5").model == "claude-sonnet-4-5"
+    with pytest.raises(ValueError):
+        build_llm("critic")
+
+
+def test_build_llm_rejects_unknown_provider(mock_settings):
+    mock_settings.llm_provider = "nope"
+    with pytest.raises(ValueError):
+        build_llm()
+
+
+def test_supervisor_structured_output():
+    llm = ScriptedChatModel().with_structured_output(SupervisorDecision)
+    decision = llm.invoke([
+        SystemMessage(content=SUPERVISOR_SYSTEM),
+        HumanMessage(content="SQLite vs PostgreSQL"),
+    ])
+    assert decision.next_agent == "researcher"
+    assert "SQLite vs PostgreSQL" in decision.reasoning
+
+    done = json.dumps({"needs_more_research": False, "synthesis": "x"})
+    decision = llm.invoke([SystemMessage(content=SUPERVISOR_SYSTEM), AIMessage(content=done)])
+    assert decision.next_agent == "final_report"
+
+
+def test_analyst_waits_for_research_rounds():
+    llm = ScriptedChatModel(research_rounds=2).with_structured_output(AnalystAssessment)
+    query = HumanMessage(content="SQLite vs PostgreSQL")
+    one_round = SystemMessage(content=f"{ANALYST_SYSTEM}\n{FINDINGS_MARKER} #1]")
+    assert llm.invoke([one_round, query]).needs_more_research is True
+
+    two_rounds = SystemMessage(
+        content=f"{ANALYST_SYSTEM}\n{FINDINGS_MARKER} #1]\n{FINDINGS_MARKER} #2]"
+    )
+    assessment = llm.invoke([two_rounds, query])
+    assert assessment.needs_more_research is False
+    assert "COMPARISON_DATA" in assessment.synthesis
+
+
+def test_researcher_calls_tools_then_summarizes():
+    llm = ScriptedChatModel().bind_tools(
+        [local_mcp_duckduckgo_search, local_mcp_web_scraper]
+    )
+    messages = [SystemMessage(content=RESEARCHER_SYSTEM), HumanMessage(content="mcp transports")]
+    first = llm.invoke(messages)
+    assert [call["name"] for call in first.tool_calls] == [
+        "local_mcp_duckduckgo_search",
+        "local_mcp_web_scraper",
+    ]
+    assert first.usage_metadata["input_tokens"] > 0
+
+    follow_up = messages + [first] + [
+        ToolMessage(content="result", tool_call_id=call["id"]) for call in first.tool_calls
+    ]
+    second = llm.invoke(follow_up)
+    assert second.content.startswith(FINDINGS_MARKER)
+
+
+def test_latency_sampling_is_seeded():
+    a = ScriptedChatModel(latency_ms=100, latency_jitter_ms=50, latency_distribution="uniform", seed=7)
+    b = ScriptedChatModel(latency_ms=100, latency_jitter_ms=50, latency_distribution="uniform", seed=7)
+    samples = [a.sample_latency() for _ in range(5)]
+    assert samples == [b.sample_latency() for _ in range(5)]
+    assert all(0.05 <= value <= 0.15 for value in samples)
+    assert ScriptedChatModel(latency_ms=20).sample_latency() == pytest.approx(0.02)
+
+
+def test_hash_embeddings_are_normalized_and_similar():
+    embed = HashEmbeddingFunction(dimensions=64)
+    a, b, c = embed(["sqlite locking", "sqlite locking modes", "vector search"])
+    assert sum(v * v for v in a) == pytest.approx(1.0)
+    similarity = lambda x, y: sum(p * q for p, q in zip(x, y))  # noqa: E731
+    assert similarity(a, b) > similarity(a, c)
+
+
+def test_fake_server_search_and_scrape(mock_settings):
+    results = search_pages("postgresql mvcc", max_results=2)
+    assert results.splitlines()[0].startswith("PostgreSQL overview")
+    assert "MVCC" in scrape_page("https://docs.example.com/postgresql-overview")
+    unknown = scrape_page("https://elsewhere.example.com/page")
+    assert unknown == scrape_page("https://elsewhere.example.com/page")
+    assert len(unknown) <= 5000
+
+
+def test_configure_offline_switches_providers(mock_settings):
+    mock_settings.chroma_path = "./data/chroma"
+    configure_offline(fake_llm_latency_ms=12)
+    assert (mock_settings.llm_provider, mock_settings.tool_provider) == ("fake", "fake")
+    assert mock_settings.embedding_provider == "hash"
+    assert mock_settings.chroma_path == "./data/chroma-offline"
+    assert mock_settings.fake_llm_latency_ms == 12
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, StateGraph
+from langgraph.types import Send
+
+from src.graph.fanout import (
+    decompose_query,
+    fan_out,
+    merge_research_node,
+    research_branch_node,
+)
+from src.state import AgentState, initial_state
+
+
+def test_decompose_query_splits_comparisons():
+    assert decompose_query("Compare SQLite vs PostgreSQL for analytics?", 2) == [
+        "SQLite for analytics",
+        "PostgreSQL for analytics",
+    ]
+    assert decompose_query("compare Redis, Memcached and Hazelcast", 2) == [
+        "Redis and Hazelcast",
+        "Memcached",
+    ]
+    assert decompose_query("What is MCP?", 4) == ["What is MCP?"]
+    assert decompose_query("SQLite vs PostgreSQL", 1) == ["SQLite vs PostgreSQL"]
+
+
+def test_fan_out_sends_one_branch_per_sub_question(mock_settings):
+    mock_settings.research_fanout = 3
+    state = {**initial_state("SQLite vs PostgreSQL"), "research_results": ["old"]}
+
+    sends = fan_out(state)
+
+    assert [send.node for send in sends] == ["research_branch", "research_branch"]
+    assert all(isinstance(send, Send) for send in sends)
+    assert sends[1].arg["messages"][0].content == "PostgreSQL"
+    assert sends[1].arg["research_results"] == []
+    assert fan_out(initial_state("What is MCP?")) == "researcher"
+
+
+@pytest.mark.asyncio
+async def test_branches_run_in_parallel_and_merge_in_order(mock_settings):
+    mock_settings.research_fanout = 2
+
+    async def fake_researcher(state):
+        question = state["messages"][0].content
+        return {
+            "messages": [AIMessage(content=f"summary of {question}")],
+            "research_results": [f"page about {question}"],
+        }
+
+    graph = StateGraph(AgentState)
+    graph.add_node("research_branch", research_branch_node)
+    graph.add_node("merge_research", merge_research_node)
+    graph.set_conditional_entry_point(fan_out)
+    graph.add_edge("research_branch", "merge_research")
+    graph.add_edge("merge_research", END)
+
+    state = initial_state("SQLite vs PostgreSQL")
+    with patch("src.graph.fanout.researcher_node", side_effect=fake_researcher):
+        result = await graph.compile().ainvoke(state)
+
+    assert result["research_results"] == ["page about SQLite", "page about PostgreSQL"]
+    assert result["research_branches"] == {}
+    assert result["messages"][0].content.startswith("SQLite:\nsummary of SQLite")
+    assert result["loop_count"] == 1
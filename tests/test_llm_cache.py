@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.llm import build_llm
+from src.llm_cache import SQLiteLLMCache, get_llm_cache
+from src.usage import _pending
+
+
+@pytest.fixture()
+def cache_settings(mock_settings, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.llm_cache._CACHES", {})
+    mock_settings.llm_provider = "fake"
+    mock_settings.llm_cache_enabled = True
+    mock_settings.llm_cache_path = str(tmp_path / "llm_cache.sqlite")
+    return mock_settings
+
+
+def _generation(text: str) -> list:
+    return [ChatGeneration(message=AIMessage(content=text, id="run-1"))]
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_are_served_from_cache(cache_settings, registry):
+    collected: dict = {}
+    token = _pending.set(collected)
+    try:
+        first = await build_llm().ainvoke([HumanMessage(content="SQLite vs PostgreSQL")])
+        second = await build_llm().ainvoke([HumanMessage(content="SQLite vs PostgreSQL")])
+    finally:
+        _pending.reset(token)
+
+    assert second.content == first.content
+    assert second.response_metadata["llm_cache_hit"] is True
+    assert second.id != first.id
+    counters = registry.snapshot()["counters"]
+    assert counters["llm_cache.hits"] == 1
+    assert counters["llm_cache.misses"] == 1
+    assert len(collected) == 1  # the cached reply is not billed again
+
+
+def test_cache_disabled_for_nonzero_temperature(cache_settings):
+    cache_settings.default_temperature = 0.7
+    assert get_llm_cache() is None
+
+
+def test_expired_entries_are_misses(tmp_path, registry):
+    cache = SQLiteLLMCache(str(tmp_path / "c.sqlite"), ttl_s=60)
+    cache.update("prompt", "llm", _generation("cached"))
+    assert cache.lookup("prompt", "llm")[0].message.content == "cached"
+
+    cache._conn.execute("UPDATE llm_cache SET created_at = ?", (time.time() - 120,))
+    assert cache.lookup("prompt", "llm") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, registry):
+    cache = SQLiteLLMCache(str(tmp_path / "c.sqlite"), max_entries=2)
+    cache.update("a", "llm", _generation("A"))
+    time.sleep(0.01)
+    cache.update("b", "llm", _generation("B"))
+    time.sleep(0.01)
+    cache.lookup("a", "llm")
+    time.sleep(0.01)
+    cache.update("c", "llm", _generation("C"))
+
+    assert len(cache) == 2
+    assert cache.lookup("b", "llm") is None
+    assert cache.lookup("a", "llm") is not None
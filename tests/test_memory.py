@@ -38,3 +38,17 @@ def test_chunk_text_zero_chunk_size(mock_settings):
     text = "some text"
     chunks = db.chunk_text(text, chunk_size=0, chunk_overlap=0)
     assert chunks == ["some text"]
+
+
+def test_report_cache_round_trip(mock_settings, tmp_path):
+    mock_settings.embedding_provider = "hash"
+    db = VectorDB(path=str(tmp_path))
+    assert db.find_report("SQLite vs PostgreSQL", min_similarity=0.9) is None
+
+    db.store_report("SQLite vs PostgreSQL", "Use PostgreSQL", ["Result 1"])
+
+    hit = db.find_report("SQLite vs PostgreSQL", min_similarity=0.9, max_age_s=60)
+    assert hit["synthesis"] == "Use PostgreSQL"
+    assert hit["research_results"] == ["Result 1"]
+    assert hit["similarity"] > 0.99
+    assert db.find_report("Kafka vs RabbitMQ throughput", min_similarity=0.9) is None
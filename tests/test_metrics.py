@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from src.metrics import (
+    Histogram,
+    MetricsCallbackHandler,
+    instrument_node,
+    span,
+)
+from src.state import AgentState
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.count == 4
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.95) == 2.0
+    assert histogram.to_dict()["buckets"] == {"0.1": 2, "1.0": 1, "+Inf": 1}
+
+
+def test_registry_scopes_by_thread(registry):
+    registry.observe("node.supervisor", 0.2, thread_id="a")
+    registry.observe("node.supervisor", 0.4, thread_id="b")
+    registry.increment("llm.calls", thread_id="a")
+
+    assert registry.snapshot("a")["histograms"]["node.supervisor"]["count"] == 1
+    assert registry.snapshot()["histograms"]["node.supervisor"]["count"] == 2
+    registry.reset_thread("a")
+    assert registry.snapshot("a") == {"histograms": {}, "counters": {}, "artifacts": {}}
+    assert registry.snapshot()["counters"]["llm.calls"] == 1
+
+
+def test_span_counts_errors(registry):
+    with pytest.raises(ValueError):
+        with span("vectordb.store_research"):
+            raise ValueError("boom")
+    snapshot = registry.snapshot()
+    assert snapshot["histograms"]["vectordb.store_research"]["count"] == 1
+    assert snapshot["counters"]["vectordb.store_research.errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_instrument_node_records_per_thread(registry):
+    async def researcher(state: AgentState) -> AgentState:
+        with span("vectordb.retrieve_knowledge"):
+            pass
+        return {"loop_count": state["loop_count"] + 1}
+
+    def reporter(state: AgentState) -> AgentState:
+        return {"summary": "done"}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("researcher", instrument_node("researcher", researcher))
+    graph.add_node("final_report", instrument_node("final_report", reporter))
+    graph.set_entry_point("researcher")
+    graph.add_edge("researcher", "final_report")
+    graph.add_edge("final_report", END)
+
+    state = {
+        "messages": [],
+        "summary": "",
+        "research_results": [],
+        "needs_more_research": False,
+        "loop_count": 0,
+    }
+    result = await graph.compile().ainvoke(
+        state, {"configurable": {"thread_id": "t-1"}}
+    )
+
+    assert result["summary"] == "done"
+    histograms = registry.snapshot("t-1")["histograms"]
+    assert set(histograms) == {
+        "node.researcher",
+        "node.final_report",
+        "vectordb.retrieve_knowledge",
+    }
+
+
+def test_callback_handler_times_llm_and_tools(registry):
+    handler = MetricsCallbackHandler()
+    llm_run, tool_run = uuid.uuid4(), uuid.uuid4()
+    metadata = {"langgraph_node": "analyst", "thread_id": "t-2"}
+
+    handler.on_chat_model_start({}, [[]], run_id=llm_run, metadata=metadata)
+    handler.on_llm_end(None, run_id=llm_run)
+    handler.on_tool_start({"name": "web_scraper"}, "{}", run_id=tool_run, metadata=metadata)
+    handler.on_tool_error(RuntimeError("x"), run_id=tool_run)
+
+    snapshot = registry.snapshot("t-2")
+    assert set(snapshot["histograms"]) == {"llm.analyst", "tool.web_scraper"}
+    assert snapshot["counters"] == {
+        "llm.calls": 1,
+        "tool.calls": 1,
+        "tool.web_scraper.errors": 1,
+    }
+
+
+def test_render_prometheus_is_cumulative(registry):
+    registry.observe("node.analyst", 0.02)
+    registry.observe("node.analyst", 3.0)
+    text = registry.render_prometheus()
+    assert 'orchestrator_latency_seconds_bucket{name="node.analyst",le="0.025"} 1' in text
+    assert 'orchestrator_latency_seconds_bucket{name="node.analyst",le="+Inf"} 2' in text
+    assert 'orchestrator_latency_seconds_count{name="node.analyst"} 2' in text
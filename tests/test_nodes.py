@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import asyncio
 import json
+from unittest.mock import patch
 
 from langchain_core.messages import AIMessage, HumanMessage
 
+from src.content_store import materialize
 from src.graph.nodes import (
     _extract_comparison_rows,
     _extract_synthesis,
     _last_user_query,
+    cache_lookup_node,
     final_report_node,
+    summarizer_node,
 )
+from src.state import initial_state, next_turn_state
 
 
 def test_extract_synthesis_found(mock_settings):
@@ -98,3 +103,131 @@ def test_final_report_includes_sources(mock_settings, monkeypatch, mock_vector_d
     assert "## Sources & References" in report
     # The mock_vector_db fixture returns a single URL.
     assert "https://example.com" in report
+
+
+def test_final_report_reuses_analyst_vector_hits(mock_settings, monkeypatch, mock_vector_db):
+    monkeypatch.setattr("src.graph.nodes.get_vector_db", lambda: mock_vector_db)
+    state = {
+        "messages": [HumanMessage(content="Compare SQLite vs PostgreSQL")],
+        "summary": "Summary of trade-offs.",
+        "research_results": ["Result 1"],
+        "vector_hits": [{"text": "chunk", "source_url": "https://sqlite.org"}],
+        "vector_hits_query": "Compare SQLite vs PostgreSQL",
+    }
+
+    report = asyncio.run(final_report_node(state))["messages"][0].content
+
+    assert "https://sqlite.org" in report
+    mock_vector_db.retrieve_knowledge_with_sources.assert_not_called()
+
+
+def test_next_turn_report_does_not_list_previous_sources(
+    mock_settings, monkeypatch, mock_vector_db
+):
+    monkeypatch.setattr("src.graph.nodes.get_vector_db", lambda: mock_vector_db)
+    first = {
+        **initial_state("SQLite vs PostgreSQL"),
+        "vector_hits": [{"text": "chunk", "source_url": "https://sqlite.org"}],
+        "vector_hits_query": "SQLite vs PostgreSQL",
+    }
+    first.update(asyncio.run(final_report_node(first)))
+
+    # The second turn reaches the report without an analyst pass, as a
+    # budget stop or report-cache hit does; even with stale hits left in
+    # state, they belong to another question.
+    second = next_turn_state(first, "How does Kubernetes pod networking work?")
+    stale = {**second, "vector_hits": first["vector_hits"], "vector_hits_query": "SQLite vs PostgreSQL"}
+    for state in (second, stale):
+        report = asyncio.run(final_report_node(state))["messages"][0].content
+        assert "https://sqlite.org" not in report
+        assert "https://example.com" in report
+
+
+def test_cache_lookup_hit_in_report_mode(mock_settings, monkeypatch, mock_vector_db):
+    mock_settings.report_cache_mode = "report"
+    mock_vector_db.find_report.return_value = {
+        "id": "r1",
+        "query": "SQLite vs PostgreSQL",
+        "similarity": 0.97,
+        "synthesis": "Cached synthesis",
+        "research_results": ["Result 1"],
+        "created_at": 1.0,
+    }
+    monkeypatch.setattr("src.graph.nodes.get_vector_db", lambda: mock_vector_db)
+    state = {"messages": [HumanMessage(content="Compare SQLite vs PostgreSQL")]}
+
+    result = cache_lookup_node(state)
+
+    assert result["report_cache"]["status"] == "hit"
+    assert materialize(result["research_results"]) == ["Result 1"]
+    assert _extract_synthesis(result) == "Cached synthesis"
+    assert result["needs_more_research"] is False
+
+
+def test_cache_lookup_skips_follow_ups(mock_settings, monkeypatch, mock_vector_db):
+    mock_settings.report_cache_mode = "report"
+    monkeypatch.setattr("src.graph.nodes.get_vector_db", lambda: mock_vector_db)
+    multi_turn = {
+        "messages": [
+            HumanMessage(content="Compare SQLite vs PostgreSQL"),
+            AIMessage(content="report"),
+            HumanMessage(content="what about latency?"),
+        ]
+    }
+    summarized = {
+        "messages": [HumanMessage(content="what about latency?")],
+        "summary": "Compared SQLite and PostgreSQL.",
+    }
+
+    # Nodes overwrite messages, so the next turn may keep only the report.
+    after_report = next_turn_state(
+        {**initial_state("Compare SQLite vs PostgreSQL"), "messages": [AIMessage(content="report")]},
+        "what about latency?",
+    )
+
+    for state in (multi_turn, summarized, after_report):
+        assert cache_lookup_node(state)["report_cache"]["status"] == "skip"
+    mock_vector_db.find_report.assert_not_called()
+
+
+def test_final_report_caches_fresh_synthesis(mock_settings, monkeypatch, mock_vector_db):
+    monkeypatch.setattr("src.graph.nodes.get_vector_db", lambda: mock_vector_db)
+    payload = json.dumps({"needs_more_research": False, "synthesis": "Analysis"})
+    state = {
+        "messages": [AIMessage(content=payload)],
+        "summary": "",
+        "research_results": ["Result 1"],
+        "needs_more_research": False,
+        "loop_count": 3,
+        "report_cache": {"status": "miss", "query": "SQLite vs PostgreSQL"},
+    }
+
+    asyncio.run(final_report_node(state))
+
+    mock_vector_db.store_report.assert_called_once_with(
+        "SQLite vs PostgreSQL", "Analysis", ["Result 1"]
+    )
+
+
+def test_summarizer_folds_only_new_messages(mock_settings, mock_llm):
+    mock_settings.summarizer_background = True
+    mock_settings.summary_max_tokens = 5
+    mock_llm.invoke.return_value = AIMessage(content="word " * 40)
+    state = {
+        "question": "Compare SQLite vs PostgreSQL",
+        "summary": "SQLite is embedded.",
+        "messages": [
+            HumanMessage(content="Compare SQLite vs PostgreSQL"),
+            AIMessage(content="PostgreSQL uses MVCC."),
+        ],
+    }
+    with patch("src.graph.nodes._build_llm", return_value=mock_llm):
+        result = summarizer_node(state)
+
+    prompt = mock_llm.invoke.call_args.args[0][1].content
+    assert "Existing summary:\nSQLite is embedded." in prompt
+    assert "ai: PostgreSQL uses MVCC." in prompt
+    assert "human:" not in prompt
+    # Background mode writes only the summary, clipped to its token bound.
+    assert set(result) == {"summary"}
+    assert len(result["summary"]) <= 20
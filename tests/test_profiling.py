@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.profiling import SamplingProfiler, profile_node, profile_run, profile_span
+
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def test_sampling_profiler_folds_busy_stacks():
+    profiler = SamplingProfiler(interval_s=0.001)
+    worker = threading.Thread(target=_busy, args=(0.1,))
+    worker.start()
+    for _ in range(20):
+        profiler.sample_once()
+        time.sleep(0.002)
+    worker.join()
+
+    folded = profiler.folded()
+    assert "_busy (tests/test_profiling.py" in folded
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) >= 1
+
+
+def test_profile_span_writes_artifacts_and_attaches_them(mock_settings, registry, tmp_path):
+    mock_settings.profile_dir = str(tmp_path)
+    mock_settings.profile_interval_ms = 1.0
+
+    with profile_span("run-t1", thread_id="t1") as artifacts:
+        _busy(0.05)
+        blob = [bytearray(1024) for _ in range(200)]
+
+    assert blob
+    assert Path(artifacts["cpu"]).exists()
+    report = Path(artifacts["alloc"]).read_text()
+    assert report.startswith("Peak traced memory")
+    assert "test_profiling.py" in report
+    attached = registry.snapshot("t1")["artifacts"]
+    assert attached["profile.run-t1.cpu"] == [artifacts["cpu"]]
+
+
+def test_profile_run_is_noop_unless_enabled(mock_settings, tmp_path):
+    mock_settings.profile_dir = str(tmp_path)
+    with profile_run("t1") as artifacts:
+        pass
+    assert artifacts == {}
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_profile_node_profiles_in_node_mode(mock_settings, registry, tmp_path):
+    mock_settings.profile_dir = str(tmp_path)
+    mock_settings.profile_mode = "node"
+
+    async def analyst(state):
+        return {"loop_count": state["loop_count"] + 1}
+
+    result = await profile_node("analyst", analyst)({"loop_count": 0})
+
+    assert result == {"loop_count": 1}
+    assert "profile.node-analyst.cpu" in registry.snapshot()["artifacts"]
+    assert len(list(tmp_path.glob("node-analyst-*.folded"))) == 1
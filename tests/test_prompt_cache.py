@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.fakes.llm import estimate_tokens, prompt_cache_usage
+from src.llm import system_message
+
+STABLE = "You are the Analyst agent. " * 40
+
+
+@pytest.fixture(autouse=True)
+def _fresh_prompt_cache(monkeypatch):
+    monkeypatch.setattr("src.fakes.llm._PROMPT_CACHE", {})
+
+
+def _breakpoints(message: SystemMessage) -> list:
+    return [bool(block.get("cache_control")) for block in message.content]
+
+
+def test_system_message_places_breakpoints_after_stable_prefixes(mock_settings):
+    message = system_message(STABLE, ["Research results:\nA", "---\nB"], ["Summary", ""])
+    assert _breakpoints(message) == [True, False, True, False]
+    assert message.content[-1]["text"] == "Summary"
+
+
+def test_system_message_is_plain_text_when_disabled(mock_settings):
+    mock_settings.prompt_cache = False
+    message = system_message("Stable", ["Research"], ["Summary"])
+    assert message.content == "Stable\n\nResearch\n\nSummary"
+
+
+def test_growing_research_reads_previous_loop_prefix(mock_settings):
+    question = HumanMessage(content="SQLite vs PostgreSQL")
+    first = [system_message(STABLE, ["Research results:\nA"], ["Summary 1"]), question]
+    second = [
+        system_message(STABLE, ["Research results:\nA", "---\nB"], ["Summary 2"]),
+        question,
+    ]
+
+    prefix = estimate_tokens(STABLE) + estimate_tokens("Research results:\nA")
+    assert prompt_cache_usage(first, min_tokens=100) == (0, prefix)
+    assert prompt_cache_usage(second, min_tokens=100) == (prefix, estimate_tokens("---\nB"))
+
+
+def test_breakpoint_placement_is_validated(mock_settings):
+    blocks = [{"type": "text", "text": "x", "cache_control": {"type": "ephemeral"}}] * 5
+    with pytest.raises(ValueError, match="maximum of 4"):
+        prompt_cache_usage([SystemMessage(content=blocks)])
+    empty = [{"type": "text", "text": "", "cache_control": {"type": "ephemeral"}}]
+    with pytest.raises(ValueError, match="empty text"):
+        prompt_cache_usage([SystemMessage(content=empty)])
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, StateGraph
+
+from src.fakes.replay import ReplayChatModel, ReplayLog, load_replay, replay_tools
+from src.recording import read_log, record_run
+from src.state import AgentState, initial_state
+
+
+@tool
+async def web_scraper(url: str) -> str:
+    """Scrapes a page."""
+    return f"content of {url}"
+
+
+def _graph(llm):
+    async def researcher(state: AgentState) -> AgentState:
+        response = await llm.ainvoke(state["messages"])
+        page = await web_scraper.ainvoke({"url": "https://example.com"})
+        return {"messages": [response], "research_results": [page]}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("researcher", researcher)
+    graph.set_entry_point("researcher")
+    graph.add_edge("researcher", END)
+    return graph.compile()
+
+
+@pytest.mark.asyncio
+async def test_record_run_writes_structured_events(mock_settings, tmp_path):
+    mock_settings.event_log_dir = str(tmp_path)
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="found it")]))
+    state = initial_state("SQLite vs PostgreSQL")
+    config = {"configurable": {"thread_id": "rec"}}
+
+    with record_run(config, state) as (run_config, recorder):
+        await _graph(llm).ainvoke(state, run_config)
+
+    events = read_log(recorder.path)
+    kinds = [event["type"] for event in events]
+    assert kinds[0] == "run_start" and kinds[-1] == "run_end"
+    assert events[0]["query"] == "SQLite vs PostgreSQL"
+    expected = {"node_start", "node_end", "llm_request", "llm_response", "tool_call", "tool_result"}
+    assert expected <= set(kinds)
+    response = next(e for e in events if e["type"] == "llm_response")
+    assert response["node"] == "researcher"
+    assert response["message"]["data"]["content"] == "found it"
+    result = next(e for e in events if e["type"] == "tool_result")
+    assert result["output"] == "content of https://example.com"
+    assert events[-1]["status"] == "completed"
+
+
+def test_record_run_disabled_without_directory(mock_settings):
+    config = {"configurable": {"thread_id": "rec"}}
+    with record_run(config, initial_state()) as (run_config, recorder):
+        assert recorder is None
+        assert run_config is config
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_recorded_responses(mock_settings, tmp_path):
+    mock_settings.event_log_dir = str(tmp_path)
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="found it")]))
+    state = initial_state("q")
+    with record_run({"configurable": {"thread_id": "r"}}, state) as (run_config, recorder):
+        await _graph(llm).ainvoke(state, run_config)
+
+    mock_settings.replay_log_path = recorder.path
+    mock_settings.replay_preserve_latency = False
+    load_replay(recorder.path, reload=True)
+    replayed = ReplayChatModel(log_path=recorder.path, preserve_latency=False)
+
+    result = await _graph(replayed).ainvoke(initial_state("q"))
+
+    assert result["messages"][-1].content == "found it"
+    (replay_scraper,) = replay_tools()
+    assert replay_scraper.name == "web_scraper"
+
+
+def test_replay_log_matches_args_then_falls_back_to_order():
+    events = [
+        {"type": "tool_call", "run_id": "1", "tool": "search", "args": {"q": "a"}},
+        {"type": "tool_result", "run_id": "1", "output": "A", "duration_s": 0.1},
+        {"type": "tool_call", "run_id": "2", "tool": "search", "args": {"q": "b"}},
+        {"type": "tool_result", "run_id": "2", "output": "B", "duration_s": 0.2},
+    ]
+    log = ReplayLog(events)
+    assert log.next_tool("search", {"q": "b"}) == ("B", 0.2)
+    assert log.next_tool("search", {"q": "changed"}) == ("A", 0.1)
+    with pytest.raises(LookupError):
+        log.next_tool("search", {"q": "a"})
@@ -1,8 +1,21 @@
 from __future__ import annotations
 
-from langchain_core.messages import ToolMessage
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import patch
 
-from src.agents.researcher import _extract_tool_outputs, _normalize_content
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from src.agents.researcher import (
+    _extract_tool_outputs,
+    _normalize_content,
+    _run_tool_calls,
+    researcher_node,
+)
+from src.content_store import materialize
 
 
 def test_normalize_content_string(mock_settings):
@@ -51,3 +64,116 @@ def test_extract_tool_outputs_no_url(mock_settings):
 
 def test_extract_tool_outputs_empty(mock_settings):
     assert _extract_tool_outputs([], []) == []
+
+
+@pytest.mark.asyncio
+async def test_run_tool_calls_runs_a_round_concurrently(mock_settings):
+    @tool
+    async def web_scraper(url: str) -> str:
+        """Scrapes a page."""
+        await asyncio.sleep(0.2)
+        return f"page {url}"
+
+    response = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "web_scraper", "args": {"url": f"https://{n}"}, "id": str(n)}
+            for n in range(3)
+        ],
+    )
+    started = time.perf_counter()
+    messages, args = await _run_tool_calls(response, [web_scraper], max_calls=2)
+    assert time.perf_counter() - started < 0.35
+    assert [m.tool_call_id for m in messages] == ["0", "1", "2"]
+    assert messages[1].content == "page https://1"
+    # Over budget: answered with an error so the transcript stays valid.
+    assert messages[2].status == "error"
+    assert len(_extract_tool_outputs(messages, args)) == 2
+
+
+def _tools(stored, calls=None):
+    calls = [] if calls is None else calls
+
+    @tool
+    async def duckduckgo_search(query: str) -> str:
+        """Searches the web."""
+        calls.append(query)
+        return f"links for {query}"
+
+    @tool
+    async def web_scraper(url: str) -> str:
+        """Scrapes a page."""
+        calls.append(url)
+        return f"page {url}"
+
+    @tool
+    async def store_research(text: str, source_url: str = "unknown") -> str:
+        """Stores research."""
+        stored.append(source_url)
+        return "id"
+
+    @asynccontextmanager
+    async def _get_research_tools():
+        yield [duckduckgo_search, web_scraper, store_research]
+
+    return _get_research_tools
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_rounds, scraped", [(3, True), (1, False)])
+async def test_researcher_searches_then_scrapes_in_one_node(
+    mock_settings, sample_state, max_rounds, scraped
+):
+    mock_settings.llm_provider = "fake"
+    mock_settings.fake_llm_tool_rounds = 2
+    mock_settings.researcher_max_tool_rounds = max_rounds
+    stored = []
+    with patch("src.agents.researcher.get_research_tools", _tools(stored)):
+        result = await researcher_node(sample_state)
+
+    results = materialize(result["research_results"])
+    assert results[0] == "links for Compare SQLite vs PostgreSQL"
+    assert any(r.startswith("page https://docs.example.com/") for r in results) is scraped
+    assert "Findings for Compare SQLite vs PostgreSQL" in result["messages"][0].content
+    assert len(stored) == (2 if scraped else 1)
+
+
+@pytest.mark.asyncio
+async def test_repeated_research_is_memoized_and_flagged_stagnant(
+    mock_settings, sample_state, tmp_path, registry
+):
+    mock_settings.llm_provider = "fake"
+    mock_settings.content_store_path = str(tmp_path / "content.sqlite")
+    calls = []
+    with patch("src.agents.researcher.get_research_tools", _tools([], calls)):
+        first = await researcher_node(sample_state)
+        again = {**sample_state, **first, "messages": sample_state["messages"]}
+        second = await researcher_node(again)
+
+    assert len(calls) == 2  # the second pass ran no tools
+    assert registry.snapshot()["counters"]["research.stagnant_loops"] == 1
+    assert second["seen_sources"] == first["seen_sources"]
+    # Only the second pass's summary is new.
+    assert len(second["research_results"]) == len(first["research_results"]) + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stagnation_stop, llm_calls", [(True, 2), (False, 3)])
+async def test_stagnant_tool_round_ends_the_researcher_early(
+    mock_settings, sample_state, tmp_path, registry, stagnation_stop, llm_calls
+):
+    mock_settings.llm_provider = "fake"
+    mock_settings.fake_llm_tool_rounds = 2
+    mock_settings.stagnation_stop = stagnation_stop
+    mock_settings.content_store_path = str(tmp_path / "content.sqlite")
+    with patch("src.agents.researcher.get_research_tools", _tools([])):
+        first = await researcher_node(sample_state)
+        before = registry.snapshot()["counters"]["llm.calls"]
+        again = {**sample_state, **first, "messages": sample_state["messages"]}
+        await researcher_node(again)
+
+    # The repeated search comes back from the memo; with stagnation_stop the
+    # researcher summarizes instead of asking for the scrape as well.
+    assert registry.snapshot()["counters"]["llm.calls"] - before == llm_calls
+    stagnant_rounds = registry.snapshot()["counters"].get("research.stagnant_rounds", 0)
+    assert stagnant_rounds == (1 if stagnation_stop else 0)
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
-from src.state import AgentState, build_context_messages, prune_messages
+from src.state import (
+    AgentState,
+    build_context_messages,
+    initial_state,
+    next_turn_state,
+    prune_messages,
+)
 
 
 def test_prune_messages_under_limit(mock_settings):
@@ -50,3 +56,34 @@ def test_build_context_messages_no_summary(mock_settings):
     result = build_context_messages(state)
     assert len(result) == 1
     assert isinstance(result[0], HumanMessage)
+
+
+def test_initial_state_seeds_query(mock_settings):
+    state = initial_state("Compare SQLite vs PostgreSQL")
+    assert isinstance(state["messages"][0], HumanMessage)
+    assert state["loop_count"] == 0
+    assert state["needs_more_research"] is True
+    assert initial_state()["messages"] == []
+
+
+def test_next_turn_state_keeps_conversation_and_resets_the_turn(mock_settings):
+    previous = {
+        **initial_state("SQLite vs PostgreSQL"),
+        "messages": [AIMessage(content="report")],
+        "summary": "Compared databases.",
+        "research_results": ["findings"],
+        "vector_hits": [{"text": "t", "source_url": "https://sqlite.org"}],
+        "tool_memo": {"k": "v"},
+        "budget_stop": "tokens",
+        "loop_count": 5,
+        "usage": {"run-1": {"input_tokens": 10}},
+    }
+    state = next_turn_state(previous, "What about Kubernetes?")
+
+    assert [m.content for m in state["messages"]] == ["report", "What about Kubernetes?"]
+    assert state["question"] == "What about Kubernetes?"
+    assert state["usage"] == previous["usage"]
+    fresh = initial_state()
+    for key in ("summary", "research_results", "vector_hits", "tool_memo", "budget_stop", "loop_count"):
+        assert state[key] == fresh[key]
+    assert next_turn_state(None, "q")["messages"][0].content == "q"
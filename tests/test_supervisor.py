@@ -4,9 +4,10 @@ import json
 from unittest.mock import patch
 
 import pytest
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage
 
-from src.agents.supervisor import SupervisorDecision, supervisor_node
+from src.agents.supervisor import SupervisorDecision, _pre_route, supervisor_node
+from src.metrics import MetricsRegistry
 
 
 def test_supervisor_decision_model_valid():
@@ -58,3 +59,46 @@ def test_supervisor_detects_synthesis_completion(mock_settings, mock_llm):
 
     payload = json.loads(result["messages"][0].content)
     assert payload["next_agent"] == "final_report"
+
+
+def test_supervisor_fast_path_skips_llm_for_fresh_question(
+    mock_settings, sample_state, mock_llm, monkeypatch
+):
+    registry = MetricsRegistry()
+    monkeypatch.setattr("src.metrics._REGISTRY", registry)
+
+    with patch("src.agents.supervisor._build_llm", return_value=mock_llm):
+        result = supervisor_node(sample_state)
+
+    mock_llm.invoke.assert_not_called()
+    decision = json.loads(result["messages"][0].content)
+    assert decision["next_agent"] == "researcher"
+    assert "Compare SQLite vs PostgreSQL" in decision["reasoning"]
+    assert registry.snapshot()["counters"] == {"supervisor.llm_skipped": 1}
+
+
+def test_pre_route_handles_obvious_states(mock_settings):
+    gaps = json.dumps({"needs_more_research": True, "gaps": ["x"], "synthesis": ""})
+    assert _pre_route({"messages": [AIMessage(content=gaps)]}).next_agent == "researcher"
+    instructions = AIMessage(content="Re-research instructions:\nFind benchmarks")
+    assert _pre_route({"messages": [instructions]}).next_agent == "researcher"
+    # After summarization only the question is left, but research exists.
+    summarized = {
+        "messages": [HumanMessage(content="SQLite vs PostgreSQL")],
+        "research_results": ["Result 1"],
+    }
+    assert _pre_route(summarized) is None
+    assert _pre_route({"messages": [AIMessage(content="free text")]}) is None
+
+
+def test_supervisor_uses_llm_when_fast_path_disabled(mock_settings, sample_state, mock_llm):
+    mock_settings.supervisor_fast_path = False
+    mock_llm.invoke.return_value = SupervisorDecision(
+        next_agent="analyst", reasoning="enough data"
+    )
+
+    with patch("src.agents.supervisor._build_llm", return_value=mock_llm):
+        result = supervisor_node(sample_state)
+
+    mock_llm.invoke.assert_called_once()
+    assert json.loads(result["messages"][0].content)["next_agent"] == "analyst"
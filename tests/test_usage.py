@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, StateGraph
+
+from src.state import AgentState, initial_state
+from src.usage import (
+    UsageCallbackHandler,
+    estimate_cost,
+    merge_usage,
+    price_for,
+    summarize_usage,
+    track_usage,
+    usage_record,
+    usage_since,
+)
+
+
+def test_price_for_uses_longest_prefix_and_default_model(mock_settings):
+    assert price_for("claude-3-5-haiku-20241022")[0] == 0.80
+    assert price_for("claude-3-haiku-20240307")[0] == 0.25
+    # Unknown models are priced as the configured default model.
+    assert price_for("scripted-fake") == price_for(mock_settings.default_model)
+
+
+def test_estimate_cost_discounts_cached_input(mock_settings):
+    record = usage_record(
+        "analyst",
+        "claude-3-5-sonnet-20241022",
+        {
+            "input_tokens": 1_000_000,
+            "output_tokens": 100_000,
+            "input_token_details": {"cache_read": 800_000, "cache_creation": 0},
+        },
+    )
+    # 200k uncached * $3 + 800k cached * $0.30 + 100k output * $15
+    assert record["cost_usd"] == pytest.approx(0.6 + 0.24 + 1.5)
+    assert estimate_cost("claude-3-5-sonnet-20241022", {"output_tokens": 0}) == 0
+
+
+def test_merge_usage_is_idempotent_and_summarizes_by_node():
+    first = {"a": {"node": "analyst", "input_tokens": 10, "output_tokens": 2, "cost_usd": 0.5}}
+    second = {"b": {"node": "supervisor", "input_tokens": 4, "output_tokens": 1, "cost_usd": 0.1}}
+    merged = merge_usage(merge_usage(first, second), first)
+    assert set(merged) == {"a", "b"}
+
+    summary = summarize_usage(merged)
+    assert summary["input_tokens"] == 14
+    assert summary["calls"] == 2
+    assert list(summary["by_node"]) == ["analyst", "supervisor"]
+    assert usage_since(merged, first) == second
+
+
+@pytest.mark.asyncio
+async def test_tracked_node_persists_usage_in_checkpoint(mock_settings):
+    usage = {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150}
+    llm = GenericFakeChatModel(
+        messages=iter([AIMessage(content="a", usage_metadata=usage)] * 2),
+        callbacks=[UsageCallbackHandler()],
+    )
+
+    async def analyst(state: AgentState) -> AgentState:
+        response = await llm.ainvoke(state["messages"])
+        return {"messages": [response]}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("analyst", track_usage(analyst))
+    graph.set_entry_point("analyst")
+    graph.add_edge("analyst", END)
+    app = graph.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "usage"}}
+
+    await app.ainvoke(initial_state("q"), config)
+    first = app.get_state(config).values["usage"]
+    # Feeding the full state back in (as the CLI does) must not double count.
+    await app.ainvoke(app.get_state(config).values, config)
+    second = app.get_state(config).values["usage"]
+
+    assert len(first) == 1
+    assert len(second) == 2
+    record = next(iter(first.values()))
+    assert record["node"] == "analyst"
+    assert record["input_tokens"] == 120
+    assert summarize_usage(usage_since(second, first))["output_tokens"] == 30
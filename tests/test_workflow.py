@@ -7,7 +7,9 @@ from langchain_core.messages import AIMessage, HumanMessage
 from src.graph.workflow import (
     _needs_summarization,
     _route_after_analyst,
+    _route_after_cache_lookup,
     _route_after_supervisor,
+    _route_after_supervisor_targets,
     build_graph,
 )
 
@@ -58,6 +60,18 @@ def test_route_after_supervisor_triggers_summarizer(mock_settings):
     assert _route_after_supervisor(state) == "summarizer"
 
 
+def test_background_summarizer_shares_the_next_step(mock_settings):
+    mock_settings.max_context_messages = 3
+    mock_settings.summarizer_background = True
+    decision = json.dumps({"next_agent": "analyst", "reasoning": "check"})
+    state = {
+        "messages": [HumanMessage(content=str(i)) for i in range(4)]
+        + [AIMessage(content=decision)],
+        "loop_count": 0,
+    }
+    assert _route_after_supervisor_targets(state) == ["analyst", "summarizer"]
+
+
 def test_route_after_analyst_needs_more(mock_settings):
     state = {
         "messages": [],
@@ -94,10 +108,27 @@ def test_route_after_analyst_force_final_at_max_loops(mock_settings):
 def test_build_graph_nodes(mock_settings):
     graph = build_graph()
     node_names = set(graph.nodes.keys())
-    expected = {"supervisor", "researcher", "analyst", "summarizer", "draft_outline", "final_report"}
+    expected = {"supervisor", "researcher", "analyst", "summarizer", "draft_outline", "final_report", "budget_stop"}
     assert expected == node_names
 
 
+def test_build_graph_adds_cache_lookup_when_enabled(mock_settings):
+    mock_settings.report_cache_mode = "seed"
+    graph = build_graph()
+    assert "cache_lookup" in graph.nodes
+    hit = {"report_cache": {"status": "hit"}}
+    assert _route_after_cache_lookup(hit) == "supervisor"
+    mock_settings.report_cache_mode = "report"
+    assert _route_after_cache_lookup(hit) == "final_report"
+    assert _route_after_cache_lookup({"report_cache": {"status": "miss"}}) == "supervisor"
+
+
+def test_build_graph_adds_research_branches_when_fanout_enabled(mock_settings):
+    mock_settings.research_fanout = 2
+    graph = build_graph()
+    assert {"research_branch", "merge_research"} <= set(graph.nodes)
+
+
 def test_needs_summarization_true(mock_settings):
     mock_settings.max_context_messages = 6
     state = {"messages": [HumanMessage(content=str(i)) for i in range(7)]}